@@ -21,7 +21,7 @@ print(__uri__+"\tv"+__version__)
 
 class Outies:
     # list here all the outies we currently support
-    Rhino, Grasshopper, SVG, ACAD, Dynamo, ThreeJS, JSON, Jupyter = list(range(8))
+    Rhino, Grasshopper, SVG, ACAD, Dynamo, ThreeJS, JSON, Jupyter, PLY, STL, OBJ = list(range(11))
 
 
 # keep this up to date with what outies we support
@@ -85,6 +85,12 @@ def make_out(outtype, name="untitled", path=False, **kargs):
         if path : return decodes.io.json_out.JsonOut(name, path, save_file=save_file)
         else : return decodes.io.json_out.JsonOut(name, save_file=save_file)
         
+    elif outtype in (Outies.PLY, Outies.STL, Outies.OBJ):
+        import decodes.io.mesh_out
+        fmt = {Outies.PLY:"ply", Outies.STL:"stl", Outies.OBJ:"obj"}[outtype]
+        if path : return decodes.io.mesh_out.MeshOut(name, path, format=fmt)
+        else : return decodes.io.mesh_out.MeshOut(name, format=fmt)
+
     elif outtype == Outies.Dynamo:
         import decodes.io.dynamo_out
         return decodes.io.dynamo_out.DynamoOut()
@@ -23,6 +23,7 @@ UZ = Vec(0,0,1)
 from .dc_graph import *
 
 from .dc_bounds import *
+from .dc_kdtree import *
 
 from .dc_plane import *
 from .dc_cs import *
@@ -38,6 +39,7 @@ from .dc_has_pts import *
 from .dc_pline import *
 from .dc_mesh import *
 from .dc_pgon import *
+from .dc_bvh import *
 
 from .dc_xform import *
 from .dc_intersection import *
@@ -146,6 +146,61 @@ class Basis(object):
         """
         raise NotImplementedError("Devalutate not implemented.    I am a BAD basis!")
 
+    def eval_many(self, vecs):
+        """ Evaluates each of the given Vecs in Basis coordinates, and returns the corresponding Points defined in World coordinates.
+        
+            :param vecs: Vecs in Basis coordinates.
+            :type vecs: [Vec] or VecArray
+            :result: Points in World coordinates.
+            :rtype: PointArray
+            
+            ::
+            
+                pts = cs.eval_many([Vec(1,0,0),Vec(0,1,0)])
+        """
+        from .dc_point import PointArray
+        return PointArray._from_xyz(*self._eval_xyz(*_split_xyz(vecs)))
+
+    def deval_many(self, pts):
+        """ Evaluates each of the given Points in World coordinates, and returns the corresponding Vecs defined in Basis coordinates.
+        
+            :param pts: Points in World coordinates.
+            :type pts: [Point] or PointArray
+            :result: Vecs in Basis coordinates.
+            :rtype: VecArray
+            
+            ::
+            
+                vecs = cs.deval_many(pts)
+        """
+        from .dc_vec import VecArray
+        return VecArray._from_xyz(*self._deval_xyz(*_split_xyz(pts)))
+
+    def _eval_xyz(self, xs, ys, zs):
+        """ Evaluates three separate sequences of x, y and z values in Basis coordinates, and returns three lists of values in World coordinates.
+            Bases may override this method to do so more efficiently than by evaluating each point in turn.
+        """
+        pts = [self.eval(x,y,z) for x,y,z in zip(xs,ys,zs)]
+        return [p.x for p in pts], [p.y for p in pts], [p.z for p in pts]
+
+    def _deval_xyz(self, xs, ys, zs):
+        """ Evaluates three separate sequences of x, y and z values in World coordinates, and returns three lists of values in Basis coordinates.
+            Bases may override this method to do so more efficiently than by evaluating each point in turn.
+        """
+        vecs = [self.deval(x,y,z) for x,y,z in zip(xs,ys,zs)]
+        return [v.x for v in vecs], [v.y for v in vecs], [v.z for v in vecs]
+
+
+def _split_xyz(vecs):
+    """ Returns three separate sequences of the x, y and z values of the given Vecs or VecArray.
+    """
+    from .dc_vec import VecArray
+    if isinstance(vecs, VecArray):
+        c = vecs.coords
+        return c[0::3], c[1::3], c[2::3]
+    vecs = list(vecs)
+    return [v.x for v in vecs], [v.y for v in vecs], [v.z for v in vecs]
+
 
 class HasBasis(Geometry):
     """A base class for anything that wants to define a basis for itself. Bases must implement the following methods:
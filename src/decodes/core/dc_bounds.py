@@ -1,6 +1,6 @@
 from decodes.core import *
 from . import dc_base, dc_interval, dc_vec, dc_point  #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
-import math
+import math, heapq
 
 
 class Bounds(Geometry):
@@ -374,6 +374,7 @@ class QuadTree():
         self.cap = capacity
         self.bnd = bounds
         self._pts = []
+        self._unique_count = 0 # the number of points in this leaf that are not duplicates of one another
         
     @property
     def has_children(self):
@@ -394,11 +395,9 @@ class QuadTree():
             :result: List of Points.
             :rtype: [Point]
         """
+        if not self.has_children : return list(self._pts)
         ret_pts = []
-        if not self.has_children :
-            ret_pts = list(self._pts)
-        else :
-            for child in self.children: ret_pts.extend(child.pts)
+        for leaf in self.flatten(): ret_pts.extend(leaf._pts)
         return ret_pts
 
     def append(self, pt) :
@@ -410,47 +409,88 @@ class QuadTree():
             :rtype: bool
         
         """
-    
-        if not self.contains(pt) : return False
-        if not self.has_children :
-            if len(Point.cull_duplicates(self._pts)) < self.cap:
-                self._pts.append(pt)
-                return True
-            else :
-                self._divide()
-        
-        if self.has_children :
-            for child in self.children:
-                if child.append(pt) : return True
-            return False
-        else:
-            raise("quadtree.append()... how did i get here?")
+        if not pt in self.bnd : return False
+        node = self
+        while node.has_children:
+            node = node._child_containing(pt)
+        return node._append_to_leaf(pt)
+
+    def extend(self, pts) :
+        """| Appends the given points to the points in this QuadTree in bulk.
+           | Rather than descending the tree once for each point, the given points are partitioned amongst the children of each region together, and regions that overflow are divided only once.
+        
+            :param pts: List of Points.
+            :type pts: [Point]
+            :result: List of Points that lie outside the bounds of this QuadTree, and so were not appended.
+            :rtype: [Point]
+        
+        """
+        rejected = [pt for pt in pts if not pt in self.bnd]
+        if rejected : pts = [pt for pt in pts if pt in self.bnd]
+        stack = [(self, list(pts))]
+        while stack:
+            node, group = stack.pop()
+            if not group : continue
+            if node.has_children:
+                buckets = [[] for child in node.children]
+                for pt in group: buckets[node.children.index(node._child_containing(pt))].append(pt)
+                stack.extend(zip(node.children,buckets))
+                continue
+            
+            combined = node._pts + group
+            unique_count = len(Point.cull_duplicates(combined))
+            if unique_count <= node.cap or not node._divide(redistribute=False) :
+                node._pts = combined
+                node._unique_count = unique_count
+            else:
+                stack.append((node,combined))
+        return rejected
+
+    def _append_to_leaf(self, pt):
+        """ Appends the given point to this leaf, dividing this leaf if it is already at capacity.
+            Points that duplicate a point already in this leaf do not count toward its capacity.
+        """
+        is_duplicate = any(pt.distance2(other) < EPSILON**2 for other in self._pts)
+        if is_duplicate or self._unique_count < self.cap:
+            self._pts.append(pt)
+            if not is_duplicate : self._unique_count += 1
+            return True
+        if not self._divide() : 
+            # this region cannot be divided any further, accept the point anyway
+            self._pts.append(pt)
+            self._unique_count += 1
+            return True
+        return self.append(pt)
+
+    def _child_containing(self, pt):
+        """ Returns the first child of this QuadTree that contains the given point.
+            A point that lies within this region but within none of its children (as floating-point error in dividing a region may leave a sliver uncovered) is given to the nearest child, whose bounds are grown to include it.
+        """
+        for child in self.children:
+            if pt in child.bnd : return child
+        child = min(self.children, key=lambda child: _bnd_dist2(child.bnd,pt))
+        child.bnd = _bnd_grown(child.bnd,pt)
+        return child
         
-    def _divide(self,equalize_bounds=False) :
+    def _divide(self,equalize_bounds=False,redistribute=True) :
         """ Divides self into sub regions. Starts at bottom left and moves clockwise.
         
             :result: Boolean Value
             :rtype: bool
         """
         if self.has_children: return False
+        if self.bnd.dim_x < EPSILON and self.bnd.dim_y < EPSILON and self.bnd.dim_z < EPSILON: return False
         
         if equalize_bounds: 
             sub_bnds = self.bnd.subbounds(1,equalize=True)
         else:
             sub_bnds = self.bnd//2
             
-        self.children = [QuadTree(self.cap,sub_bnd) for sub_bnd in sub_bnds]
+        self.children = [self.__class__(self.cap,sub_bnd) for sub_bnd in sub_bnds]
         for child in self.children: child.parent = self
         
-        for pt in self._pts : 
-            accepted = False
-            for child in self.children:
-                if child.append(pt) : 
-                    accepted = True
-                    break
-            if not accepted : "no child accepted this point!"
-            
-        self._pts = None
+        pts, self._pts = self._pts, None
+        if redistribute : self.extend(pts)
         return True
     
     def contains(self,pt):
@@ -462,10 +502,7 @@ class QuadTree():
             :rtype: bool
             
         """
-        if self.has_children:
-            return any([child.contains(pt) for child in self.children])
-        else:
-            return pt in self.bnd
+        return pt in self.bnd
             
     def pts_in_bounds(self,bounds):
         """ Finds all points that fall within a given bounds.
@@ -476,15 +513,71 @@ class QuadTree():
             :rtype: [Point]
             
         """
-        if not self.bnd.overlaps(bounds) : return []
         ret_pts = []
-        if not self.has_children :
-            for pt in self._pts :
+        for leaf in self._leaves_overlapping(bounds):
+            for pt in leaf._pts :
                 if pt in bounds :  ret_pts.append(pt)
-        else :
-            for child in self.children: ret_pts.extend(child.pts_in_bounds(bounds))
         return ret_pts
+
+    def pts_nearest(self, src_pt, k=1):
+        """| Returns the k points in this QuadTree nearest to the given point, ordered by distance.
+           | Regions are visited in order of their distance to the given point, such that regions which cannot contain a nearer point are never searched.
+        
+            :param src_pt: Source point.
+            :type src_pt: Point
+            :param k: Number of points to return.
+            :type k: int
+            :result: List of Points.
+            :rtype: [Point]
+            
+        """
+        if k <= 0 : return []
+        best = [] # a heap of (-distance squared, -order found, point) of the best k points found so far
+        worst = float('inf')
+        count = 0
+        queue = [(_bnd_dist2(self.bnd,src_pt),0,self)]
+        while queue:
+            d2, _, node = heapq.heappop(queue)
+            if d2 > worst : break
+            if node.has_children:
+                for child in node.children:
+                    count += 1
+                    cd2 = _bnd_dist2(child.bnd,src_pt)
+                    if cd2 <= worst : heapq.heappush(queue,(cd2,count,child))
+            else:
+                for pt in node._pts:
+                    count += 1
+                    pd2 = pt.distance2(src_pt)
+                    if len(best) < k : heapq.heappush(best,(-pd2,-count,pt))
+                    elif pd2 < worst : heapq.heapreplace(best,(-pd2,-count,pt))
+                    else : continue
+                    if len(best) == k : worst = -best[0][0]
+        return [tup[2] for tup in sorted(best, key=lambda tup: (-tup[0],-tup[1]))]
+
+    def pts_within(self, src_pt, radius):
+        """ Returns the points in this QuadTree that lie within the given distance of the given point, ordered by distance.
         
+            :param src_pt: Source point.
+            :type src_pt: Point
+            :param radius: Search distance.
+            :type radius: float
+            :result: List of Points.
+            :rtype: [Point]
+            
+        """
+        r2 = radius*radius
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if _bnd_dist2(node.bnd,src_pt) > r2 : continue
+            if node.has_children : stack.extend(node.children)
+            else : 
+                for pt in node._pts:
+                    pd2 = pt.distance2(src_pt)
+                    if pd2 <= r2 : found.append((pd2,len(found),pt))
+        found.sort(key=lambda tup: (tup[0],tup[1]))
+        return [tup[2] for tup in found]
         
     def flatten(self,return_empty_containers=False):
         if self.has_children:
@@ -495,46 +588,36 @@ class QuadTree():
         else:
             return [self]
 
+    def _leaves_overlapping(self, bounds):
+        """ Returns the leaves of this QuadTree whose bounds overlap the given bounds, descending only into regions that overlap.
+        """
+        ret = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node.bnd.overlaps(bounds) : continue
+            if node.has_children : stack.extend(reversed(node.children))
+            else : ret.append(node)
+        return ret
+
     def container_of(self,pt):
         if not pt in self.bnd: raise Exception("point does not lie within the bounds of this QTree")
-        if not self.has_children: return self
-        for child in self.children:
-            if pt in child.bnd: return child.container_of(pt)
-            
+        node = self
+        while node.has_children:
+            node = node._child_containing(pt)
+        return node
             
     def pts_neighboring(self,pt):
         return self.container_of(pt).pts
         
     def containers_neighboring(self,pt):
         container = self.container_of(pt)
-        bnd = container.bnd.scaled(1.10)
-        others = self.flatten()
-        ret = []
-        for other in others:
-            if other.bnd.overlaps(bnd): ret.append(other)
-        return ret
+        return self._leaves_overlapping(container.bnd.scaled(1.10))
         
     def pts_nearby(self,src_pt):
         if not src_pt in self.bnd : src_pt = self.bnd.near_pt(src_pt)
-        container = self.container_of(src_pt)
-        #a.put(container.bnd.to_pline())
-        near_pts = container.pts
-        
-        proj_pts = [Point(container.bnd.ival_x.a,src_pt.y,src_pt.z), Point(container.bnd.ival_x.b,src_pt.y,src_pt.z),Point(src_pt.x,container.bnd.ival_y.a,src_pt.z), Point(src_pt.x,container.bnd.ival_y.b,src_pt.z)]
-        if container.bnd.is_3d: proj_pts.extend([Point(src_pt.x,src_pt.y,container.bnd.ival_z.a), Point(src_pt.x,src_pt.y,container.bnd.ival_z.b)])
-        for edge in container.bnd.edges: proj_pts.append(edge.near_pt(src_pt))
-        
-        for p in proj_pts:
-            p += Vec(src_pt,p)*EPSILON
-            #a.put(Segment(src_pt,p))
-            try:
-                adj_container = self.container_of(p)
-                a.put(adj_container.bnd.to_pline())
-                for adj_pt in adj_container.pts:
-                    if adj_pt not in near_pts: near_pts.append(adj_pt)
-            except:
-                # no adjacent container
-                pass
+        near_pts = []
+        for container in self.containers_neighboring(src_pt): near_pts.extend(container._pts)
         near_pts.sort(key = lambda p: p.distance2(src_pt))
         return near_pts
         
@@ -554,6 +637,67 @@ class QuadTree():
     
         q = QuadTree(capacity, Bounds.encompass(pts))
         q._divide(equalize_bounds=True)
-        for p in pts : q.append(p)
+        q.extend(pts)
         return q
+
+
+
+class Octree(QuadTree):
+    """
+    A three-dimensional counterpart to the QuadTree, which requires a 3d Bounds and divides each region into eight.
+    """
+    def __init__ (self, capacity, bounds):
+        """ Octree constructor.
         
+            :param capacity: Total number of points to contain.
+            :type capacity: int
+            :param bounds: A 3d Bounds.
+            :type bounds: Bounds
+            :result: Octree object.
+            :rtype: Octree
+        
+        """
+        if not bounds.is_3d : raise GeometricError("An Octree requires a 3d Bounds.")
+        super(Octree,self).__init__(capacity,bounds)
+
+    @staticmethod
+    def encompass(capacity = 8, pts = [Point()]):
+        """ Returns an Octree that encompasses the given points.
+        
+            :param capacity: Capacity of points within the Bounds.
+            :type capacity: int
+            :param pts: List of Points.
+            :type pts: [Point]
+            :result: Octree encompassing the given points.
+            :rtype: Octree
+        
+        """
+        bnds = Bounds( 
+            ival_x = Interval.encompass([p.x for p in pts],nudge=True), 
+            ival_y = Interval.encompass([p.y for p in pts],nudge=True), 
+            ival_z = Interval.encompass([p.z for p in pts],nudge=True)
+        )
+        o = Octree(capacity, bnds)
+        o.extend(pts)
+        return o
+
+
+
+def _bnd_grown(bnd, pt):
+    """ Returns a copy of the given Bounds grown just enough to include the given point. The z-coordinate is ignored for 2d Bounds.
+    """
+    grow = lambda ival, v: Interval(min(ival.a,ival.b,v),max(ival.a,ival.b,v))
+    if bnd.is_3d : return Bounds(ival_x=grow(bnd.ival_x,pt.x),ival_y=grow(bnd.ival_y,pt.y),ival_z=grow(bnd.ival_z,pt.z))
+    return Bounds(ival_x=grow(bnd.ival_x,pt.x),ival_y=grow(bnd.ival_y,pt.y))
+
+def _bnd_dist2(bnd, pt):
+    """ Returns the distance squared between the given point and the nearest point of the given Bounds. The z-coordinate is ignored for 2d Bounds.
+    """
+    d2 = 0.0
+    ivals = [(bnd.ival_x,pt.x),(bnd.ival_y,pt.y)]
+    if bnd.is_3d : ivals.append((bnd.ival_z,pt.z))
+    for ival, v in ivals:
+        a, b = (ival.a, ival.b) if ival.a <= ival.b else (ival.b, ival.a)
+        if v < a : d2 += (a-v)*(a-v)
+        elif v > b : d2 += (v-b)*(v-b)
+    return d2
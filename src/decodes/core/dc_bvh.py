@@ -0,0 +1,390 @@
+from decodes.core import *
+from . import dc_base, dc_vec, dc_point, dc_bounds, dc_kdtree, dc_mesh #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
+from .dc_kdtree import _query_coords
+if VERBOSE_FS: print("bvh.py loaded")
+
+import math, heapq
+from array import array
+
+
+class MeshBVH(object):
+    """
+    A bounding volume hierarchy that indexes the faces of a Mesh for ray casting and closest-point queries.
+    Faces are divided into triangles, the world coordinates of which are copied into a flat array, such that later changes to the mesh are not reflected in the hierarchy.
+    The hierarchy is built by binning triangles along the axis of greatest extent and splitting where the surface area heuristic is least, and is stored in flat arrays rather than as linked node objects.
+    Queries return indices of the faces of the mesh given at construction.
+    """
+    bins = 12 # the number of bins along which splits are considered at each node
+
+    def __init__(self, msh, leaf_size=4):
+        """ MeshBVH constructor.
+
+            :param msh: Mesh to index.
+            :type msh: Mesh
+            :param leaf_size: Number of triangles below which a node is not divided.
+            :type leaf_size: int
+            :result: MeshBVH object.
+            :rtype: MeshBVH
+
+            ::
+
+                bvh = MeshBVH(msh)
+                faces, dists = bvh.first_hits(origins, directions)
+        """
+        crds = msh.coords
+        tris, tri_face = [], []
+        for f, face in enumerate(msh.faces):
+            for n in range(1,len(face)-1):
+                for i in (face[0],face[n],face[n+1]): tris.extend((crds[3*i],crds[3*i+1],crds[3*i+2]))
+                tri_face.append(f)
+        self._tris = array('d',tris)
+        self._tri_face = array('l',tri_face)
+        self._leaf_size = max(1,int(leaf_size))
+        self._build()
+
+    def __len__(self):
+        return len(self._tri_face)
+
+    def __repr__(self):
+        return "bvh[{0}tris,{1}nodes]".format(len(self._tri_face),len(self._lo))
+
+    def _build(self):
+        """ Recursively splits the triangles of this hierarchy until each leaf contains no more than leaf_size triangles, or until a split would cost more than it saves.
+        """
+        t = self._tris
+        n = len(self._tri_face)
+        mins = [[min(t[9*i+a],t[9*i+a+3],t[9*i+a+6]) for i in range(n)] for a in range(3)]
+        maxs = [[max(t[9*i+a],t[9*i+a+3],t[9*i+a+6]) for i in range(n)] for a in range(3)]
+        cens = [[(mins[a][i]+maxs[a][i])*0.5 for i in range(n)] for a in range(3)]
+        bins = self.bins
+
+        idx = list(range(n))
+        lo, hi, left, right, box = [], [], [], [], []
+        stack = [(0,n,-1,False)] # (start, end, parent node, is right child)
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(lo)
+            if parent >= 0:
+                if is_right : right[parent] = node
+                else : left[parent] = node
+            lo.append(start)
+            hi.append(end)
+            left.append(-1)
+            right.append(-1)
+
+            sub = idx[start:end]
+            if sub : bnd = [min([mins[a][i] for i in sub]) for a in range(3)] + [max([maxs[a][i] for i in sub]) for a in range(3)]
+            else : bnd = [0.0]*6
+            box.extend(bnd)
+            count = end-start
+            if count <= self._leaf_size : continue
+
+            spans = [(min([cens[a][i] for i in sub]),max([cens[a][i] for i in sub])) for a in range(3)]
+            axis = max(range(3), key=lambda a: spans[a][1]-spans[a][0])
+            c_lo, c_hi = spans[axis]
+            if c_hi == c_lo : continue # all triangles share a centroid, keep them in a leaf
+
+            # bin triangles by centroid, and find the split between bins that is least costly by the surface area heuristic
+            c, scale = cens[axis], bins/(c_hi-c_lo)
+            bin_of = [min(bins-1,int((c[i]-c_lo)*scale)) for i in sub]
+            counts = [0]*bins
+            boxes = [None]*bins
+            for i, b in zip(sub,bin_of):
+                counts[b] += 1
+                bb = boxes[b]
+                if bb is None : boxes[b] = [mins[0][i],mins[1][i],mins[2][i],maxs[0][i],maxs[1][i],maxs[2][i]]
+                else :
+                    for a in range(3):
+                        if mins[a][i] < bb[a] : bb[a] = mins[a][i]
+                        if maxs[a][i] > bb[a+3] : bb[a+3] = maxs[a][i]
+            left_cost = _sweep_costs(counts,boxes)
+            right_cost = _sweep_costs(counts[::-1],boxes[::-1])[::-1]
+            costs = [left_cost[k]+right_cost[k+1] for k in range(bins-1)]
+            split = costs.index(min(costs))
+            if costs[split] >= count*_box_area(bnd) and count <= 4*self._leaf_size : continue # dividing this node costs more than it saves
+
+            sub_l = [i for i, b in zip(sub,bin_of) if b <= split]
+            sub_r = [i for i, b in zip(sub,bin_of) if b > split]
+            idx[start:end] = sub_l + sub_r
+            mid = start+len(sub_l)
+            stack.append((mid,end,node,True))
+            stack.append((start,mid,node,False))
+
+        self._idx = array('l',idx)
+        self._lo, self._hi = array('l',lo), array('l',hi)
+        self._left, self._right = array('l',left), array('l',right)
+        self._box = array('d',box)
+
+    def _box_entry(self, node, ox, oy, oz, ix, iy, iz, t_min, t_max):
+        """ Returns the parameter at which the given ray enters the bounding box of the given node, or None if the ray misses it between t_min and t_max.
+            Directions of zero along an axis are given as an inverse of None.
+        """
+        b = self._box
+        o = node*6
+        for org, inv, a in ((ox,ix,0),(oy,iy,1),(oz,iz,2)):
+            if inv is None :
+                if org < b[o+a] or org > b[o+a+3] : return None
+                continue
+            t0, t1 = (b[o+a]-org)*inv, (b[o+a+3]-org)*inv
+            if t0 > t1 : t0, t1 = t1, t0
+            if t0 > t_min : t_min = t0
+            if t1 < t_max : t_max = t1
+            if t_min > t_max : return None
+        return t_min
+
+    def _tri_hit(self, tri, ox, oy, oz, dx, dy, dz, cull):
+        """ Returns the parameter at which the given ray strikes the given triangle, or None if it misses (after Moller and Trumbore, 1997).
+            If cull is True, triangles struck from behind, against the direction of their normal, are missed.
+        """
+        t = self._tris
+        o = 9*tri
+        ax, ay, az = t[o], t[o+1], t[o+2]
+        e1x, e1y, e1z = t[o+3]-ax, t[o+4]-ay, t[o+5]-az
+        e2x, e2y, e2z = t[o+6]-ax, t[o+7]-ay, t[o+8]-az
+        px, py, pz = dy*e2z-dz*e2y, dz*e2x-dx*e2z, dx*e2y-dy*e2x
+        det = e1x*px+e1y*py+e1z*pz
+        if det == 0 or (cull and det < 0) : return None
+        inv = 1.0/det
+        sx, sy, sz = ox-ax, oy-ay, oz-az
+        u = (sx*px+sy*py+sz*pz)*inv
+        if u < 0 or u > 1 : return None
+        qx, qy, qz = sy*e1z-sz*e1y, sz*e1x-sx*e1z, sx*e1y-sy*e1x
+        v = (dx*qx+dy*qy+dz*qz)*inv
+        if v < 0 or u+v > 1 : return None
+        return (e2x*qx+e2y*qy+e2z*qz)*inv
+
+    def _cast(self, ox, oy, oz, dx, dy, dz, t_min, t_max, mode, cull=False):
+        """ Casts a ray, returning a list of (parameter, face) tuples ordered by parameter.
+            In "first" mode only the nearest hit is found, in "any" mode the search ends with the first hit found, and in "all" mode every face struck is found once.
+        """
+        if len(self._lo) == 0 : return []
+        ix, iy, iz = [1.0/d if d != 0 else None for d in (dx,dy,dz)]
+        idx, lo, hi, left, right, tri_face = self._idx, self._lo, self._hi, self._left, self._right, self._tri_face
+        hits = {}
+        limit = t_max
+        entry = self._box_entry(0,ox,oy,oz,ix,iy,iz,t_min,limit)
+        stack = [] if entry is None else [(entry,0)]
+        while stack:
+            entry, node = stack.pop()
+            if entry > limit : continue
+            if left[node] < 0 :
+                for tri in idx[lo[node]:hi[node]]:
+                    t = self._tri_hit(tri,ox,oy,oz,dx,dy,dz,cull)
+                    if t is None or t < t_min or t > limit : continue
+                    f = tri_face[tri]
+                    if f in hits and hits[f] <= t : continue
+                    if mode == "any" : return [(t,f)]
+                    if mode == "first" :
+                        hits = {}
+                        limit = t
+                    hits[f] = t
+            else:
+                found = []
+                for child in (left[node],right[node]):
+                    e = self._box_entry(child,ox,oy,oz,ix,iy,iz,t_min,limit)
+                    if e is not None : found.append((e,child))
+                found.sort(reverse=True) # the nearer child is visited first
+                stack.extend(found)
+        return sorted([(t,f) for f,t in hits.items()])
+
+    def _nearest(self, x, y, z):
+        """ Returns a (distance squared, face, (x,y,z)) tuple describing the point on the indexed triangles nearest to the given coordinates.
+            Nodes are visited in order of the distance to their bounding box, and the search ends once no unvisited node could contain a nearer point.
+        """
+        if len(self._lo) == 0 : raise GeometricError("Cannot find the nearest point on an empty MeshBVH")
+        idx, lo, hi, left, right = self._idx, self._lo, self._hi, self._left, self._right
+        best = (float('inf'),-1,None)
+        queue = [(self._box_dist2(0,x,y,z),0)]
+        while queue:
+            d2, node = heapq.heappop(queue)
+            if d2 > best[0] : break
+            if left[node] < 0 :
+                for tri in idx[lo[node]:hi[node]]:
+                    px, py, pz = self._tri_nearest(tri,x,y,z)
+                    pd2 = (px-x)*(px-x) + (py-y)*(py-y) + (pz-z)*(pz-z)
+                    if pd2 < best[0] : best = (pd2,self._tri_face[tri],(px,py,pz))
+            else:
+                for child in (left[node],right[node]):
+                    cd2 = self._box_dist2(child,x,y,z)
+                    if cd2 <= best[0] : heapq.heappush(queue,(cd2,child))
+        return best
+
+    def _box_dist2(self, node, x, y, z):
+        """ Returns the distance squared between the given coordinates and the bounding box of the given node.
+        """
+        b = self._box
+        o = node*6
+        d = 0.0
+        if x < b[o] : d += (b[o]-x)**2
+        elif x > b[o+3] : d += (x-b[o+3])**2
+        if y < b[o+1] : d += (b[o+1]-y)**2
+        elif y > b[o+4] : d += (y-b[o+4])**2
+        if z < b[o+2] : d += (b[o+2]-z)**2
+        elif z > b[o+5] : d += (z-b[o+5])**2
+        return d
+
+    def _tri_nearest(self, tri, x, y, z):
+        """ Returns the coordinates of the point on the given triangle nearest to the given coordinates, by the regions of the triangle in which they fall (after Ericson, 2005).
+        """
+        t = self._tris
+        o = 9*tri
+        ax, ay, az, bx, by, bz, cx, cy, cz = t[o:o+9]
+        abx, aby, abz, acx, acy, acz = bx-ax, by-ay, bz-az, cx-ax, cy-ay, cz-az
+        apx, apy, apz = x-ax, y-ay, z-az
+        d1, d2 = abx*apx+aby*apy+abz*apz, acx*apx+acy*apy+acz*apz
+        if d1 <= 0 and d2 <= 0 : return ax, ay, az
+        bpx, bpy, bpz = x-bx, y-by, z-bz
+        d3, d4 = abx*bpx+aby*bpy+abz*bpz, acx*bpx+acy*bpy+acz*bpz
+        if d3 >= 0 and d4 <= d3 : return bx, by, bz
+        vc = d1*d4 - d3*d2
+        if vc <= 0 and d1 >= 0 and d3 <= 0 :
+            v = d1/(d1-d3)
+            return ax+v*abx, ay+v*aby, az+v*abz
+        cpx, cpy, cpz = x-cx, y-cy, z-cz
+        d5, d6 = abx*cpx+aby*cpy+abz*cpz, acx*cpx+acy*cpy+acz*cpz
+        if d6 >= 0 and d5 <= d6 : return cx, cy, cz
+        vb = d5*d2 - d1*d6
+        if vb <= 0 and d2 >= 0 and d6 <= 0 :
+            w = d2/(d2-d6)
+            return ax+w*acx, ay+w*acy, az+w*acz
+        va = d3*d6 - d5*d4
+        if va <= 0 and (d4-d3) >= 0 and (d5-d6) >= 0 :
+            w = (d4-d3)/((d4-d3)+(d5-d6))
+            return bx+w*(cx-bx), by+w*(cy-by), bz+w*(cz-bz)
+        denom = va+vb+vc
+        if denom == 0 : return ax, ay, az # a degenerate triangle
+        v, w = vb/denom, vc/denom
+        return ax+abx*v+acx*w, ay+aby*v+acy*w, az+abz*v+acz*w
+
+    def first_hit(self, origin, direction, t_max=None, ignore_backface=False):
+        """ Returns the index of the first face struck by the given ray, and the parameter along the ray at which it is struck, in multiples of the length of its direction.
+
+            :param origin: Origin of ray.
+            :type origin: Point
+            :param direction: Direction of ray.
+            :type direction: Vec
+            :param t_max: Parameter beyond which faces are not struck.
+            :type t_max: float
+            :param ignore_backface: If True, faces struck from behind are not struck.
+            :type ignore_backface: bool
+            :result: Index of face and parameter, or (-1, None) if no face is struck.
+            :rtype: (int, float)
+
+            ::
+
+                face, t = bvh.first_hit(Point(0,0,10), Vec(0,0,-1))
+        """
+        faces, ts = self.first_hits([origin],[direction],t_max,ignore_backface)
+        return faces[0], ts[0]
+
+    def first_hits(self, origins, directions, t_max=None, ignore_backface=False):
+        """ Returns the index of the first face struck by each of the given rays, and the parameter along each ray at which it is struck, in multiples of the length of its direction.
+
+            :param origins: Origins of rays.
+            :type origins: [Point] or PointArray
+            :param directions: Directions of rays.
+            :type directions: [Vec] or VecArray
+            :param t_max: Parameter beyond which faces are not struck.
+            :type t_max: float
+            :param ignore_backface: If True, faces struck from behind are not struck.
+            :type ignore_backface: bool
+            :result: Indices of faces and parameters, with -1 and None for rays that strike no face.
+            :rtype: ([int], [float])
+        """
+        faces, ts = [], []
+        for hits in self._cast_many(origins,directions,t_max,"first",ignore_backface):
+            faces.append(hits[0][1] if hits else -1)
+            ts.append(hits[0][0] if hits else None)
+        return faces, ts
+
+    def any_hits(self, origins, directions, t_max=None, ignore_backface=False):
+        """ Returns True for each of the given rays that strikes any face, which suits tests of occlusion. A ray toward a target that lies at the tip of its direction may be tested by setting t_max to one.
+
+            :param origins: Origins of rays.
+            :type origins: [Point] or PointArray
+            :param directions: Directions of rays.
+            :type directions: [Vec] or VecArray
+            :param t_max: Parameter beyond which faces are not struck.
+            :type t_max: float
+            :param ignore_backface: If True, faces struck from behind are not struck.
+            :type ignore_backface: bool
+            :result: Boolean values.
+            :rtype: [bool]
+        """
+        return [bool(hits) for hits in self._cast_many(origins,directions,t_max,"any",ignore_backface)]
+
+    def all_hits(self, origins, directions, t_max=None, ignore_backface=False):
+        """ Returns the indices of all faces struck by each of the given rays, and the parameters along each ray at which they are struck, in the order in which they are struck.
+
+            :param origins: Origins of rays.
+            :type origins: [Point] or PointArray
+            :param directions: Directions of rays.
+            :type directions: [Vec] or VecArray
+            :param t_max: Parameter beyond which faces are not struck.
+            :type t_max: float
+            :param ignore_backface: If True, faces struck from behind are not struck.
+            :type ignore_backface: bool
+            :result: Lists of indices of faces and lists of parameters, one of each per ray.
+            :rtype: ([[int]], [[float]])
+        """
+        faces, ts = [], []
+        for hits in self._cast_many(origins,directions,t_max,"all",ignore_backface):
+            faces.append([f for t,f in hits])
+            ts.append([t for t,f in hits])
+        return faces, ts
+
+    def _cast_many(self, origins, directions, t_max, mode, cull):
+        origins, directions = _query_coords(origins), _query_coords(directions)
+        if len(origins) != len(directions) : raise ValueError("A ray requires both an origin and a direction.")
+        if t_max is None : t_max = float('inf')
+        return [self._cast(ox,oy,oz,dx,dy,dz,0.0,t_max,mode,cull) for (ox,oy,oz),(dx,dy,dz) in zip(origins,directions)]
+
+    def closest_point(self, pt):
+        """ Returns the index of the face nearest to the given Point, the nearest Point on that face, and the distance between them.
+
+            :param pt: Query point.
+            :type pt: Point
+            :result: Index of face, Point, and distance.
+            :rtype: (int, Point, float)
+
+            ::
+
+                face, near_pt, dist = bvh.closest_point(Point(1,2,3))
+        """
+        d2, face, (x,y,z) = self._nearest(pt.x,pt.y,pt.z)
+        return face, Point(x,y,z), math.sqrt(d2)
+
+    def closest_points(self, pts):
+        """ Returns the index of the face nearest to each of the given Points, the nearest point on each of those faces, and the distances between them.
+
+            :param pts: Query points.
+            :type pts: [Point] or PointArray
+            :result: Indices of faces, Points, and distances.
+            :rtype: ([int], PointArray, [float])
+        """
+        faces, coords, dists = [], array('d'), []
+        for x,y,z in _query_coords(pts):
+            d2, face, near = self._nearest(x,y,z)
+            faces.append(face)
+            coords.extend(near)
+            dists.append(math.sqrt(d2))
+        return faces, PointArray.from_coords(coords), dists
+
+
+def _box_area(bnd):
+    """ Returns the surface area of a box given as (min x, min y, min z, max x, max y, max z).
+    """
+    dx, dy, dz = bnd[3]-bnd[0], bnd[4]-bnd[1], bnd[5]-bnd[2]
+    return 2.0*(dx*dy + dy*dz + dz*dx)
+
+def _sweep_costs(counts, boxes):
+    """ Returns, for each bin, the number of triangles in that bin and all bins before it multiplied by the surface area of their combined bounding box.
+    """
+    costs, count, bnd = [], 0, None
+    for c, bb in zip(counts, boxes):
+        count += c
+        if bb is not None :
+            if bnd is None : bnd = list(bb)
+            else : bnd = [min(bnd[a],bb[a]) for a in range(3)] + [max(bnd[a],bb[a]) for a in range(3,6)]
+        costs.append(count*_box_area(bnd) if bnd else 0.0)
+    return costs
@@ -134,6 +134,40 @@ class CS(Geometry, Basis):
 
         return Vec(xx,yy,zz)
 
+    def _eval_xyz(self, xs, ys, zs):
+        return self._matrices()[0]._xform_xyz(xs, ys, zs)
+
+    def _deval_xyz(self, xs, ys, zs):
+        return self._matrices()[1]._xform_xyz(xs, ys, zs)
+
+    def _matrices(self):
+        """ Returns a pair of Xforms, the first of which evaluates coordinates in this CS, and the second of which devaluates world coordinates into this CS. 
+            These are cached, and recalculated only if the origin or axes of this CS have changed.
+        """
+        o, vx, vy, vz = self.origin, self.x_axis, self.y_axis, self.z_axis
+        key = (o.x,o.y,o.z, vx.x,vx.y,vx.z, vy.x,vy.y,vy.z, vz.x,vz.y,vz.z)
+        try:
+            if self._matrices_key == key : return self._matrices_cache
+        except AttributeError:
+            pass
+        from .dc_xform import Xform
+        m = [
+            vx.x, vy.x, vz.x, o.x,
+            vx.y, vy.y, vz.y, o.y,
+            vx.z, vy.z, vz.z, o.z,
+            0.0, 0.0, 0.0, 1.0
+            ]
+        # the axes of a CS are orthonormal, and so the inverse rotation is the transpose
+        im = [
+            vx.x, vx.y, vx.z, -(vx.x*o.x + vx.y*o.y + vx.z*o.z),
+            vy.x, vy.y, vy.z, -(vy.x*o.x + vy.y*o.y + vy.z*o.z),
+            vz.x, vz.y, vz.z, -(vz.x*o.x + vz.y*o.y + vz.z*o.z),
+            0.0, 0.0, 0.0, 1.0
+            ]
+        self._matrices_cache = (Xform(matrix = m), Xform(matrix = im))
+        self._matrices_key = key
+        return self._matrices_cache
+
     def eval_cyl(self,radius,radians,z=0):
         """ Returns a Point relative to this CS given three cylindrical coordinates.
         
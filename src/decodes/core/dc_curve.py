@@ -2,7 +2,7 @@ from decodes.core import *
 from . import dc_base, dc_vec, dc_point, dc_cs, dc_line, dc_mesh, dc_pgon
 if VERBOSE_FS: print("curve.py loaded")
 
-import math
+import math, heapq, copy, bisect
 
 
 class IsParametrized(Geometry):
@@ -30,9 +30,20 @@ class IsParametrized(Geometry):
         """
         return self.subdivide(divs)
 
+    _array_func = None
+
     @property
     def func(self): return self._func
 
+    @property
+    def array_func(self): 
+        """ Returns the array function of this object, which evaluates many parameters in a single call, or None if it has none.
+        
+            :result: Array function.
+            :rtype: function
+        """
+        return self._array_func
+
 
     def near(self,pt,tolerance=None,max_recursion=20,resolution=8):
         """| Finds a location on this curve which is nearest to the given Point.
@@ -139,17 +150,32 @@ class Curve(HasBasis,IsParametrized):
     To construct a curve, pass in a function and an [optional] interval that determines a valid range of values.
     The function should expect a single parameter t(float), and return a Point.
 
+    A curve may also be given an array function, which expects a list of t-values and returns a tuple of three lists containing the x, y and z coordinates of the curve at each.
+    Where it is given, a curve that evaluates many t-values at once (such as when dividing, or when building a surrogate) calls it once for all of them.
+
     """
     
-    def __init__(self, function=None, domain=Interval(0,1), tolerance=None, basis=None):
+    adaptive_seeds = 16 # the number of equal spans with which adaptive sampling begins
+    adaptive_dist_ratio = 0.001 # the default distance tolerance of adaptive sampling, relative to the size of a curve
+    adaptive_angle_tol = math.radians(10) # the default angle tolerance of adaptive sampling
+    adaptive_max_evals = 2048 # the default maximum number of evaluations of adaptive sampling
+    arc_length_tol = 1e-4 # the relative error permitted, before extrapolation, in each span of the arc-length table of a curve
+    sample_cache_size = 1024 # the number of evaluations of its function that a curve stores for reuse by itself and its subcurves
+    
+    def __init__(self, function=None, domain=Interval(0,1), tolerance=None, basis=None, validate=True, array_function=None):
         """ Constructs a Curve object. If tolerance is None, Curve.tol = tol_max().
+            The surrogate of a Curve is not built until it is first requested.
         
-           :param function: A function returning points.
+           :param function: A function returning points. May be omitted if an array function is given.
            :type function: function
            :param domain: Domain for curve points.
            :type domain: Interval
            :param tolerance: The tolerance of this curve expressed in domain space.
            :type tolerance: float
+           :param validate: If True, the given function is evaluated at either end of the given domain to check that it returns points.
+           :type validate: bool
+           :param array_function: A function returning the coordinates of points at many t-values.
+           :type array_function: function
            :result: Curve object.
            :rtype: Curve
             
@@ -159,28 +185,38 @@ class Curve(HasBasis,IsParametrized):
                     return Point(math.sin(u),u)
                 Inv=Interval(0,20)
                 crv = Curve(func,Inv)
+
+                def array_func(us):
+                    return [math.sin(u) for u in us], us, [0.0]*len(us)
+                crv = Curve(domain=Inv, array_function=array_func)
         """
+        if array_function is not None :
+            self._array_func = array_function
+            if function is None :
+                def function(t):
+                    xs, ys, zs = array_function([t])
+                    return Point(xs[0],ys[0],zs[0])
         if function is not None : self._func = function
         self._dom = domain
         self._tol = self.tol_max
         if tolerance is not None : self.tol = tolerance
         if basis is not None : self._basis = basis
 
-        for t in [domain.a,domain.b]:
-            try:
-                pt = self.func(t)
-                pt.x
-                pt.y
-                pt.z
-            except:
-                raise GeometricError("Curve not valid: The given function does not return a point or plane at parameter %s"%(t))
-
-        self._rebuild_surrogate()
+        if validate:
+            for t in [domain.a,domain.b]:
+                try:
+                    pt = self._sample(t)
+                    pt.x
+                    pt.y
+                    pt.z
+                except:
+                    raise GeometricError("Curve not valid: The given function does not return a point or plane at parameter %s"%(t))
 
 
     @property
     def surrogate(self): 
         """ Returns a polyline representation of this curve. The number of points in the resulting PLine is related to the tolerance (tol) of this curve.
+            This is built the first time it is requested, and rebuilt only after the tolerance or the basis of this curve changes.
         
             :result: Polyline of curve.
             :rtype: PLine
@@ -190,11 +226,11 @@ class Curve(HasBasis,IsParametrized):
                 surg=crv.surrogate
         
         """
-        return self._surrogate
+        return self._world_cached('surrogate',self._to_pline)
 
     @property
     def appx_length(self): 
-        """Returns the approximate length of a curve.
+        """Returns the approximate length of a curve, as measured by the arc-length table of this curve to within Curve.arc_length_tol.
             
             :result: Approximate length of a curve.
             :rtype: float
@@ -203,7 +239,7 @@ class Curve(HasBasis,IsParametrized):
             
                 a_len=crv.appx_length
         """
-        return self._surrogate.length
+        return self._length_table()[1][-1]
 
     @property
     def domain(self): 
@@ -275,7 +311,7 @@ class Curve(HasBasis,IsParametrized):
         if t<self.domain.a or t>self.domain.b : 
             t = round(t,7) # this may be due to a rounding problem, try rounding to 7 decimal places
             if t<self.domain.a or t>self.domain.b : raise DomainError("Curve evaluated outside the bounds of its domain: deval(%s) %s"%(t,self.domain))
-        pt = self.func(t)
+        pt = self._sample(t)
 
         #transform result to curve basis
         if not self.is_baseless:
@@ -486,12 +522,16 @@ class Curve(HasBasis,IsParametrized):
         
         if t<self.domain.a or t>self.domain.b : raise DomainError("Curve evaluated outside the bounds of its domain: deval(%s) %s"%(t,self.domain))
 
-        pt_t = self.func(t)
+        ts = [t]
+        if (t-self.tol_nudge >= self.domain.a): ts.append(t - self.tol_nudge)
+        if (t+self.tol_nudge <= self.domain.b): ts.append(t + self.tol_nudge)
+        pts = dict(zip(ts,self._sample_many(ts))) # neighbors are evaluated together, in a single call to any array function
+        pt_t = pts[t]
         vec_minus = False
         vec_plus = False
 
-        if (t-self.tol_nudge >= self.domain.a): vec_minus = Vec(pt_t, self.func(t - self.tol_nudge))
-        if (t+self.tol_nudge <= self.domain.b): vec_plus = Vec(pt_t,self.func(t + self.tol_nudge))
+        if (t-self.tol_nudge >= self.domain.a): vec_minus = Vec(pt_t, pts[t - self.tol_nudge])
+        if (t+self.tol_nudge <= self.domain.b): vec_plus = Vec(pt_t, pts[t + self.tol_nudge])
 
         if not vec_plus: vec_plus = vec_minus.inverted()
         if not vec_minus: vec_minus = vec_plus.inverted()
@@ -515,7 +555,7 @@ class Curve(HasBasis,IsParametrized):
            
                 divs=crv.divide(5)
         """
-        return [self.deval(t) for t in self.domain.divide(divs,include_last)]
+        return self._deval_many(self.domain.divide(divs,include_last))
 
     def subdivide(self, divs):
         """| Divides this Curve into a list of equal size sub-Curves.
@@ -524,7 +564,7 @@ class Curve(HasBasis,IsParametrized):
            :param divs: Number of subcurves.
            :type divs: int
            :returns: List of sub-Curves. 
-           :rtype: [Curve]
+           :rtype: [SubCurve]
            
         """
         curves = []
@@ -532,22 +572,74 @@ class Curve(HasBasis,IsParametrized):
         return curves
 
     def subcurve(self,domain,tol=None):
-        """ Returns a new Curve which is a copy of this Curve with the given Interval as the domain.
+        """ Returns a view of this Curve limited to the given Interval of its domain, which shares the function, basis and cached evaluations of this Curve.
         
            :param domain: New curve with a new given interval.
            :type domain: Interval
            :param tol: Tolerance of point on a subcurve.
            :type tol: float
-           :result: Copy of curve with new domain.
-           :rtype: Curve
+           :result: View of curve with new domain.
+           :rtype: SubCurve
             
            ::
                 
                 sub_curv=crv.subcurve(Interval(5,10))            
         """
-        if tol is None: tol = self.tol
-        if tol > domain.delta/10.0 : tol = domain.delta/10.0
-        return Curve(self.func,domain,tol)
+        return SubCurve(self,domain,tol)
+
+    def _sample(self, t):
+        """ Returns the result of the function of this Curve at the given parameter, reusing any earlier evaluation at the same parameter by this Curve or by a view of it.
+            As the function of a Curve is given in local coordinates, evaluations may also be shared by copies of a Curve that differ only in their basis.
+        """
+        samples = self._sample_cache()
+        try:
+            pt = samples[t]
+        except KeyError:
+            pt = self.func(t)
+            if len(samples) >= self.sample_cache_size : samples.clear()
+            samples[t] = pt
+        return copy.copy(pt) # stored points are not handed out, as they may be altered
+
+    def _sample_cache(self):
+        try:
+            return self._samples
+        except AttributeError:
+            self._samples = {}
+            return self._samples
+
+    def _sample_many(self, ts):
+        """ Returns the results of the function of this Curve at each of the given parameters, as does _sample.
+            Where this Curve has an array function, any parameters not already stored are evaluated by a single call to it.
+        """
+        if self._array_func is None : return [self._sample(t) for t in ts]
+        samples = self._sample_cache()
+        found = dict([(t,samples[t]) for t in ts if t in samples])
+        missing = sorted(set([t for t in ts if t not in found]))
+        if missing:
+            xs, ys, zs = self._array_func(missing)
+            fresh = [Point(x,y,z) for x,y,z in zip(xs,ys,zs)]
+            if len(fresh) != len(missing) : raise GeometricError("Curve not valid: The given array function returned %s points for %s t-values"%(len(fresh),len(missing)))
+            if len(samples)+len(fresh) > self.sample_cache_size : samples.clear()
+            for t, pt in zip(missing,fresh):
+                found[t] = pt
+                if len(samples) < self.sample_cache_size : samples[t] = pt
+        return [copy.copy(found[t]) for t in ts]
+
+    def _deval_many(self, ts):
+        """ Evaluates this Curve at each of the given t-values, as does deval, and returns a list of Points.
+            Where this Curve has an array function, it is called once for all of the given t-values.
+        """
+        for n, t in enumerate(ts):
+            if t<self.domain.a or t>self.domain.b : 
+                t = round(t,7) # this may be due to a rounding problem, try rounding to 7 decimal places
+                if t<self.domain.a or t>self.domain.b : raise DomainError("Curve evaluated outside the bounds of its domain: deval(%s) %s"%(t,self.domain))
+                if not isinstance(ts,list) : ts = list(ts)
+                ts[n] = t
+        pts = self._sample_many(ts)
+        if not self.is_baseless:
+            xf = self.basis.xform
+            pts = [pt*xf for pt in pts]
+        return pts
 
     def _nearfar(self,func_nf,pt,tolerance,max_recursion,idivs=8):
         """ Calculates curve subdivisions.
@@ -592,18 +684,344 @@ class Curve(HasBasis,IsParametrized):
         return t
 
 
+    def near(self,pt,tolerance=None,max_recursion=20,resolution=8):
+        """| Finds a location on this curve which is nearest to the given Point.
+           | Candidate locations are found using an index of the segments of the adaptive surrogate of this curve, and each is refined by Brent's method until known to within the given tolerance in domain space.
+           | Returns a tuple containing a Point, a t-value associated with this point, and the distance from this Point to the given Point.
+            
+           :param pt: Point to look for the nearest point on a curve.
+           :type pt: Point
+           :param tolerance: Tolerance in domain space to which the t-value is found. Defaults to a billionth of the domain of this curve.
+           :type tolerance: float
+           :param max_recursion: Accepted for compatibility with IsParametrized.near, and ignored, as this search does not recurse.
+           :type max_recursion: int
+           :param resolution: Accepted for compatibility with IsParametrized.near, and ignored, as candidates are drawn from the adaptive surrogate of this curve.
+           :type resolution: int
+           :result: Tuple containing a Point, a t-value associated with this point, and the distance from this Point to the given Point.
+           :rtype: (Point, float, float)
+           
+           ::
+
+                def func(u):
+                    return Point(math.sin(u),u)
+                Inv=Interval(0,20)
+                crv = Curve(func,Inv)
+
+                n_tup=crv.near(Point(0,0,0))
+
+        """
+        if tolerance is None : tolerance = self.domain.delta*1e-9
+        tree = self._near_tree()
+        best = None
+        for seg in tree.candidates(pt.x,pt.y,pt.z):
+            a, b = tree.ts[max(0,seg-1)], tree.ts[min(len(tree.ts)-1,seg+2)] # the nearest point is bracketed by the neighbors of its segment
+            x = tree.ts[seg] + tree.param(seg,pt.x,pt.y,pt.z)*(tree.ts[seg+1]-tree.ts[seg])
+            t, d2 = _brent_min(lambda t: self.deval(t).distance2(pt),a,b,x,tolerance)
+            if best is None or d2 < best[1] : best = (t,d2)
+        t = best[0]
+        result = self.deval(t)
+        return(result,t,pt.distance(result))
+
+    def near_pt(self,pt,tolerance=None,max_recursion=20,resolution=8):
+        """| Returns the nearest point on this curve to the given Point, as found by Curve.near.
+            
+           :param pt: Point to look for the nearest point on a curve.
+           :type pt: Point
+           :param tolerance: Tolerance in domain space to which the t-value is found.
+           :type tolerance: float
+           :param max_recursion: Ignored, as by Curve.near.
+           :type max_recursion: int
+           :param resolution: Ignored, as by Curve.near.
+           :type resolution: int
+           :result: Nearest Point on this Curve.
+           :rtype: Point
+        """
+        return self.near(pt,tolerance,max_recursion,resolution)[0]
+
+    def near_many(self,pts,tolerance=None,max_recursion=20,resolution=8):
+        """| Finds the locations on this curve nearest to each of the given Points, as found by Curve.near.
+           | The index of the surrogate of this curve is built once, and shared by all queries.
+            
+           :param pts: Points to look for the nearest points on a curve.
+           :type pts: [Point] or PointArray
+           :param tolerance: Tolerance in domain space to which each t-value is found.
+           :type tolerance: float
+           :param max_recursion: Ignored, as by Curve.near.
+           :type max_recursion: int
+           :param resolution: Ignored, as by Curve.near.
+           :type resolution: int
+           :result: The nearest Points, the t-values associated with them, and their distances from the given Points.
+           :rtype: ([Point], [float], [float])
+           
+           ::
+
+                near_pts, ts, dists = crv.near_many(cloud)
+        """
+        near_pts, ts, dists = [], [], []
+        for pt in pts:
+            npt, t, dist = self.near(pt,tolerance,max_recursion,resolution)
+            near_pts.append(npt)
+            ts.append(t)
+            dists.append(dist)
+        return near_pts, ts, dists
+
+    def _near_tree(self):
+        """ Returns an index of the segments of the adaptive surrogate of this curve, which is stored until the surrogates of this curve are rebuilt or its basis changes.
+        """
+        return self._world_cached('near_segments',lambda: _SegmentTree(*self._adaptive_samples()))
+
     def _to_pline(self):
         """ Creates a PLine from a curve.
 
             :result: Returns a PLine built from a curve.
             :rtype: PLine
         """
-        return PLine([self.deval(t) for t in self.domain.divide(int(math.ceil(self.domain.delta/self.tol)),True)])
+        return PLine(self._deval_many(self.domain.divide(int(math.ceil(self.domain.delta/self.tol)),True)))
+
+
+    def adaptive_pline(self, dist_tol=None, angle_tol=None, max_evals=None):
+        """| Creates a PLine from this Curve by sampling it adaptively, refining only where the curve departs from a straight line.
+           | The domain is first divided into a few equal spans. A span is then divided in half wherever the point at its middle lies further than dist_tol from the chord across it, or where the curve turns by more than angle_tol at that point.
+           | The spans that most exceed these tolerances are divided first, and division stops once max_evals points have been evaluated.
+
+           :param dist_tol: Distance in model space by which the PLine may depart from this Curve. Defaults to Curve.adaptive_dist_ratio of the size of this Curve.
+           :type dist_tol: float
+           :param angle_tol: Angle in radians by which the PLine may turn at any vertex. Defaults to Curve.adaptive_angle_tol.
+           :type angle_tol: float
+           :param max_evals: Maximum number of evaluations of this Curve. Defaults to Curve.adaptive_max_evals.
+           :type max_evals: int
+           :result: Polyline of curve.
+           :rtype: PLine
+           
+           ::
+           
+                pl = crv.adaptive_pline(0.01)
+        """
+        return PLine(self._adaptive_samples(dist_tol,angle_tol,max_evals)[1])
 
+    def _adaptive_samples(self, dist_tol=None, angle_tol=None, max_evals=None):
+        """ Returns the parameters and Points at which this Curve is sampled by adaptive_pline, in order along the domain.
+        """
+        if angle_tol is None : angle_tol = self.adaptive_angle_tol
+        if max_evals is None : max_evals = self.adaptive_max_evals
+        seeds = max(1,min(self.adaptive_seeds,max_evals-1))
+        ts = self.domain.divide(seeds,True)
+        pts = self._deval_many(ts+[self.domain.eval(0.5/seeds)])
+        ext, pts = pts, pts[:-1]
+        evals = len(ts)
+        if dist_tol is None :
+            # the size of this curve is taken from the bounds of the initial samples, with a midpoint to catch closed curves
+            size = math.sqrt(sum([(max(vals)-min(vals))**2 for vals in ([p.x for p in ext],[p.y for p in ext],[p.z for p in ext])]))
+            dist_tol = self.adaptive_dist_ratio * size
+            evals += 1
+        dist_tol = max(dist_tol,EPSILON)
+        min_span = self.domain.delta * 1e-9 # spans are not divided beyond this, such that discontinuities do not exhaust evaluations
+
+        samples = dict(zip(ts,pts))
+        def scores(spans):
+            # evaluates the middles of the given spans together, and measures how much each exceeds the given tolerances
+            tms = [(t0+t1)/2.0 for t0,t1 in spans]
+            return [score(t0,tm,t1,pm) for (t0,t1),tm,pm in zip(spans,tms,self._deval_many(tms))]
+
+        def score(t0,tm,t1,pm):
+            p0, p1 = samples[t0], samples[t1]
+            chord, va, vb = Vec(p0,p1), Vec(p0,pm), Vec(pm,p1)
+            if chord.length2 > 0 : dev = va.cross(chord).length / chord.length
+            else : dev = va.length
+            ang = 0.0
+            if va.length2 > 0 and vb.length2 > 0 : ang = math.acos(max(-1.0,min(1.0,va.dot(vb)/(va.length*vb.length))))
+            return max(dev/dist_tol, ang/angle_tol), tm, pm
+
+        heap = []
+        spans = list(zip(ts[:-1],ts[1:]))[:max(0,max_evals-evals)]
+        for (t0,t1),(err,tm,pm) in zip(spans,scores(spans)):
+            evals += 1
+            if err > 1 : heapq.heappush(heap,(-err,t0,t1,tm,pm))
+        while heap and evals < max_evals :
+            err, t0, t1, tm, pm = heapq.heappop(heap)
+            samples[tm] = pm
+            if tm-t0 < min_span : continue
+            spans = [(t0,tm),(tm,t1)][:max_evals-evals]
+            for (a,b),(err,sub_tm,sub_pm) in zip(spans,scores(spans)):
+                evals += 1
+                if err > 1 : heapq.heappush(heap,(-err,a,b,sub_tm,sub_pm))
+
+        ts = sorted(samples)
+        return ts, [samples[t] for t in ts]
 
     def _rebuild_surrogate(self):
-        self._surrogate = self._to_pline()
+        """ Discards the surrogates of this Curve and any evaluations stored by it, such that they are rebuilt when next requested.
+        """
+        self._world_cache = {}
+        self._sample_cache().clear()
+
+    def _world_cached(self, name, calc):
+        """ Returns the value stored under the given name, calculating it using the given function if it has not yet been calculated, or if the basis of this Curve has changed since.
+            Values stored in this way are found in world coordinates. As the basis of a Curve may be replaced or altered without its knowledge, the transformation of its basis is stored alongside each value, and compared when the value is requested.
+        """
+        key = self._basis_key()
+        try:
+            cache = self._world_cache
+        except AttributeError:
+            cache = self._world_cache = {}
+        try:
+            stored_key, value = cache[name]
+            if stored_key == key: return value
+        except KeyError:
+            pass
+        value = calc()
+        cache[name] = (key, value)
+        return value
+
+    def _basis_key(self):
+        if self.is_baseless : return None
+        try:
+            return tuple(self._basis.xform._m)
+        except AttributeError:
+            return id(self._basis)
+
+    @property
+    def adaptive_surrogate(self): 
+        """ Returns a polyline representation of this curve that is sampled adaptively, with points concentrated where this curve bends, using the default tolerances of Curve.adaptive_pline. This is the representation that outies draw.
+        
+            :result: Polyline of curve.
+            :rtype: PLine
+            
+            ::
+            
+                surg=crv.adaptive_surrogate
+        
+        """
+        return self._world_cached('adaptive_surrogate',self.adaptive_pline)
+
+
+    def _length_table(self):
+        """ Returns a table of the lengths of this Curve measured from the start of its domain, as a tuple of a list of t-values and a list of the lengths at each, which is stored until the surrogates of this curve are rebuilt or its basis changes.
+            The table begins with the adaptive samples of this Curve. Each span is divided in half until the chords across its halves are no more than Curve.arc_length_tol longer than the chord across it, with the middles of all the spans of a pass evaluated together.
+            The length of each span is then extrapolated from the lengths of its chords.
+        """
+        return self._world_cached('arc_lengths',self._calc_length_table)
+
+    def _calc_length_table(self):
+        ts, pts = self._adaptive_samples()
+        min_span = self.domain.delta * 1e-9
+        max_evals = self.adaptive_max_evals * 8
+        spans = list(zip(ts[:-1],ts[1:],pts[:-1],pts[1:]))
+        done = {} # the extrapolated lengths of spans that need no further division, keyed by their starting t-value
+        evals = 0
+        while spans:
+            tms = [(t0+t1)/2.0 for t0,t1,p0,p1 in spans]
+            evals += len(tms)
+            divided = []
+            for (t0,t1,p0,p1), tm, pm in zip(spans,tms,self._deval_many(tms)):
+                chord = p0.distance(p1)
+                halves = p0.distance(pm), pm.distance(p1)
+                if halves[0]+halves[1]-chord <= self.arc_length_tol*(halves[0]+halves[1]) or tm-t0 < min_span or evals >= max_evals:
+                    extra = (halves[0]+halves[1]-chord)/3.0 # Richardson extrapolation, as the error of a chord falls by a quarter with each halving
+                    for (a,h) in ((t0,halves[0]),(tm,halves[1])):
+                        done[a] = h + extra*h/(halves[0]+halves[1]) if halves[0]+halves[1] > 0 else h
+                else:
+                    divided.extend([(t0,tm,p0,pm),(tm,t1,pm,p1)])
+            spans = divided
+        table_ts = sorted(done)
+        lengths = [0.0]
+        for t in table_ts: lengths.append(lengths[-1]+done[t])
+        return (table_ts+[ts[-1]], lengths)
+
+    def t_at_length(self, length):
+        """| Returns the t-value at which this Curve reaches the given length, measured along this curve from the start of its domain.
+           | The t-value is found by a binary search of the arc-length table of this Curve.
+
+           :param length: Length along this Curve, between zero and Curve.appx_length.
+           :type length: float
+           :result: t-value.
+           :rtype: float
+           
+           ::
+           
+                t = crv.t_at_length(2.5)
+        """
+        ts, lengths = self._length_table()
+        if length < 0 or length > lengths[-1] : 
+            if abs(length) > EPSILON and abs(length-lengths[-1]) > EPSILON : raise DomainError("Curve evaluated beyond its length: t_at_length(%s) Curve.appx_length=%s"%(length,lengths[-1]))
+            length = min(max(length,0.0),lengths[-1])
+        n = max(1,min(len(ts)-1,bisect.bisect_left(lengths,length)))
+        s0, s1 = lengths[n-1], lengths[n]
+        if s1 <= s0 : return ts[n]
+        t = ts[n-1] + (ts[n]-ts[n-1])*(length-s0)/(s1-s0)
+        # as the speed of a curve varies across a span, t is interpolated quadratically through a neighboring entry of the table where one is available
+        m = n+1 if n+1 < len(ts) else n-2
+        if m < 0 or lengths[m] in (s0,s1) : return t
+        s2 = lengths[m]
+        t += (length-s0)*(length-s1)/(s2-s0)/(s2-s1) * (ts[m] - ts[n-1] - (ts[n]-ts[n-1])*(s2-s0)/(s1-s0))
+        return min(max(t,ts[n-1]),ts[n])
+
+    def eval_at_length(self, length):
+        """| Evaluates this Curve at the given length, measured along this curve from the start of its domain, and returns a Point.
+
+           :param length: Length along this Curve, between zero and Curve.appx_length.
+           :type length: float
+           :result: Point on the Curve.
+           :rtype: Point
+           
+           ::
+           
+                pt = crv.eval_at_length(2.5)
+        """
+        return self.deval(self.t_at_length(length))
+
+    def divide_by_length(self, divs=10, include_last=True):
+        """| Divides this Curve into a list of Points equally spaced along its length.
+           | If include_last is True (by default), returned list will contain divs+1 Points.
+
+           :param divs: Number of segments of equal length to divide this curve into.
+           :type divs: int
+           :param include_last: Boolean Value.
+           :type include_last: bool
+           :returns: List of points 
+           :rtype: [Point]
+           
+           ::
+           
+                pts=crv.divide_by_length(5)
+        """
+        return self._deval_many([self.t_at_length(s) for s in Interval(0,self.appx_length).divide(divs,include_last)])
 
+    def divide_by_distance(self, dist, include_last=True):
+        """| Divides this Curve into a list of Points spaced the given length apart along this curve, beginning at the start of its domain.
+           | Any remainder is left at the end of this curve. If include_last is True (by default), the end of this curve is included wherever the remainder is not negligible.
+
+           :param dist: Length along this Curve between Points.
+           :type dist: float
+           :param include_last: Boolean Value.
+           :type include_last: bool
+           :returns: List of points 
+           :rtype: [Point]
+           
+           ::
+           
+                pts=crv.divide_by_distance(0.5)
+        """
+        if dist <= 0 : raise ValueError("Curve.divide_by_distance requires a positive distance. You gave me %s"%(dist))
+        length = self.appx_length
+        count = int(math.floor(length/dist + EPSILON))
+        lengths = [n*dist for n in range(count+1)]
+        if include_last and length-lengths[-1] > EPSILON : lengths.append(length)
+        return self._deval_many([self.t_at_length(min(s,length)) for s in lengths])
+
+    def arc_length_view(self):
+        """| Returns a view of this Curve which is parametrized by its length, such that its domain runs from zero to Curve.appx_length, and equal spans of its domain cover equal lengths of this curve.
+           | The view shares the function, basis and arc-length table of this Curve.
+
+           :result: View of curve parametrized by length.
+           :rtype: ArcLengthCurve
+           
+           ::
+           
+                view = crv.arc_length_view()
+                mid_pt = view.eval(0.5)
+        """
+        return ArcLengthCurve(self)
 
     @staticmethod
     def circle(ctr=Point(),rad=1.0,ival=Interval.twopi()):
@@ -621,7 +1039,9 @@ class Curve(HasBasis,IsParametrized):
             x = rad*math.cos(t)
             y = rad*math.sin(t)
             return Point(x,y)+ctr
-        return Curve(func,ival)
+        def array_func(ts):
+            return [rad*math.cos(t)+ctr.x for t in ts], [rad*math.sin(t)+ctr.y for t in ts], [ctr.z]*len(ts)
+        return Curve(func,ival,array_function=array_func)
 
     @staticmethod
     def helix(ctr,rad,rise_per_turn=1.0,number_of_turns=3.0):
@@ -646,7 +1066,9 @@ class Curve(HasBasis,IsParametrized):
             y = rad*math.sin(t)
             z = b*t
             return Point(x,y,z)+ctr
-        return Curve(func,Interval(0,math.pi*2*number_of_turns))
+        def array_func(ts):
+            return [rad*math.cos(t)+ctr.x for t in ts], [rad*math.sin(t)+ctr.y for t in ts], [b*t+ctr.z for t in ts]
+        return Curve(func,Interval(0,math.pi*2*number_of_turns),array_function=array_func)
 
     @staticmethod
     def bezier(cpts):
@@ -663,8 +1085,16 @@ class Curve(HasBasis,IsParametrized):
             pts = cpts
             while len(pts) > 1: pts = [Point.interpolate(pts[n],pts[n+1],t) for n in range(len(pts)-1)]
             return pts[0]
+        def array_func(ts):
+            # de Casteljau's algorithm, applied to all the given t-values at once
+            coords = []
+            for vals in ([p.x for p in cpts],[p.y for p in cpts],[p.z for p in cpts]):
+                rows = [[v]*len(ts) for v in vals]
+                while len(rows) > 1: rows = [[a+(b-a)*t for a,b,t in zip(rows[n],rows[n+1],ts)] for n in range(len(rows)-1)]
+                coords.append(rows[0])
+            return tuple(coords)
 
-        return Curve(func)
+        return Curve(func,array_function=array_func)
 
     @staticmethod
     def hermite(cpts, tension=0.0, bias = 0.0):
@@ -711,7 +1141,250 @@ class Curve(HasBasis,IsParametrized):
                     a2 = t3 - t2
                     a3 = -2*t3 + 3*t2
                     return( p1*a0 + m0*a1 + m1*a2 + p2*a3 )
+
+        starts = [ival.a for ival in ivals]
+        tau = 0.5*(1-tension)*(1+bias)
+        def array_func(ts):
+            # each t-value is assigned to its span by a binary search of the starts of the spans
+            xs, ys, zs = [], [], []
+            for t in ts:
+                n = max(0,min(len(ivals)-1,bisect.bisect_right(starts,t*sum)-1))
+                t = ivals[n].deval(t*sum)
+                t2, t3 = t**2, t**3
+                a0, a1, a2, a3 = 2*t3 - 3*t2 + 1, t3 - 2*t2 + t, t3 - t2, -2*t3 + 3*t2
+                p0, p1, p2, p3 = cpts[n:n+4]
+                xs.append( p1.x*a0 + (p2.x-p0.x)*tau*a1 + (p3.x-p1.x)*tau*a2 + p2.x*a3 )
+                ys.append( p1.y*a0 + (p2.y-p0.y)*tau*a1 + (p3.y-p1.y)*tau*a2 + p2.y*a3 )
+                zs.append( p1.z*a0 + (p2.z-p0.z)*tau*a1 + (p3.z-p1.z)*tau*a2 + p2.z*a3 )
+            return xs, ys, zs
                     
-        return Curve(func)
+        return Curve(func,array_function=array_func)
+
+
+
 
+class _SegmentTree(object):
+    """
+    A bounding volume hierarchy of the segments of a sampled curve, used to find the segments nearest to a given point.
+    As neighboring segments of a curve lie near one another, the hierarchy is built by halving runs of consecutive segments, and is stored in flat arrays.
+    """
+    leaf_size = 4
+
+    def __init__(self, ts, pts):
+        self.ts = ts
+        self.xs, self.ys, self.zs = [p.x for p in pts], [p.y for p in pts], [p.z for p in pts]
+        lo, hi, left, right, box = [], [], [], [], []
+        stack = [(0,max(1,len(ts)-1),-1,False)] # (first segment, end segment, parent node, is right child)
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(lo)
+            if parent >= 0:
+                if is_right : right[parent] = node
+                else : left[parent] = node
+            lo.append(start)
+            hi.append(end)
+            left.append(-1)
+            right.append(-1)
+            last = min(end+1,len(ts)) # a run of segments spans the points from its first to one past its last
+            for vals in (self.xs, self.ys, self.zs): box.append(min(vals[start:last]))
+            for vals in (self.xs, self.ys, self.zs): box.append(max(vals[start:last]))
+            if end-start <= self.leaf_size : continue
+            mid = (start+end)//2
+            stack.append((mid,end,node,True))
+            stack.append((start,mid,node,False))
+        self._lo, self._hi, self._left, self._right, self._box = lo, hi, left, right, box
+
+    def param(self, seg, x, y, z):
+        """ Returns the normalized parameter of the point on the given segment nearest to the given coordinates.
+        """
+        xs, ys, zs = self.xs, self.ys, self.zs
+        if seg+1 >= len(xs) : return 0.0
+        dx, dy, dz = xs[seg+1]-xs[seg], ys[seg+1]-ys[seg], zs[seg+1]-zs[seg]
+        l2 = dx*dx+dy*dy+dz*dz
+        if l2 == 0 : return 0.0
+        return max(0.0,min(1.0,((x-xs[seg])*dx+(y-ys[seg])*dy+(z-zs[seg])*dz)/l2))
+
+    def _seg_dist2(self, seg, x, y, z):
+        u = self.param(seg,x,y,z)
+        i, j = seg, min(seg+1,len(self.xs)-1)
+        px, py, pz = self.xs[i]+u*(self.xs[j]-self.xs[i]), self.ys[i]+u*(self.ys[j]-self.ys[i]), self.zs[i]+u*(self.zs[j]-self.zs[i])
+        return (px-x)**2 + (py-y)**2 + (pz-z)**2
+
+    def _box_dist2(self, node, x, y, z):
+        b, o, d = self._box, node*6, 0.0
+        for v, n in ((x,0),(y,1),(z,2)):
+            if v < b[o+n] : d += (b[o+n]-v)**2
+            elif v > b[o+n+3] : d += (v-b[o+n+3])**2
+        return d
+
+    def candidates(self, x, y, z, limit=3):
+        """ Returns the index of the segment nearest to the given coordinates, followed by the indices of up to limit-1 segments elsewhere along the curve that are nearly as near, which may lie nearer to the curve itself.
+            Segments are visited in order of the distance to their bounding boxes.
+        """
+        found = []
+        queue = [(self._box_dist2(0,x,y,z),0)]
+        bound = float('inf') # segments that are nearly as near as the nearest may be nearer once refined
+        while queue:
+            d2, node = heapq.heappop(queue)
+            if d2 > bound : break
+            if self._left[node] < 0 :
+                for seg in range(self._lo[node],self._hi[node]):
+                    sd2 = self._seg_dist2(seg,x,y,z)
+                    found.append((sd2,seg))
+                    bound = min(bound,(math.sqrt(sd2)*1.01 + 1e-12)**2)
+            else:
+                for child in (self._left[node],self._right[node]):
+                    cd2 = self._box_dist2(child,x,y,z)
+                    if cd2 <= bound : heapq.heappush(queue,(cd2,child))
+        found.sort()
+        segs = []
+        for d2, seg in found:
+            if d2 > bound : break
+            if all([abs(seg-other) > 2 for other in segs]) : segs.append(seg) # neighbors of a candidate are already bracketed by it
+            if len(segs) >= limit : break
+        return segs
+
+
+def _brent_min(func, a, b, x, tol, max_iter=100):
+    """ Finds a minimum of the given function of one variable within the interval (a,b), beginning from a point x within it, by Brent's method of parabolic interpolation and golden section search.
+        Returns the location of the minimum, known to within the given tolerance, and the value of the function there.
+    """
+    golden = 0.3819660
+    if not a <= x <= b : x = (a+b)/2.0
+    v = w = x
+    fv = fw = fx = func(x)
+    d = e = 0.0
+    for n in range(max_iter):
+        xm = 0.5*(a+b)
+        tol1, tol2 = tol, 2.0*tol
+        if abs(x-xm) <= tol2-0.5*(b-a) : break
+        if abs(e) > tol1 :
+            r = (x-w)*(fx-fv)
+            q = (x-v)*(fx-fw)
+            p = (x-v)*q-(x-w)*r
+            q = 2.0*(q-r)
+            if q > 0 : p = -p
+            q = abs(q)
+            etemp, e = e, d
+            if abs(p) >= abs(0.5*q*etemp) or p <= q*(a-x) or p >= q*(b-x) :
+                e = a-x if x >= xm else b-x
+                d = golden*e
+            else :
+                d = p/q
+                u = x+d
+                if u-a < tol2 or b-u < tol2 : d = tol1 if xm >= x else -tol1
+        else :
+            e = a-x if x >= xm else b-x
+            d = golden*e
+        u = x+d if abs(d) >= tol1 else x+(tol1 if d >= 0 else -tol1)
+        u = min(max(u,a),b)
+        fu = func(u)
+        if fu <= fx :
+            if u >= x : a = x
+            else : b = x
+            v, w, x = w, x, u
+            fv, fw, fx = fw, fx, fu
+        else :
+            if u < x : a = u
+            else : b = u
+            if fu <= fw or w == x :
+                v, w = w, u
+                fv, fw = fw, fu
+            elif fu <= fv or v == x or v == w :
+                v, fv = u, fu
+    return x, fx
+
+
+class SubCurve(Curve):
+    """
+    A view of part of the domain of another Curve.
+
+    A SubCurve shares the function, basis and cached evaluations of the Curve it is taken from, and is not validated when constructed.
+    Like any Curve, its surrogate is not built until requested, such that taking a subcurve of a subcurve costs nothing until either is evaluated.
+    """
+
+    def __init__(self, crv, domain, tolerance=None):
+        """ Constructs a SubCurve object. If tolerance is None, the tolerance of the given Curve is adopted, unless greater than the tol_max of the SubCurve.
+        
+           :param crv: Curve to view.
+           :type crv: Curve
+           :param domain: Domain of the view, within the domain of the given Curve.
+           :type domain: Interval
+           :param tolerance: The tolerance of this view expressed in domain space.
+           :type tolerance: float
+           :result: SubCurve object.
+           :rtype: SubCurve
+            
+           :: 
+           
+                sub_curv = SubCurve(crv,Interval(5,10))
+        """
+        if isinstance(crv, SubCurve) : crv = crv.parent # views of views refer to the original curve
+        self._parent = crv
+        self._func = crv.func
+        self._array_func = crv.array_func
+        self._samples = crv._sample_cache()
+        self._dom = domain
+        if not crv.is_baseless : self._basis = crv.basis
+        if tolerance is None : tolerance = crv.tol
+        self._tol = min(tolerance,self.tol_max)
+
+    @property
+    def parent(self):
+        """ Returns the Curve of which this is a view.
+        
+            :result: Viewed curve.
+            :rtype: Curve
+        """
+        return self._parent
+
+
+class ArcLengthCurve(Curve):
+    """
+    A view of another Curve which is parametrized by its length.
+
+    The domain of an ArcLengthCurve runs from zero to the length of the Curve it is taken from, and each t-value is mapped to the t-value of that Curve at the same length, using the arc-length table of that Curve.
+    """
+
+    def __init__(self, crv, tolerance=None):
+        """ Constructs an ArcLengthCurve object. If tolerance is None, the tolerance of the given Curve is scaled to the domain of the view.
+        
+           :param crv: Curve to view.
+           :type crv: Curve
+           :param tolerance: The tolerance of this view expressed in domain space.
+           :type tolerance: float
+           :result: ArcLengthCurve object.
+           :rtype: ArcLengthCurve
+            
+           :: 
+           
+                view = ArcLengthCurve(crv)
+        """
+        self._parent = crv
+        length = crv.appx_length
+        if length <= 0 : raise GeometricError("ArcLengthCurve not valid: The given curve has no length")
+        self._dom = Interval(0,length)
+        if not crv.is_baseless : self._basis = crv.basis
+        if tolerance is None : tolerance = crv.tol * length / crv.domain.delta
+        self._tol = min(tolerance,self.tol_max)
+
+        # the function of the view returns the result of the function of its curve, in the local coordinates of their shared basis
+        def func(s): return crv._sample(crv.t_at_length(s))
+        def array_func(ss):
+            pts = crv._sample_many([crv.t_at_length(s) for s in ss])
+            return [p.x for p in pts], [p.y for p in pts], [p.z for p in pts]
+        self._func = func
+        self._array_func = array_func
+
+    @property
+    def parent(self):
+        """ Returns the Curve of which this is a view.
+        
+            :result: Viewed curve.
+            :rtype: Curve
+        """
+        return self._parent
 
+    @property
+    def appx_length(self):
+        return self.domain.b
@@ -2,7 +2,8 @@ from decodes.core import *
 from . import dc_base, dc_vec, dc_point #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
 if VERBOSE_FS: print("graph.py loaded")
 
-import math, itertools
+import math, itertools, heapq
+from array import array
 
 class Graph(object):
     """
@@ -12,6 +13,7 @@ class Graph(object):
         self.nodes = set() # a set is an unordered collection of unique elements
         self.edges = {}
         self.weights = {}
+        self._path_trees = {} # shortest path trees, keyed by source node, that persist until an edge is added
     
     def add_node(self, value):
         self.nodes.add(value)
@@ -34,6 +36,7 @@ class Graph(object):
         if not to_node in self.edges[from_node]:
             self.edges[from_node].append(to_node)
             self.weights[(from_node, to_node)] = weight
+            self._path_trees.clear()
             return True
         return False
 
@@ -50,70 +53,92 @@ class Graph(object):
         for n1, others in self.edges.items():
              for n2 in others: ret.append((n1,n2))
         return tuple(ret)
-    
-    """
-    Source:
-    http://forrst.com/posts/Dijkstras_algorithm_in_Python-B4U
-    [noprint]
-    """
-    """
-    A method that creates solves for the shortest possible path between nodes in a graph
-    """
-    def _calc_dijkstra(self, initial_node):
-        # set the current visited nodes and the distance travelled
-        visited = {initial_node: 0}
-        # set the current node as the initial node
-        current_node = initial_node
-        # create an empty dictionary for the path
-        path = {}
-    
-        # create a set of all the nodes in the graph
-        nodes = set(self.nodes)
-        # while there are still nodes in the set
-        while nodes:
-            # calculate the minimum node
-            min_node = None
-            for node in nodes:
-                if node in visited:
-                    if min_node is None:
-                        min_node = node
-                    elif visited[node] < visited[min_node]:
-                        min_node = node
-            if min_node is None:
-                break
-            # remove the current node from nodes
-            nodes.remove(min_node)
-            # get the distance to the current node
-            cur_wt = visited[min_node]
-            # for every edge connected to the current node:
-            for edge in self.edges[min_node]:
-                # record this edge to visited and path dicts
-                wt = cur_wt + self.weights[(min_node, edge)]
-                if edge not in visited or wt < visited[edge]:
-                    visited[edge] = wt
-                    path[edge] = min_node
-    
-        return visited, path
 
-    """
-    Given an initial node and an end node, this function returns the shortest path between them
-    """
-    def shortest_path(self, initial_node, goal_node):
-        # set distances and paths to the result of the dijkstra function
-        distances, paths = self._calc_dijkstra(initial_node)
-        # set the route as the goal node
-        route = [goal_node]
+    def _neighbors_weighted(self, node):
+        """ Returns the nodes at the end of each edge leaving the given node, paired with the weight of each edge.
+        """
+        return [(other, self.weights[(node, other)]) for other in self.edges.get(node, ())]
     
-        # while the goal node is not the same as the initial node
-        while goal_node != initial_node:
-            # add the current goal node to the route
-            route.append(paths[goal_node])
+    def _calc_dijkstra(self, initial_node):
+        """ Returns the distance to every node reachable from the given node, and the node that precedes each of these nodes along the shortest path from the given node.
+        """
+        tree = _PathTree(self, [initial_node])
+        tree.settle()
+        return tree.dist, tree.prev
+
+    def shortest_path(self, initial_node, goal_node, heuristic=None):
+        """| Returns the shortest path between the given nodes, or None if the goal node cannot be reached.
+           | Shortest path trees are retained for each initial node, and are only grown as far as needed to reach the requested goal, such that repeated queries from the same initial node do not repeat work.
+           | If a heuristic is given, an A* search is performed instead, which is not retained.
         
-            goal_node = paths[goal_node]
-    
-        # reverse the route list to start from the initial node
-        route.reverse()
-        return route
+            :param initial_node: Node at which to start.
+            :type initial_node: object
+            :param goal_node: Node at which to end.
+            :type goal_node: object
+            :param heuristic: Optional function that estimates the distance from a given node to the goal node without overestimating it.
+            :type heuristic: function
+            :result: List of nodes from the initial node to the goal node.
+            :rtype: list
+            
+            ::
+            
+                route = graph.shortest_path(node_a, node_b)
+        """
+        if heuristic is not None: tree = _PathTree(self, [initial_node], heuristic)
+        else: tree = self._path_tree(initial_node)
+        goal = tree.settle([goal_node])
+        if goal is None: return None
+        return tree.route(goal)
+
+    def shortest_distance(self, initial_node, goal_node):
+        """ Returns the length of the shortest path between the given nodes, or None if the goal node cannot be reached.
+        
+            :param initial_node: Node at which to start.
+            :type initial_node: object
+            :param goal_node: Node at which to end.
+            :type goal_node: object
+            :result: Sum of the weights of the edges along the shortest path.
+            :rtype: float
+        """
+        tree = self._path_tree(initial_node)
+        goal = tree.settle([goal_node])
+        if goal is None: return None
+        return tree.dist[goal]
+
+    def shortest_path_between(self, initial_nodes, goal_nodes):
+        """ Returns the shortest path that starts at any of the given initial nodes and ends at any of the given goal nodes, or None if no goal node can be reached.
+        
+            :param initial_nodes: Nodes at which a path may start.
+            :type initial_nodes: list
+            :param goal_nodes: Nodes at which a path may end.
+            :type goal_nodes: list
+            :result: List of nodes from the nearest initial node to the nearest goal node.
+            :rtype: list
+        """
+        tree = _PathTree(self, initial_nodes)
+        goal = tree.settle(goal_nodes)
+        if goal is None: return None
+        return tree.route(goal)
+
+    def distances_from(self, initial_nodes):
+        """ Returns the distance from the nearest of the given initial nodes to every reachable node.
+        
+            :param initial_nodes: Nodes from which to measure.
+            :type initial_nodes: list
+            :result: Dictionary of distances keyed by node.
+            :rtype: dict
+        """
+        tree = _PathTree(self, initial_nodes)
+        tree.settle()
+        return dict(tree.dist)
+
+    def _path_tree(self, initial_node):
+        try:
+            return self._path_trees[initial_node]
+        except KeyError:
+            tree = _PathTree(self, [initial_node])
+            self._path_trees[initial_node] = tree
+            return tree
 
 
 class SpatialGraph(Graph):
@@ -121,29 +146,31 @@ class SpatialGraph(Graph):
     A graph of spatial points
     A graph is indexed by object, not by position. This class ensures that duplicate point positions are not permitted.
     Collection of points given at construction are not checked for duplicates
+    
+    Node positions are indexed in a grid of cells sized to the given tolerance, such that finding the node at a position need only consider the nodes in neighboring cells.
+    Each node is assigned an integer id in the order it was added, which is its index in node_list.
     """
-    def __init__(self,initial_pts=False):
+    def __init__(self,initial_pts=False,tol=None):
         super(SpatialGraph,self).__init__()
         self.distances = {}
+        self.tol = EPSILON if tol is None else tol
+        self._node_list = []
+        self._node_ids = {}
+        self._cells = {}
         
         #self.qtree = QuadTree(4, bnds)
         #for pt in pts: qt.append(pt)
         
         if initial_pts:
-            for pt in initial_pts: self.add_node(pt)
+            for pt in initial_pts: self.add_node(pt, check_validity=False)
         
     """
     if not check validity, duplicate point locations are not checked, nor is the existence of the requested node in the set of nodes
     """
     def add_edge(self, from_node, to_node, bidirectional=True, check_validity=True):
         if check_validity:
-            na, nb = self.node_at(from_node), self.node_at(to_node)
-            if na: from_node = na
-            if nb: to_node = nb
-        
-            # make sure these nodes are in our list of nodes
-            if from_node not in self.nodes: self.add_node(from_node)
-            if to_node not in self.nodes: self.add_node(to_node)
+            from_node = self.add_node(from_node)
+            to_node = self.add_node(to_node)
         
         # add the edge
         dist = from_node.distance(to_node)   
@@ -152,17 +179,89 @@ class SpatialGraph(Graph):
         if bidirectional: success = success and self._add_edge(to_node, from_node, dist)
         return success
         
+    def add_edges_bulk(self, segments, bidirectional=True):
+        """| Adds an edge for each of the given segments in a single pass, snapping segment endpoints to existing nodes or to one another.
+           | Returns the ids of the nodes at the start and end of each segment.
+           
+            :param segments: Segments, or pairs of Points.
+            :type segments: [Segment] or [(Point,Point)]
+            :param bidirectional: If True, edges are added in both directions.
+            :type bidirectional: bool
+            :result: A tuple of node ids (start, end) for each of the given segments.
+            :rtype: [(int,int)]
+
+            ::
+            
+                ids = graph.add_edges_bulk([Segment(pa,pb),Segment(pb,pc)])
+                
+        """
+        ids = self._node_ids
+        existing = set((ids[na],ids[nb]) for na, nbs in self.edges.items() for nb in nbs if na in ids and nb in ids)
+        
+        ret = []
+        nodes = self._node_list
+        for seg in segments:
+            try: pa, pb = seg.spt, seg.ept
+            except AttributeError: pa, pb = seg
+            ia, ib = self._index_of(pa, True), self._index_of(pb, True)
+            ret.append((ia,ib))
+            if ia == ib: continue
+            pairs = [(ia,ib),(ib,ia)] if bidirectional else [(ia,ib)]
+            dist = None
+            for i, j in pairs:
+                if (i,j) in existing: continue
+                existing.add((i,j))
+                if dist is None: dist = nodes[i].distance(nodes[j])
+                self.edges.setdefault(nodes[i], []).append(nodes[j])
+                self.weights[(nodes[i], nodes[j])] = dist
+        self._path_trees.clear()
+        return ret
+
+    def astar_path(self, initial_pt, goal_pt):
+        """ Returns the shortest path between the nodes at the given positions, found by an A* search that is guided by the straight-line distance to the goal. Returns None if the goal cannot be reached.
         
+            :param initial_pt: Position at which to start.
+            :type initial_pt: Point
+            :param goal_pt: Position at which to end.
+            :type goal_pt: Point
+            :result: List of nodes from the initial position to the goal position.
+            :rtype: [Point]
+        """
+        initial_node, goal_node = self.node_at(initial_pt), self.node_at(goal_pt)
+        if initial_node is False or goal_node is False: return None
+        return self.shortest_path(initial_node, goal_node, heuristic=lambda node: node.distance(goal_node))
         
     def add_node(self, pt, check_validity=True):
-        if check_validity:
-            undup = self.node_at(pt)
-            if undup: pt = undup
+        """ Adds a node at the given position, unless a node already exists at this position. Returns the node at this position.
         
-        self.nodes.add(pt)
+            :param pt: Position of node.
+            :type pt: Point
+            :param check_validity: If False, the given point is added without checking for an existing node at this position.
+            :type check_validity: bool
+            :result: The node at the given position.
+            :rtype: Point
+        """
+        if check_validity: return self._node_list[self._index_of(pt, True)]
+        self._register(pt)
+        return pt
         
+    @property
+    def node_list(self):
+        """ Returns the nodes of this graph in the order they were added, such that the id of each node is its index in this list.
+        """
+        return list(self._node_list)
         
+    def node_id(self,pt):
+        """ Returns the id of the node at the given position, or None if there is no node at this position.
         
+            :param pt: Position to search.
+            :type pt: Point
+            :result: Node id.
+            :rtype: int
+        """
+        idx = self._index_of(pt)
+        if idx < 0: return None
+        return idx
         
     def to_segs(self):
         return [[Segment(spt,ept) for ept in epts] for spt, epts in list(self.edges.items())]
@@ -170,58 +269,276 @@ class SpatialGraph(Graph):
         
     def __contains__(self, pt):
         """| Overloads the containment **(in)** operator"""
-        return node_at(pt) is not False
+        return self.node_at(pt) is not False
         
     def node_at(self,pt):
-        for other in self.nodes:
-            if pt == other : return other
-        return False
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        idx = self._index_of(pt)
+        if idx < 0: return False
+        return self._node_list[idx]
+
+    def _cell(self, pt):
+        """ Returns the key of the cell of the position index that contains the given point.
+            Cells are twice the size of the tolerance of this graph, such that any node within tolerance lies in this cell or in one of the seven cells adjacent to the nearest corner of this cell.
+        """
+        size = 2.0*self.tol
+        return (int(math.floor(pt.x/size)), int(math.floor(pt.y/size)), int(math.floor(pt.z/size)))
+
+    def _index_of(self, pt, add=False):
+        """ Returns the id of the earliest node found at the given position, where positions are considered equal if each of their coordinates differ by less than the tolerance of this graph.
+            If no node is found, the given point is added as a new node if add is True, and -1 is returned otherwise.
+        """
+        if pt in self._node_ids: return self._node_ids[pt]
+        
+        tol, size = self.tol, 2.0*self.tol
+        x, y, z = pt.x, pt.y, pt.z
+        near = []
+        for v in (x, y, z):
+            u = v/size
+            c = int(math.floor(u))
+            near.append((c, c-1) if u-c < 0.5 else (c, c+1))
+            
+        match = -1
+        cells, nodes = self._cells, self._node_list
+        for key in itertools.product(*near):
+            for idx in cells.get(key,()):
+                if match >= 0 and idx > match: continue
+                other = nodes[idx]
+                if abs(x-other.x) < tol and abs(y-other.y) < tol and abs(z-other.z) < tol: match = idx
+        if match < 0 and add: match = self._register(pt)
+        return match
+
+    def _register(self, pt):
+        """ Adds the given point as a new node, and records its position in the index.
+        """
+        idx = len(self._node_list)
+        self.nodes.add(pt)
+        self._node_list.append(pt)
+        self._node_ids[pt] = idx
+        self._cells.setdefault(self._cell(pt),[]).append(idx)
+        return idx
 
 
 
+class CSRGraph(Graph):
+    """
+    A frozen directed, weighted graph, with nodes identified by consecutive integer ids.
+    Edges are stored in compressed sparse row form: the nodes at the end of the edges that leave node i are found at targets[offsets[i]:offsets[i+1]], and the weights of these edges at the same positions in edge_weights.
+    Shortest path queries take and return node ids, which may be related to the nodes of the graph this was built from by way of values.
+    """
+    def __init__(self, node_count, froms, tos, weights=None, bidirectional=False, values=None):
+        """ CSRGraph constructor.
+        
+            :param node_count: Number of nodes.
+            :type node_count: int
+            :param froms: Id of the node at which each edge starts.
+            :type froms: [int]
+            :param tos: Id of the node at which each edge ends.
+            :type tos: [int]
+            :param weights: Weight of each edge. Defaults to 1.0 for every edge.
+            :type weights: [float]
+            :param bidirectional: If True, an edge is also added in the reverse direction of each of the given edges.
+            :type bidirectional: bool
+            :param values: Optional object represented by each node.
+            :type values: list
+            :result: CSRGraph object.
+            :rtype: CSRGraph
+            
+            ::
+            
+                graph = CSRGraph(3, [0,1], [1,2], [1.0,2.5], bidirectional=True)
+        """
+        froms, tos = list(froms), list(tos)
+        if len(froms) != len(tos): raise ValueError("The same number of starting and ending nodes must be given.")
+        weights = [1.0]*len(froms) if weights is None else [float(w) for w in weights]
+        if len(weights) != len(froms): raise ValueError("A weight must be given for each edge.")
+        if froms and (min(min(froms),min(tos)) < 0 or max(max(froms),max(tos)) >= node_count): raise IndexError("Edges must join nodes with ids between 0 and {0}.".format(node_count-1))
+        if bidirectional: froms, tos, weights = froms+tos, tos+froms, weights+weights
+        if values is not None and len(values) != node_count: raise ValueError("A value must be given for each node.")
+        
+        # group edges by the node at which they start, preserving the order in which they were given
+        starts = [0]*(node_count+1)
+        for n in froms: starts[n+1] += 1
+        for n in range(node_count): starts[n+1] += starts[n]
+        pos = starts[:-1]
+        row_tos, row_wts = [0]*len(froms), [0.0]*len(froms)
+        for n, m, w in zip(froms, tos, weights):
+            p = pos[n]
+            row_tos[p], row_wts[p] = m, w
+            pos[n] = p+1
+        
+        # repeated edges are discarded, and the first weight given is kept, as in Graph.add_edge
+        self.offsets, self.targets, self.edge_weights = array('l',[0]), array('l'), array('d')
+        for n in range(node_count):
+            a, b = starts[n], starts[n+1]
+            row = row_tos[a:b]
+            if len(set(row)) == len(row):
+                self.targets.extend(row)
+                self.edge_weights.extend(row_wts[a:b])
+            else:
+                seen = set()
+                for m, w in zip(row, row_wts[a:b]):
+                    if m in seen: continue
+                    seen.add(m)
+                    self.targets.append(m)
+                    self.edge_weights.append(w)
+            self.offsets.append(len(self.targets))
+        
+        self.values = tuple(range(node_count)) if values is None else tuple(values)
+        self._path_trees = {}
+
+    @staticmethod
+    def from_graph(graph):
+        """ Returns a frozen copy of the given Graph. 
+            Nodes are assigned ids in the order of the node_list of the given graph, except for graphs of integers, which are ordered by value, such that a graph of the indices of mesh vertices assigns each vertex its own index as an id.
+            
+            :param graph: Graph to copy.
+            :type graph: Graph
+            :result: CSRGraph object.
+            :rtype: CSRGraph
+        """
+        values = graph.node_list
+        if all(isinstance(value, int) for value in values): values.sort()
+        ids = dict((value, n) for n, value in enumerate(values))
+        froms, tos, weights = [], [], []
+        for value in values:
+            for other, wt in graph._neighbors_weighted(value):
+                froms.append(ids[value])
+                tos.append(ids[other])
+                weights.append(wt)
+        return CSRGraph(len(values), froms, tos, weights, values=values)
 
+    @property
+    def nodes(self): 
+        """ Returns the ids of the nodes of this graph.
+        """
+        return range(len(self.values))
 
+    @property
+    def node_list(self): 
+        return list(self.nodes)
 
+    @property
+    def edges(self):
+        """ Returns a dictionary that relates the id of each node that has an edge leaving it to the ids of the nodes at the end of these edges.
+        """
+        offs, targets = self.offsets, self.targets
+        return dict((n, list(targets[offs[n]:offs[n+1]])) for n in self.nodes if offs[n+1] > offs[n])
 
+    @property
+    def node_pairs(self):
+        offs, targets = self.offsets, self.targets
+        return tuple((n, targets[k]) for n in self.nodes for k in range(offs[n], offs[n+1]))
 
+    def __repr__(self): return "csrgraph[{0} nodes ,{1} connections]".format(len(self.values),len(self.targets))
 
+    def add_node(self, value): raise TypeError("A CSRGraph cannot be altered.")
+    def add_edge(self, from_node, to_node, weight=1.0, bidirectional=True): raise TypeError("A CSRGraph cannot be altered.")
 
+    def node_id(self, value):
+        """ Returns the id of the node that represents the given value.
+        
+            :param value: Value of a node.
+            :type value: object
+            :result: Node id.
+            :rtype: int
+        """
+        try:
+            return self._ids[value]
+        except AttributeError:
+            self._ids = dict((v, n) for n, v in enumerate(self.values))
+            return self._ids[value]
+
+    def neighbors(self, node):
+        """ Returns the ids of the nodes at the end of each edge that leaves the given node.
+        
+            :param node: Node id.
+            :type node: int
+            :result: Node ids.
+            :rtype: array
+        """
+        return self.targets[self.offsets[node]:self.offsets[node+1]]
+
+    def degree(self, node):
+        """ Returns the number of edges that leave the given node.
+        
+            :param node: Node id.
+            :type node: int
+            :result: Number of edges.
+            :rtype: int
+        """
+        return self.offsets[node+1] - self.offsets[node]
+
+    def weight(self, from_node, to_node):
+        """ Returns the weight of the edge between the given nodes, or None if there is no such edge.
+        
+            :param from_node: Id of the node at which the edge starts.
+            :type from_node: int
+            :param to_node: Id of the node at which the edge ends.
+            :type to_node: int
+            :result: Weight of edge.
+            :rtype: float
+        """
+        for k in range(self.offsets[from_node], self.offsets[from_node+1]):
+            if self.targets[k] == to_node: return self.edge_weights[k]
+        return None
 
+    def _neighbors_weighted(self, node):
+        a, b = self.offsets[node], self.offsets[node+1]
+        return zip(self.targets[a:b], self.edge_weights[a:b])
 
 
 
+class _PathTree(object):
+    """
+    A shortest path tree that is grown outward from one or more source nodes, in order of distance, only as far as requested.
+    """
+    def __init__(self, graph, sources, heuristic=None):
+        self.graph = graph
+        self.dist = {}
+        self.prev = {}
+        self.settled = set()
+        self._heuristic = heuristic
+        self._heap = []
+        self._count = itertools.count() # breaks ties between equal priorities without comparing nodes
+        for node in sources:
+            self.dist[node] = 0.0
+            heapq.heappush(self._heap, (self._priority(node, 0.0), next(self._count), node))
+
+    def _priority(self, node, dist):
+        if self._heuristic is None: return dist
+        return dist + self._heuristic(node)
+
+    def settle(self, goals=None):
+        """ Grows this tree until the nearest of the given goals is settled, and returns that goal. If no goals are given, the tree is grown until all reachable nodes are settled. Returns None if no goal can be reached.
+        """
+        if goals is not None:
+            goals = set(goals)
+            found = [goal for goal in goals if goal in self.settled]
+            if found: return min(found, key=lambda goal: self.dist[goal])
+            
+        neighbors, dist, prev, settled, heap = self.graph._neighbors_weighted, self.dist, self.prev, self.settled, self._heap
+        while heap:
+            priority, count, node = heapq.heappop(heap)
+            if node in settled: continue
+            settled.add(node)
+            wt = dist[node]
+            for other, edge_wt in neighbors(node):
+                if other in settled: continue
+                other_wt = wt + edge_wt
+                if other not in dist or other_wt < dist[other]:
+                    dist[other] = other_wt
+                    prev[other] = node
+                    heapq.heappush(heap, (self._priority(other, other_wt), next(self._count), other))
+            if goals is not None and node in goals: return node
+        return None
+
+    def route(self, goal):
+        """ Returns the nodes along the path from a source node to the given settled node.
+        """
+        route = [goal]
+        while goal in self.prev:
+            goal = self.prev[goal]
+            route.append(goal)
+        route.reverse()
+        return route
 
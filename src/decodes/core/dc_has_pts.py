@@ -1,16 +1,21 @@
 from decodes.core import *
 from . import dc_base, dc_interval, dc_vec, dc_point, dc_plane, dc_cs #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
-import math, random, copy
+import math, random, copy, itertools
+from .dc_vec import _interleaved
 if VERBOSE_FS: print("has_pts.py loaded")
 
 
+_stamps = itertools.count(1) # a source of numbers that are never repeated, with which changes to HasPts objects are stamped
+
 class HasPts(HasBasis):
     """
     | A base class for anything that contains a list of vertices.
     | All HasPts classes also have bases.
     """
     
-    class_attr = ['_pts','_centroid'] # this list of props is unset any time this HasPts object changes
+    subclass_attr = [] # this list of props is unset any time this HasPts object changes. cached values should instead be stored using HasPts._cached
+    _verts_stamp = 0 # stamped any time the vertices of this object change
+    _basis_stamp = 0 # stamped any time the basis of this object changes
     
     def __init__(self, vertices=None,basis=None):
         """ A constructor for a list of vertices with a shared basis.
@@ -57,7 +62,7 @@ class HasPts(HasBasis):
            
         """
     
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         try:
             self._verts[index] = self._compatible_vec(other)
         except:
@@ -85,7 +90,7 @@ class HasPts(HasBasis):
             :rtype: None
             
         """
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed(verts=False,basis=True) # call this when the basis of this object changes
         self._basis = basis
 
     def __len__(self): 
@@ -106,7 +111,7 @@ class HasPts(HasBasis):
             :result: None
             :rtype: None
         """
-        self._unset_attr()  # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         for v in self._verts: v = v + vec
         self._vertices_changed() # call to trigger subclass handling of vertex manipulation
 
@@ -120,7 +125,7 @@ class HasPts(HasBasis):
            :result: New Vec.
            :rtype: Vec
         """  
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         from .dc_xform import Xform
         if isinstance(other, Xform) : return other * self
         else : 
@@ -136,29 +141,64 @@ class HasPts(HasBasis):
            :result: Point or list of points.
            :rtype: Point or [Point]
         """
-        try:
-            return copy.copy(self._pts)
-        except:
-            if self.is_baseless : self._pts =  tuple([Point(v) for v in self._verts])
-            else : self._pts =  tuple([Point(self._basis.eval(v)) for v in self._verts])
+        def calc():
+            c = self._world_coords()
+            return tuple([Point(x,y,z) for x,y,z in zip(c[0::3],c[1::3],c[2::3])])
+        return copy.copy(self._cached('pts',calc))
+
+    @property
+    def coords(self):
+        """| Returns a read-only view of the world coordinates of the vertices contained within this HasPts, interleaved such that the coordinates of the n-th vertex are found at [3n], [3n+1] and [3n+2].
+           | Unlike HasPts.pts, no Points are constructed, and the coordinates are not copied.
+
+           :result: Read-only sequence of coordinates.
+           :rtype: memoryview
+           
+           ::
+           
+                x, y, z = my_pline.coords[3*n:3*n+3]
+        """
+        return _read_only(self._world_coords())
+
+    @property
+    def pt_array(self):
+        """ Returns the vertices contained within this HasPts as a PointArray of world coordinates, which stores coordinates contiguously rather than as Points.
+
+           :result: Collection of points.
+           :rtype: PointArray
+        """
+        return PointArray.from_coords(self._world_coords())
 
-            return copy.copy(self._pts)
+    def _world_coords(self):
+        """ Returns a flat array of the interleaved world coordinates of the vertices of this object, which is stored until this object changes.
+        """
+        def calc():
+            verts = self._verts
+            xs, ys, zs = [v.x for v in verts],[v.y for v in verts],[v.z for v in verts]
+            if self.is_baseless : return _interleaved(xs,ys,zs)
+            return _interleaved(*self._basis._eval_xyz(xs,ys,zs))
+        return self._cached('coords',calc)
 
      
     def append(self,pts):
         self._append(pts)
         
     def _append(self,pts):   
-        self._unset_attr()
+        self._mark_changed() # call this when the vertices of this object change
+        if isinstance(pts, VecArray):
+            self._verts.extend(self._compatible_vecs(pts))
+            self._vertices_changed() # call to trigger subclass handling of vertex manipulation
+            return
         try : 
-            for p in pts : self._verts.append(self._compatible_vec(p))
+            vecs = self._compatible_vecs(list(pts))
         except : 
-            self._verts.append(self._compatible_vec(pts))
+            vecs = [self._compatible_vec(pts)]
+        self._verts.extend(vecs)
         self._vertices_changed() # call to trigger subclass handling of vertex manipulation
     
     def clear(self):
         """Clears this Geometry of all the Points contained within it."""
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         del self._verts[:]
 
     @property
@@ -168,11 +208,7 @@ class HasPts(HasBasis):
             :returns: Centroid (point).
             :rtype: Point
         """
-        try:
-            return self._centroid
-        except:
-            self._centroid = Point.centroid(self.pts)
-            return self._centroid
+        return self._cached('centroid',lambda: Point.centroid(self.pt_array))
         
     
     def reverse(self):
@@ -182,7 +218,7 @@ class HasPts(HasBasis):
             :rtype: HasPts
             
         """
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         self._verts.reverse()
         return self
 
@@ -196,7 +232,7 @@ class HasPts(HasBasis):
            :rtype: HasPts
                 
         """
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._mark_changed() # call this when the vertices of this object change
         if n > len(self._verts): n =  n%len(self._verts)
         if n < -len(self._verts): n =  -abs(n)%len(self._verts)
         self._verts = self._verts[n:] + self._verts[:n]
@@ -210,9 +246,10 @@ class HasPts(HasBasis):
         """
         # TODO: copy properties over
         clone = copy.copy(self)
-        clone._verts = [Vec(pt) for pt in self.pts]
+        c = self._world_coords()
+        clone._verts = [Vec(x,y,z) for x,y,z in zip(c[0::3],c[1::3],c[2::3])]
         clone.basis = None
-        clone._unset_attr()  # call this when any of storable properties (subclass_attr or class_attr) changes
+        clone._unset_attr() # call this to invalidate all cached values
         return clone
     
     def basis_stripped(self): 
@@ -224,7 +261,7 @@ class HasPts(HasBasis):
         # TODO: copy properties over
         clone = copy.copy(self)
         clone.basis = None
-        clone._unset_attr()  # call this when any of storable properties (subclass_attr or class_attr) changes
+        clone._unset_attr() # call this to invalidate all cached values
         return clone
 
 
@@ -251,28 +288,108 @@ class HasPts(HasBasis):
             raise GeometricError("Cannot find a representation of this thing that is compatible with a HasPts Geometry: "+str(other))
         
 
-    def _unset_attr(self):
-        """ Deletes class and sublcass attributes when possible.
+    def _compatible_vecs(self,others):
+        """ Returns a list of vectors compatible with the collection of vectors in this object, given a list, VecArray or PointArray.
+            Any Points given to a based object are devaluated by the basis of this object together, rather than one at a time.
         
+            :param others: Collection to make compatible.
+            :type others: list or VecArray
+            :result: List of new Vecs.
+            :rtype: [Vec]
+            
+        """
+        if isinstance(others, VecArray):
+            c = others.coords
+            xs, ys, zs = c[0::3], c[1::3], c[2::3]
+            if not self.is_baseless and isinstance(others, PointArray): xs, ys, zs = self._basis._deval_xyz(xs,ys,zs)
+            # a VecArray is interpreted in local coordinates, as are the world coordinates of a PointArray given to a baseless object
+            return [Vec(x,y,z) for x,y,z in zip(xs,ys,zs)]
+        
+        if self.is_baseless: return [self._compatible_vec(other) for other in others]
+        ret = [None if isinstance(other, Point) else self._compatible_vec(other) for other in others]
+        pt_idxs = [n for n, vec in enumerate(ret) if vec is None]
+        if pt_idxs:
+            pts = [others[n] for n in pt_idxs]
+            xs, ys, zs = self._basis._deval_xyz([p.x for p in pts],[p.y for p in pts],[p.z for p in pts])
+            for n, x, y, z in zip(pt_idxs, xs, ys, zs): ret[n] = Vec(x,y,z)
+        return ret
+
+    @property
+    def version(self):
+        """| Returns a number that changes any time the vertices or the basis of this object change.
+           | Downstream code (such as an outie or a spatial index) may store this number, and compare it later to detect a change without examining the vertices of this object.
+
+           :result: Version number.
+           :rtype: int
+        """
+        return max(self._verts_stamp, self._basis_stamp)
+
+    def _mark_changed(self, verts=True, basis=False):
+        """ Records a change to the vertices and/or basis of this object, which invalidates any cached values that depend upon them.
+        
+            :param verts: True if the vertices of this object have changed.
+            :type verts: bool
+            :param basis: True if the basis of this object has changed.
+            :type basis: bool
             :result: None
             :rtype: None
         """
-        try: 
-            del self._pts
-        except:
-            pass
-            
-        for attr in self.class_attr : 
+        stamp = next(_stamps)
+        if verts: self._verts_stamp = stamp
+        if basis: self._basis_stamp = stamp
+        for attr in self.subclass_attr : 
             try: delattr(self, attr)
-            except:
-                #print "can't unset ",attr
-                pass
-        if hasattr(self, 'subclass_attr'):
-            for attr in self.subclass_attr : 
-                try: delattr(self, attr)
-                except:
-                    #print "can't unset ",attr
-                    pass
+            except AttributeError: pass
+
+    def _cached(self, name, calc, world=True, stamp=None):
+        """| Returns the value cached under the given name, calculating it using the given function if it has not yet been calculated or if something it depends upon has changed since.
+           | Values that depend only upon the local coordinates of this object (world=False) remain valid when its basis changes.
+           | Subclasses that track other changes may instead give the stamp that a value depends upon.
+        
+            :param name: Name of cached value.
+            :type name: str
+            :param calc: Function that calculates this value.
+            :type calc: function
+            :param world: True if this value depends on the world coordinates of this object, and False if it depends only on local coordinates.
+            :type world: bool
+            :param stamp: Optional stamp to validate this value against, in place of the stamps of the vertices and basis of this object.
+            :type stamp: object
+            :result: Cached value.
+            :rtype: object
+        """
+        if stamp is None: stamp = (self._verts_stamp, self._basis_stamp) if world else self._verts_stamp
+        try:
+            cache = self._cache
+        except AttributeError:
+            cache = self._cache = {}
+        try:
+            cached_stamp, value = cache[name]
+            if cached_stamp == stamp: return value
+        except KeyError:
+            pass
+        value = calc()
+        cache[name] = (stamp, value)
+        return value
+
+    def _unset_attr(self):
+        """ Invalidates all cached values of this object. Call this after altering the vertices or basis of this object by some means that this object cannot detect.
+        
+            :result: None
+            :rtype: None
+        """
+        self._cache = {} # a copy of this object may share its cache with the original
+        self._mark_changed(verts=True,basis=True)
 
     def _vertices_changed(self):
-        pass
\ No newline at end of file
+        pass
+
+
+
+def _read_only(coords):
+    """ Returns a read-only view of the given array, or a read-only copy where such views are not supported (as under python 2).
+    """
+    try:
+        return memoryview(coords).toreadonly()
+    except (AttributeError, TypeError):
+        return tuple(coords)
+
@@ -1,5 +1,5 @@
 from decodes.core import *
-from . import dc_base, dc_vec, dc_point, dc_cs, dc_line, dc_mesh, dc_pgon
+from . import dc_base, dc_vec, dc_point, dc_cs, dc_line, dc_mesh, dc_pgon, dc_bvh
 if VERBOSE_FS: print("intersection.py loaded")
 
 
@@ -18,6 +18,7 @@ class Intersector(object):
         self._geom = []
         self.log = None
         self.tol = EPSILON
+        self.faces = [] # the indices of any mesh faces struck by the last intersection
 
     def __getitem__(self,slice):
         """Returns intersection geometry at given index.
@@ -62,6 +63,7 @@ class Intersector(object):
     
         del self._geom[:]
         self.log = None
+        self.faces = []
 
     def __len__(self): 
         """Returns the length of the list of intersection geometries.
@@ -111,7 +113,7 @@ class Intersector(object):
         self.clear()
         
         # a whitelist of types we support
-        good_types = [Plane, Circle, PGon, RGon, Line, Ray, Segment, PLine, Arc]
+        good_types = [Plane, Circle, PGon, RGon, Mesh, Line, Ray, Segment, PLine, Arc]
         bad_types = [Bounds,Color,Interval,Point,Xform]
         if any([type(obj) in bad_types for obj in [a,b]]) : raise NotImplementedError("It isn't possible to intersect the following types: %s"%([typ.__name__ for typ in bad_types]))
         if any([type(obj) not in good_types for obj in [a,b]]) : raise NotImplementedError("I can only intersect the following types: %s"%([typ.__name__ for typ in good_types]))
@@ -145,6 +147,11 @@ class Intersector(object):
             pgon, other = a,b
             if isinstance(other,LinearEntity) : return self._line_pgon(other,pgon,**kargs)
 
+        # INTERSECTIONS WITH A MESH
+        if type_a == Mesh:
+            msh, other = a,b
+            if isinstance(other,LinearEntity) : return self._line_mesh(other,msh,**kargs)
+
         # INTERSECTIONS WITH A LINE
         # last resort for Line-Line intersections
         if all(isinstance(item,LinearEntity) for item in [a,b]) : 
@@ -239,6 +246,41 @@ class Intersector(object):
             return True
             
             
+    def _line_mesh(self,line,msh,**kargs):
+        """ Intersects a LinearEntity with a Mesh, using the bounding volume hierarchy of the Mesh. Points of intersection are stored in the order in which they are found along the LinearEntity, and the Intersector.faces property is set to the index of the face on which each lies. Upon success, the Intersector.dist property will be set to the distance between line.spt and the first point of intersection.
+            A Ray or Segment finds only its first intersection, unless all_hits is True. A Line finds all of its intersections.
+        
+            :param line: LinearEntity to intersect.
+            :type line: LinearEntity
+            :param msh: Mesh to intersect.
+            :type msh: Mesh
+            :param ignore_backface: Boolean Value.
+            :type ignore_backface: bool
+            :param all_hits: Boolean Value.
+            :type all_hits: bool
+            :result: Boolean Value.
+            :rtype: bool
+            
+        """
+        ignore_backface = False
+        if "ignore_backface" in kargs: ignore_backface = kargs['ignore_backface']
+        all_hits = type(line) == Line
+        if "all_hits" in kargs: all_hits = all_hits or kargs['all_hits']
+
+        t_min, t_max = 0.0, float('inf')
+        if type(line) == Line : t_min = -t_max
+        if type(line) == Segment : t_max = 1.0
+        spt, vec = line.spt, line.vec
+        hits = msh.bvh._cast(spt.x,spt.y,spt.z,vec.x,vec.y,vec.z,t_min,t_max,"all" if all_hits else "first",ignore_backface)
+        if not hits:
+            self.log = "LinearEntity does not intersect Mesh."
+            return False
+        for t, face in hits: self.append(line.eval(t))
+        self.faces = [face for t,face in hits]
+        self.dist = hits[0][0]
+        self.log = "Intersection found."
+        return True
+
     def _line_plane(self,line,plane,**kargs):
         """ Intersects a Line with a Plane. Upon success, the Intersector.dist property will be set to the distance between line.spt and the point of intersection.
         
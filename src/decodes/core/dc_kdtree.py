@@ -0,0 +1,332 @@
+from decodes.core import *
+from . import dc_base, dc_interval, dc_vec, dc_point, dc_bounds #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
+if VERBOSE_FS: print("kdtree.py loaded")
+
+import math, heapq
+from array import array
+
+
+class KDTree(object):
+    """
+    A k-dimensional tree that indexes a fixed set of 3d points for nearest-neighbor, radius, and bounding-box queries.
+    The tree is built in bulk from a list of Points (or a PointArray), and is stored in flat arrays rather than as linked node objects.
+    Queries return indices into the list of points given at construction, along with distances where appropriate.
+    """
+
+    def __init__(self, pts, leaf_size=8):
+        """ KDTree constructor.
+
+            :param pts: Points to index.
+            :type pts: [Point] or PointArray
+            :param leaf_size: Maximum number of points stored at each leaf of the tree.
+            :type leaf_size: int
+            :result: KDTree object.
+            :rtype: KDTree
+
+            ::
+
+                tree = KDTree(pts)
+                idx, dist = tree.nearest(Point(1,2,3))
+        """
+        if isinstance(pts, VecArray):
+            cs = pts.coords
+            self._xyz = (array('d',cs[0::3]), array('d',cs[1::3]), array('d',cs[2::3]))
+        else:
+            self._xyz = (array('d',[p.x for p in pts]), array('d',[p.y for p in pts]), array('d',[p.z for p in pts]))
+        self._leaf_size = max(1,int(leaf_size))
+        self._build()
+
+    def __len__(self):
+        return len(self._idx)
+
+    def __repr__(self):
+        return "kdtree[{0}pts,{1}nodes]".format(len(self._idx),len(self._lo))
+
+    @property
+    def pts(self):
+        """ Returns the points indexed by this tree, in the order they were given.
+
+            :result: Points.
+            :rtype: PointArray
+        """
+        return PointArray._from_xyz(*self._xyz)
+
+    def _build(self):
+        """ Recursively splits the points of this tree at the median of the axis of greatest extent, until each leaf contains no more than leaf_size points.
+        """
+        n = len(self._xyz[0])
+        idx = list(range(n))
+        lo, hi, left, right, box = [], [], [], [], []
+
+        stack = [(0,n,-1,False)] # (start, end, parent node, is right child)
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(lo)
+            if parent >= 0:
+                if is_right : right[parent] = node
+                else : left[parent] = node
+            lo.append(start)
+            hi.append(end)
+            left.append(-1)
+            right.append(-1)
+
+            extents = []
+            for axis in range(3):
+                vals = [self._xyz[axis][i] for i in idx[start:end]]
+                if vals : extents.append((min(vals),max(vals)))
+                else : extents.append((0.0,0.0))
+            box.extend([extents[0][0],extents[1][0],extents[2][0],extents[0][1],extents[1][1],extents[2][1]])
+
+            if end-start <= self._leaf_size : continue
+            spans = [b-a for a,b in extents]
+            axis = spans.index(max(spans))
+            if spans[axis] == 0 : continue # all points coincide, keep them in a leaf
+
+            coord = self._xyz[axis]
+            sub = idx[start:end]
+            sub.sort(key=coord.__getitem__)
+            idx[start:end] = sub
+            mid = (start+end)//2
+            stack.append((mid,end,node,True))
+            stack.append((start,mid,node,False))
+
+        self._idx = array('l',idx)
+        self._lo, self._hi = array('l',lo), array('l',hi)
+        self._left, self._right = array('l',left), array('l',right)
+        self._box = array('d',box)
+
+    def _box_dist2(self, node, x, y, z):
+        """ Returns the distance squared between the given coordinates and the bounding box of the given node.
+        """
+        b = self._box
+        o = node*6
+        d = 0.0
+        if x < b[o] : d += (b[o]-x)**2
+        elif x > b[o+3] : d += (x-b[o+3])**2
+        if y < b[o+1] : d += (b[o+1]-y)**2
+        elif y > b[o+4] : d += (y-b[o+4])**2
+        if z < b[o+2] : d += (b[o+2]-z)**2
+        elif z > b[o+5] : d += (z-b[o+5])**2
+        return d
+
+    def _k_nearest2(self, x, y, z, k, max_dist2=None):
+        """ Returns a list of (distance squared, index) tuples of the k nearest points to the given coordinates, ordered by distance.
+            Nodes are visited in order of the distance to their bounding box, and the search ends once no unvisited node could contain a nearer point.
+        """
+        if len(self._idx) == 0 or k < 1 : return []
+        xs, ys, zs = self._xyz
+        idx, lo, hi, left, right = self._idx, self._lo, self._hi, self._left, self._right
+        best = [] # a heap of (-distance squared, -index) of the best k points found so far
+        worst = float('inf') if max_dist2 is None else max_dist2
+        queue = [(self._box_dist2(0,x,y,z),0)]
+        while queue:
+            d2, node = heapq.heappop(queue)
+            if d2 > worst : break
+            if left[node] < 0 :
+                for i in idx[lo[node]:hi[node]]:
+                    pd2 = (xs[i]-x)*(xs[i]-x) + (ys[i]-y)*(ys[i]-y) + (zs[i]-z)*(zs[i]-z)
+                    if pd2 > worst : continue
+                    if len(best) < k : heapq.heappush(best,(-pd2,-i))
+                    elif (-pd2,-i) > best[0] : heapq.heapreplace(best,(-pd2,-i))
+                    else : continue
+                    if len(best) == k : worst = -best[0][0]
+            else:
+                for child in (left[node],right[node]):
+                    cd2 = self._box_dist2(child,x,y,z)
+                    if cd2 <= worst : heapq.heappush(queue,(cd2,child))
+        return sorted([(-nd2,-ni) for nd2,ni in best])
+
+    def nearest(self, pt):
+        """ Returns the index of the indexed point nearest to the given Point, and the distance between them.
+
+            :param pt: Query point.
+            :type pt: Point
+            :result: Index of the nearest point and its distance.
+            :rtype: (int, float)
+
+            ::
+
+                idx, dist = tree.nearest(Point(1,2,3))
+        """
+        found = self._k_nearest2(pt.x,pt.y,pt.z,1)
+        if not found : raise GeometricError("Cannot find the nearest point within an empty KDTree")
+        return found[0][1], math.sqrt(found[0][0])
+
+    def k_nearest(self, pt, k):
+        """ Returns the indices of the k indexed points nearest to the given Point, and their distances, ordered by distance.
+
+            :param pt: Query point.
+            :type pt: Point
+            :param k: Number of points to find.
+            :type k: int
+            :result: Indices of the nearest points and their distances.
+            :rtype: ([int], [float])
+        """
+        found = self._k_nearest2(pt.x,pt.y,pt.z,k)
+        return [i for d2,i in found], [math.sqrt(d2) for d2,i in found]
+
+    def within(self, pt, radius, sort=False):
+        """ Returns the indices of the indexed points that lie within the given distance of the given Point, and their distances.
+
+            :param pt: Query point.
+            :type pt: Point
+            :param radius: Search distance.
+            :type radius: float
+            :param sort: If True, results are ordered by distance. Otherwise, results are ordered by index.
+            :type sort: bool
+            :result: Indices of the points within the given distance and their distances.
+            :rtype: ([int], [float])
+        """
+        x, y, z = pt.x, pt.y, pt.z
+        r2 = radius*radius
+        found = []
+        if len(self._idx) > 0:
+            xs, ys, zs = self._xyz
+            idx, lo, hi, left, right = self._idx, self._lo, self._hi, self._left, self._right
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                if self._box_dist2(node,x,y,z) > r2 : continue
+                if left[node] < 0 :
+                    for i in idx[lo[node]:hi[node]]:
+                        pd2 = (xs[i]-x)*(xs[i]-x) + (ys[i]-y)*(ys[i]-y) + (zs[i]-z)*(zs[i]-z)
+                        if pd2 <= r2 : found.append((pd2,i) if sort else (i,pd2))
+                else:
+                    stack.append(left[node])
+                    stack.append(right[node])
+        found.sort()
+        if sort : return [i for d2,i in found], [math.sqrt(d2) for d2,i in found]
+        return [i for i,d2 in found], [math.sqrt(d2) for i,d2 in found]
+
+    def in_bounds(self, bounds):
+        """ Returns the indices of the indexed points that lie within the given Bounds, in ascending order. If the given Bounds is 2d, the z-coordinates of points are ignored.
+
+            :param bounds: Bounds to search.
+            :type bounds: Bounds
+            :result: Indices of the points within the given Bounds.
+            :rtype: [int]
+        """
+        inf = float('inf')
+        bmin = [bounds.ival_x.a, bounds.ival_y.a, bounds.ival_z.a if bounds.is_3d else -inf]
+        bmax = [bounds.ival_x.b, bounds.ival_y.b, bounds.ival_z.b if bounds.is_3d else inf]
+        for a in range(3):
+            if bmin[a] > bmax[a] : bmin[a], bmax[a] = bmax[a], bmin[a]
+        found = []
+        if len(self._idx) == 0 : return found
+        xs, ys, zs = self._xyz
+        idx, lo, hi, left, right, b = self._idx, self._lo, self._hi, self._left, self._right, self._box
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            o = node*6
+            if any(b[o+a] > bmax[a] or b[o+3+a] < bmin[a] for a in range(3)) : continue
+            if all(b[o+a] >= bmin[a] and b[o+3+a] <= bmax[a] for a in range(3)) :
+                # this node lies entirely within the given bounds
+                found.extend(idx[lo[node]:hi[node]])
+            elif left[node] < 0 :
+                for i in idx[lo[node]:hi[node]]:
+                    if bmin[0] <= xs[i] <= bmax[0] and bmin[1] <= ys[i] <= bmax[1] and bmin[2] <= zs[i] <= bmax[2] : found.append(i)
+            else:
+                stack.append(left[node])
+                stack.append(right[node])
+        found.sort()
+        return found
+
+    def nearest_many(self, pts):
+        """ Returns the index of the indexed point nearest to each of the given Points, and the distances between them.
+
+            :param pts: Query points.
+            :type pts: [Point] or PointArray
+            :result: Indices of the nearest points and their distances.
+            :rtype: ([int], [float])
+        """
+        idxs, dists = [], []
+        for x,y,z in _query_coords(pts):
+            found = self._k_nearest2(x,y,z,1)
+            if not found : raise GeometricError("Cannot find the nearest point within an empty KDTree")
+            idxs.append(found[0][1])
+            dists.append(math.sqrt(found[0][0]))
+        return idxs, dists
+
+    def k_nearest_many(self, pts, k):
+        """ Returns the indices of the k indexed points nearest to each of the given Points, and their distances.
+
+            :param pts: Query points.
+            :type pts: [Point] or PointArray
+            :param k: Number of points to find for each query.
+            :type k: int
+            :result: Lists of indices of the nearest points and lists of their distances, one of each per query.
+            :rtype: ([[int]], [[float]])
+        """
+        idxs, dists = [], []
+        for x,y,z in _query_coords(pts):
+            found = self._k_nearest2(x,y,z,k)
+            idxs.append([i for d2,i in found])
+            dists.append([math.sqrt(d2) for d2,i in found])
+        return idxs, dists
+
+    def within_many(self, pts, radius, sort=False):
+        """ Returns the indices of the indexed points that lie within the given distance of each of the given Points, and their distances.
+
+            :param pts: Query points.
+            :type pts: [Point] or PointArray
+            :param radius: Search distance.
+            :type radius: float
+            :param sort: If True, results are ordered by distance. Otherwise, results are ordered by index.
+            :type sort: bool
+            :result: Lists of indices of the points within the given distance and lists of their distances, one of each per query.
+            :rtype: ([[int]], [[float]])
+        """
+        idxs, dists = [], []
+        for x,y,z in _query_coords(pts):
+            i, d = self.within(Point(x,y,z),radius,sort)
+            idxs.append(i)
+            dists.append(d)
+        return idxs, dists
+
+    def serialized(self):
+        """ Returns a representation of this tree composed only of built-in types, suitable for pickling or writing to JSON. A tree may be reconstructed from this representation without being rebuilt using KDTree.from_serialized.
+
+            :result: Serialized tree.
+            :rtype: dict
+        """
+        return {
+            "leaf_size":self._leaf_size,
+            "xyz":[list(c) for c in self._xyz],
+            "idx":list(self._idx),
+            "lo":list(self._lo), "hi":list(self._hi),
+            "left":list(self._left), "right":list(self._right),
+            "box":list(self._box)
+        }
+
+    @staticmethod
+    def from_serialized(data):
+        """ Reconstructs a tree from the representation produced by KDTree.serialized.
+
+            :param data: Serialized tree.
+            :type data: dict
+            :result: KDTree object.
+            :rtype: KDTree
+        """
+        tree = KDTree.__new__(KDTree)
+        tree._leaf_size = data["leaf_size"]
+        tree._xyz = tuple([array('d',c) for c in data["xyz"]])
+        tree._idx = array('l',data["idx"])
+        tree._lo, tree._hi = array('l',data["lo"]), array('l',data["hi"])
+        tree._left, tree._right = array('l',data["left"]), array('l',data["right"])
+        tree._box = array('d',data["box"])
+        return tree
+
+    def __getstate__(self):
+        return self.serialized()
+
+    def __setstate__(self, state):
+        self.__dict__.update(KDTree.from_serialized(state).__dict__)
+
+
+
+def _query_coords(pts):
+    """ Returns a list of (x,y,z) tuples for the given Points or PointArray.
+    """
+    if isinstance(pts, VecArray): return pts.to_tuples()
+    return [(p.x,p.y,p.z) for p in pts]
@@ -1,14 +1,17 @@
 from decodes.core import *
 from . import dc_base, dc_vec, dc_point, dc_has_pts #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
+from .dc_has_pts import _stamps, _read_only
 if VERBOSE_FS: print("mesh.py loaded")
 
-import copy, collections
+import copy, collections, heapq
+from array import array
 
 class Mesh(HasPts):
     """
     a very simple mesh class
     """
     subclass_attr = [] # this list of props is unset any time this HasPts object changes
+    _faces_stamp = 0 # stamped any time the faces of this mesh change
     
     def __init__(self, vertices=None, faces=None, basis=None):
         """ Mesh Constructor.
@@ -39,18 +42,76 @@ class Mesh(HasPts):
                 quadmesh=Mesh(pts,quad_faces)                
         """
         super(Mesh,self).__init__(vertices,basis) #HasPts constructor handles initalization of verts and basis
-        self._faces = [] if (faces is None) else faces
+        self._faces = MeshFaces(faces,self)
+
+    def __copy__(self):
+        # a copy of a mesh has its own faces, such that altering the faces of one does not alter the other
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._cache = dict(getattr(self,"_cache",{}))
+        clone._faces = MeshFaces(self._faces,clone)
+        return clone
+
+    @staticmethod
+    def from_buffers(vertices, idxs, sizes=3, basis=None):
+        """ Constructs a Mesh from a flat sequence of the vertex indices of its faces, which may be of mixed sizes.
+
+            :param vertices: The vertices of the mesh.
+            :type vertices: [Point] or PointArray
+            :param idxs: Vertex indices of each face, one face after another.
+            :type idxs: [int]
+            :param sizes: Number of vertices in each face, or in every face.
+            :type sizes: [int] or int
+            :param basis: The (optional) basis of the mesh.
+            :type basis: Basis
+            :result: Mesh object.
+            :rtype: Mesh
+            
+            ::
+            
+                msh = Mesh.from_buffers(pts, [0,1,2,3, 1,4,2], [4,3])
+        """
+        msh = Mesh(vertices,basis=basis)
+        msh.add_faces(idxs,sizes)
+        return msh
 
         
     @property
     def faces(self): 
-        """ Returns a list of mesh faces.
+        """| Returns the faces of this mesh, each of which is given as a list of vertex indices when accessed.
+           | Faces may be appended, extended and assigned as in a list. As each face is given as a new list, a face that is altered must be assigned back for the change to take effect.
         
             :result: List of mesh faces.
-            :rtype: list
+            :rtype: MeshFaces
+            
+            ::
+            
+                face = msh.faces[0]
+                face[2] = 3
+                msh.faces[0] = face
         """
         return self._faces
 
+    @property
+    def version(self):
+        """ Returns a number that changes any time the vertices, basis or faces of this mesh change.
+
+           :result: Version number.
+           :rtype: int
+        """
+        return max(super(Mesh,self).version, self._faces_stamp)
+
+    def _faces_changed(self):
+        """ Records a change to the faces of this mesh, which invalidates any cached values that depend upon them.
+        """
+        self._faces_stamp = next(_stamps)
+
+    def _set_faces(self, faces):
+        """ Replaces the faces of this mesh with the given faces, and records the change.
+        """
+        self._faces = MeshFaces(faces,self)
+        self._faces_changed()
+
     def add_face(self,a,b,c,d=-1):
         """ Adds a face to the mesh.
         
@@ -63,11 +124,43 @@ class Mesh(HasPts):
             
                 quadmesh.add_face(4,5,6,7)
         """
-        #TODO: add lists of faces just the same
+        if max(a,b,c,d) < len(self._verts):
+            if (d>=0) : self._faces._append([a,b,c,d])
+            else: self._faces._append([a,b,c])
+            self._faces_changed()
+
+    def add_faces(self,faces,sizes=None):
+        """| Adds many faces to the mesh at once.
+           | Faces may be given as a list of lists of vertex indices, or as a flat sequence of vertex indices along with the number of vertices in each face (or in every face).
+           | Unlike Mesh.add_face, which skips invalid faces, an error is raised if any face refers to a vertex that does not exist.
         
-        if max(a,b,c,d) < len(self.pts):
-            if (d>=0) : self._faces.append([a,b,c,d])
-            else: self._faces.append([a,b,c])
+            :param faces: Faces to be added, or the vertex indices of each face, one face after another.
+            :type faces: [[int]] or [int]
+            :param sizes: Number of vertices in each face, or in every face. Required only when vertex indices are given in a flat sequence.
+            :type sizes: [int] or int
+            :result: Modifies list of faces.
+            :rtype: None
+            
+            ::
+            
+                quadmesh.add_faces([0,1,2,3, 4,5,6,7], 4)
+        """
+        if sizes is None:
+            faces = [list(face) for face in faces]
+            sizes = [len(face) for face in faces]
+            idxs = array('i',[i for face in faces for i in face])
+        else:
+            idxs = array('i',faces)
+            if isinstance(sizes, int):
+                if sizes < 1 or len(idxs)%sizes != 0 : raise ValueError("The number of vertex indices given must be a multiple of the size of each face.")
+                sizes = [sizes]*(len(idxs)//sizes)
+            elif sum(sizes) != len(idxs) : raise ValueError("The number of vertex indices given must match the sum of the sizes of each face.")
+        
+        if not sizes: return
+        if min(sizes) < 3 : raise ValueError("Each face of a mesh must have at least three vertices.")
+        if min(idxs) < 0 or max(idxs) >= len(self._verts) : raise IndexError("Faces must refer to vertices with indices between 0 and {0}.".format(len(self._verts)-1))
+        self._faces._extend(idxs,sizes)
+        self._faces_changed()
     
     def face_pts(self,index):
         """ Returns the points of a given face.
@@ -81,7 +174,8 @@ class Mesh(HasPts):
             
                 quadmesh.face_pts(0)
         """
-        return [self.pts[i] for i in self.faces[index]]
+        pts = self.pts
+        return [pts[i] for i in self.faces[index]]
     
     def face_centroid(self,index):
         """ Returns the centroids of individual mesh faces.
@@ -95,10 +189,12 @@ class Mesh(HasPts):
             
                 quadmesh.face_centroid(0)
         """
-        return Point.centroid(self.face_pts(index))
+        cens = self._face_geometry()[2]
+        return Point(cens[3*index],cens[3*index+1],cens[3*index+2])
         
     def face_normal(self,index):
         """ Returns the normal vector of a face.
+            The normal of a quad face is the average of the normals found at two of its opposite corners.
         
             :param index: Index of a face.
             :type index: int
@@ -109,16 +205,332 @@ class Mesh(HasPts):
             
                 quadmesh.face_normal(0)
         """
-        verts = self.face_pts(index)
-        if len(verts) == 3 : return Vec(verts[0],verts[1]).cross(Vec(verts[0],verts[2])).normalized()
-        else :
-            v0 = Vec(verts[0],verts[1]).cross(Vec(verts[0],verts[3])).normalized()
-            v1 = Vec(verts[2],verts[3]).cross(Vec(verts[2],verts[1])).normalized()
-            return Vec.bisector(v0,v1).normalized()
+        nrms = self._face_geometry()[0]
+        return Vec(nrms[3*index],nrms[3*index+1],nrms[3*index+2])
+
+    def face_area(self,index):
+        """ Returns the area of a face.
+            The area of a face that is not planar is that of its projection onto the plane perpendicular to its vector area.
+        
+            :param index: Index of a face.
+            :type index: int
+            :returns: Area of face.
+            :rtype: float
+            
+            ::
+            
+                quadmesh.face_area(0)
+        """
+        return self._face_geometry()[1][index]
+
+    @property
+    def face_normals(self):
+        """ Returns the normal vector of each face of this mesh, as found by face_normal.
+        
+            :returns: Normal vectors.
+            :rtype: VecArray
+        """
+        return VecArray.from_coords(self._face_geometry()[0])
+
+    @property
+    def face_areas(self):
+        """ Returns the area of each face of this mesh, as found by face_area, as a read-only sequence of floats.
+        
+            :returns: Face areas.
+            :rtype: [float]
+        """
+        return _read_only(self._face_geometry()[1])
+
+    @property
+    def face_centroids(self):
+        """ Returns the centroid of each face of this mesh.
+        
+            :returns: Face centroids.
+            :rtype: PointArray
+        """
+        return PointArray.from_coords(self._face_geometry()[2])
+
+    @property
+    def vertex_normals(self):
+        """ Returns a normal vector at each vertex of this mesh, found by averaging the normals of the faces that touch the vertex, weighted by their areas.
+            Vertices that touch no faces are given a normal vector of zero length.
+        
+            :returns: Normal vectors.
+            :rtype: VecArray
+        """
+        return VecArray.from_coords(self._face_geometry()[3])
+
+    def _face_geometry(self):
+        """ Returns the interleaved normals, the areas, and the interleaved centroids of the faces of this mesh, along with the interleaved vertex normals of this mesh.
+            These are found together in a single pass over the faces of this mesh, and are stored until the vertices, basis or faces of this mesh change.
+        """
+        return self._cached('face_geometry',self._calc_face_geometry,stamp=((self._verts_stamp,self._basis_stamp),self._faces_stamp))
+
+    def _calc_face_geometry(self):
+        crds = self._world_coords()
+        faces = self._faces
+        count = len(faces)
+        nrms, cens = array('d',[0.0])*(3*count), array('d',[0.0])*(3*count)
+        areas = array('d',[0.0])*count
+        vnrms = array('d',[0.0])*len(crds)
+        for f, face in enumerate(faces):
+            n = len(face)
+            pxs = [crds[3*i] for i in face]
+            pys = [crds[3*i+1] for i in face]
+            pzs = [crds[3*i+2] for i in face]
+            # vector area (twice over) by Newell's method; for a triangle, this is the cross product of two of its edges
+            ax = ay = az = 0.0
+            for j in range(n):
+                k = (j+1)%n
+                ax += (pys[j]-pys[k])*(pzs[j]+pzs[k])
+                ay += (pzs[j]-pzs[k])*(pxs[j]+pxs[k])
+                az += (pxs[j]-pxs[k])*(pys[j]+pys[k])
+            length = (ax*ax+ay*ay+az*az)**0.5
+            area = 0.5*length
+            if n == 4 :
+                nx, ny, nz = _corner_normal(pxs,pys,pzs,0,1,3)
+                mx, my, mz = _corner_normal(pxs,pys,pzs,2,3,1)
+                nx, ny, nz = nx+mx, ny+my, nz+mz
+                length = (nx*nx+ny*ny+nz*nz)**0.5
+            else :
+                nx, ny, nz = ax, ay, az
+            if length > 0 : nx, ny, nz = nx/length, ny/length, nz/length
+            else : nx = ny = nz = 0.0
+            nrms[3*f], nrms[3*f+1], nrms[3*f+2] = nx, ny, nz
+            areas[f] = area
+            cens[3*f], cens[3*f+1], cens[3*f+2] = sum(pxs)/n, sum(pys)/n, sum(pzs)/n
+            for i in set(face):
+                vnrms[3*i] += nx*area
+                vnrms[3*i+1] += ny*area
+                vnrms[3*i+2] += nz*area
+        for i in range(0,len(vnrms),3):
+            length = (vnrms[i]*vnrms[i]+vnrms[i+1]*vnrms[i+1]+vnrms[i+2]*vnrms[i+2])**0.5
+            if length > 0 : vnrms[i], vnrms[i+1], vnrms[i+2] = vnrms[i]/length, vnrms[i+1]/length, vnrms[i+2]/length
+        return nrms, areas, cens, vnrms
+    
+    @property
+    def bvh(self):
+        """| Returns a bounding volume hierarchy of the faces of this mesh in world coordinates, for ray casting and closest-point queries.
+           | This is built the first time it is requested, and rebuilt only after the vertices, basis or faces of this mesh change.
+
+           :returns: Bounding volume hierarchy.
+           :rtype: MeshBVH
+        """
+        from .dc_bvh import MeshBVH # loaded after this module
+        return self._cached('bvh',lambda: MeshBVH(self),stamp=((self._verts_stamp,self._basis_stamp),self._faces_stamp))
+
+    @property
+    def topology(self):
+        """| Returns the connectivity of the vertices, edges and faces of this mesh.
+           | This is built in a single pass over the faces of this mesh the first time it is requested, and rebuilt only after faces or vertices are added.
+
+           :returns: Mesh topology.
+           :rtype: MeshTopology
+        """
+        return self._cached('topology',lambda: MeshTopology(self._faces,len(self._verts)),stamp=(self._faces_stamp,len(self._verts)))
+
+    @property
+    def edges(self):
+        """ Returns each edge of this mesh as a pair of vertex indices, in the order in which they are first found among the faces of this mesh.
+        
+            :returns: Pairs of vertex indices.
+            :rtype: [(int,int)]
+        """
+        return list(self.topology.edges)
+
+    @property
+    def naked_edges(self):
+        """ Returns the edges of this mesh that border a single face, as pairs of vertex indices ordered as they are found in that face.
+        
+            :returns: Pairs of vertex indices.
+            :rtype: [(int,int)]
+            
+            ::
+            
+                quadmesh.naked_edges
+        """
+        return self.topology.naked_edges()
+
+    @property
+    def is_manifold(self):
+        """ Returns True if no edge of this mesh borders more than two faces.
+        
+            :returns: Boolean value.
+            :rtype: bool
+        """
+        return self.topology.is_manifold
+
+    @property
+    def is_oriented(self):
+        """ Returns True if the faces on either side of each edge of this mesh are ordered consistently, such that their normals point to the same side of the mesh.
+        
+            :returns: Boolean value.
+            :rtype: bool
+        """
+        return self.topology.is_oriented
+
+    @property
+    def is_closed(self):
+        """ Returns True if this mesh is manifold and has no naked edges.
+        
+            :returns: Boolean value.
+            :rtype: bool
+        """
+        return self.topology.is_manifold and not self.topology.has_naked_edges
+
+    def vertex_neighbors(self,index):
+        """ Returns the indices of the vertices that share an edge with the given vertex.
+        
+            :param index: Index of a vertex.
+            :type index: int
+            :returns: Vertex indices.
+            :rtype: [int]
+            
+            ::
+            
+                quadmesh.vertex_neighbors(0)
+        """
+        return list(self.topology.vertex_neighbors[index])
+
+    def vertex_faces(self,index):
+        """ Returns the indices of the faces that include the given vertex.
+        
+            :param index: Index of a vertex.
+            :type index: int
+            :returns: Face indices.
+            :rtype: [int]
+        """
+        return list(self.topology.vertex_faces[index])
+
+    def face_neighbors(self,index):
+        """ Returns the indices of the faces that share an edge with the given face.
+        
+            :param index: Index of a face.
+            :type index: int
+            :returns: Face indices.
+            :rtype: [int]
+            
+            ::
+            
+                quadmesh.face_neighbors(0)
+        """
+        return self.topology.face_neighbors(self._faces[index],index)
+
+    def valence(self,index):
+        """ Returns the number of edges that meet at the given vertex.
+        
+            :param index: Index of a vertex.
+            :type index: int
+            :returns: Valence.
+            :rtype: int
+        """
+        return len(self.topology.vertex_neighbors[index])
     
     def __repr__(self):
         return "msh[{0}v,{1}f]".format(len(self._verts),len(self._faces))
     
+    def welded(self, tol=None, return_map=False):
+        """| Returns a new mesh in which vertices that lie within the given tolerance of one another are merged.
+           | Faces are renumbered to refer to the merged vertices, and any faces that collapse as a result are discarded, as are any vertices left unused.
+           | If return_map is True, a list that relates the index of each vertex of this mesh to the index of the corresponding vertex of the welded mesh (or to -1, for discarded vertices) is also returned.
+        
+            :param tol: Distance within which vertices are merged. If None, vertices are merged if they are equal.
+            :type tol: float
+            :param return_map: Boolean value.
+            :type return_map: bool
+            :returns: Welded mesh, and optionally a list of vertex indices.
+            :rtype: Mesh or (Mesh, [int])
+            
+            ::
+            
+                msh = Mesh.join(meshes).welded(0.001)
+        """
+        kept, weld_map = Point.cull_duplicates(self._verts, tol, True)
+        msh = copy.copy(self)
+        msh._unset_attr() # call this to invalidate all cached values
+        msh._verts = [Vec(v) for v in kept]
+        msh._set_faces([[weld_map[i] for i in face] for face in self._faces])
+        compact_map = msh.compact()
+        
+        if return_map: return msh, [compact_map[m] for m in weld_map]
+        return msh
+
+    def compact(self):
+        """| Discards any faces of this mesh that have fewer than three distinct vertices, and any vertices not used by a face, and renumbers faces to match.
+           | Returns a list that relates the index of each vertex prior to compaction to its new index (or to -1, for discarded vertices).
+        
+            :returns: List of vertex indices.
+            :rtype: [int]
+            
+            ::
+            
+                idx_map = msh.compact()
+        """
+        faces = [face for face in (_collapsed(face) for face in self._faces) if len(set(face)) >= 3]
+        used = [False]*len(self._verts)
+        for face in faces:
+            for i in face: used[i] = True
+        
+        idx_map, verts = [], []
+        for vert, is_used in zip(self._verts, used):
+            if is_used:
+                idx_map.append(len(verts))
+                verts.append(vert)
+            else: idx_map.append(-1)
+        
+        self._mark_changed() # call this when the vertices of this object change
+        self._verts = verts
+        self._set_faces([[idx_map[i] for i in face] for face in faces])
+        return idx_map
+
+    def decimated(self, target_faces=None, max_error=None):
+        """| Returns a simplified version of this mesh, found by repeatedly collapsing the edge whose collapse least departs from the surface of this mesh, as measured by quadric error metrics.
+           | Faces of more than three vertices are first divided into triangles, and naked edges are held close to their original position.
+           | Simplification stops once the given number of faces is reached, or once any further collapse would depart from this mesh by more than the given distance, whichever comes first.
+        
+            :param target_faces: Number of triangular faces to reduce this mesh to.
+            :type target_faces: int
+            :param max_error: Estimated distance by which the simplified mesh may depart from this one.
+            :type max_error: float
+            :returns: Simplified triangle mesh.
+            :rtype: Mesh
+            
+            ::
+            
+                msh = srf.to_mesh().decimated(max_error=0.01)
+        """
+        if target_faces is None and max_error is None : raise ValueError("Either a target number of faces or a maximum error must be given to decimate a mesh.")
+        dec = _QuadricDecimator(self)
+        dec.run(target_faces or 0, None if max_error is None else max_error**2)
+        return dec.to_mesh(self)
+
+    def lods(self, levels=4, ratio=0.25):
+        """| Returns a chain of successively simpler versions of this mesh, from which an outie may select a level of detail that suits the size at which this mesh is drawn.
+           | Each level is decimated to the given fraction of the faces of the level before it, until the given number of levels is reached, or until this mesh may be simplified no further.
+        
+            :param levels: Maximum number of levels of detail, including this mesh.
+            :type levels: int
+            :param ratio: Fraction of faces retained from one level to the next.
+            :type ratio: float
+            :returns: Chain of meshes, from this mesh to the simplest.
+            :rtype: MeshLOD
+            
+            ::
+            
+                out.put(srf.to_mesh().lods())
+        """
+        if not 0 < ratio < 1 : raise ValueError("The ratio of faces retained from one level of detail to the next must be between 0 and 1.")
+        dec = _QuadricDecimator(self)
+        meshes, errors = [self], [0.0]
+        target = dec.face_count
+        while len(meshes) < levels :
+            target, count = int(target*ratio), dec.face_count
+            dec.run(target)
+            if dec.face_count == count : break
+            meshes.append(dec.to_mesh(self))
+            errors.append(dec.error**0.5)
+        return MeshLOD(meshes, errors)
+
     @staticmethod
     def explode(msh):
         """ Explodes a mesh into individual faces.
@@ -133,17 +545,20 @@ class Mesh(HasPts):
                 Mesh.explode(quadmesh)
         """
         exploded_meshes = []
+        msh_pts = msh.pts
         for face in msh.faces:
-            pts = [msh.pts[v] for v in face]
+            pts = [msh_pts[v] for v in face]
             nface = [0,1,2] if len(face)==3 else [0,1,2,3]
             exploded_meshes.append(Mesh(pts,[nface]))
         return exploded_meshes
     
     
     
-    def to_pt_graph(self):
-        """ Returns a Graph representation of the mesh points by index.
+    def to_pt_graph(self, frozen=False):
+        """ Returns a Graph representation of the mesh points by index, in which each point is connected to the others that share a face with it.
 
+            :param frozen: If True, a CSRGraph is returned, in which the id of each node is the index of its point.
+            :type frozen: bool
             :returns: A Graph of point indexes.
             :rtype: Graph
             
@@ -151,19 +566,20 @@ class Mesh(HasPts):
             
                 quadmesh.to_pt_graph()
         """
+        pairs = [(a,b) for face in self.faces for a in face for b in face if a != b]
+        if frozen: return CSRGraph(len(self._verts), [a for a,b in pairs], [b for a,b in pairs])
         graph = Graph()
-        for index in range(len(self.pts)):
-            for face in self.faces:
-                for px in face:
-                    if index in face and index!=px: graph.add_edge(index, px)
+        for a, b in pairs: graph.add_edge(a, b)
         return graph
     
     
-    def to_face_graph(self, val=1):
+    def to_face_graph(self, val=1, frozen=False):
         """ Returns a Graph representation of the mesh faces by index.
             
             :param val: number of coincident points for neighborness.
             :type val: int
+            :param frozen: If True, a CSRGraph is returned, in which the id of each node is the index of its face.
+            :type frozen: bool
             :returns: A Graph of face indexes.
             :rtype: Graph
             
@@ -171,22 +587,428 @@ class Mesh(HasPts):
             
                 quadmesh.to_face_graph(2)
         """ 
-        from decodes.extensions.graph import Graph
-        graph = Graph()
-        graph.naked_nodes = []
-        for f1 in range(len(self.faces)):
-            for f2 in range(len(self.faces)):
-                if f1 != f2:
-                    count = 0
-                    for index in self.faces[f2]:
-                        if index in self.faces[f1]:
-                            count+=1
-                    if count >= val:
-                        graph.add_edge(f1,f2)
-            if len(graph.edges[f1]) < len(self.faces[f1]):
-                if f1 not in graph.naked_nodes:
-                    graph.naked_nodes.append(f1)
-                                          
+        vertex_faces = self.topology.vertex_faces
+        pairs = []
+        naked_nodes = []
+        for f1, face in enumerate(self.faces):
+            # count the points of each other face that coincide with the points of this face
+            counts = collections.Counter(f2 for index in set(face) for f2 in vertex_faces[index] if f2 != f1)
+            others = sorted(f2 for f2, count in counts.items() if count >= val)
+            pairs.extend((f1,f2) for f2 in others)
+            if len(others) < len(face): naked_nodes.append(f1)
+        
+        if frozen: 
+            graph = CSRGraph(len(self.faces), [a for a,b in pairs], [b for a,b in pairs])
+        else:
+            graph = Graph()
+            for f1, f2 in pairs: graph.add_edge(f1,f2)
+        graph.naked_nodes = naked_nodes
         return graph
 
-    
\ No newline at end of file
+
+
+class MeshFaces(object):
+    """
+    a compact collection of the faces of a mesh
+    
+    the vertex indices of all faces are stored one face after another in a single array of 32-bit integers, along with an array of the offset at which each face begins, such that faces of mixed sizes may be stored together.
+    Faces are only given as lists of vertex indices when accessed individually. These lists are new each time, so an altered face must be assigned back to take effect.
+    Faces may be compared, appended, extended and assigned as they may in a list, and any such change is recorded by the mesh to which they belong.
+    """
+    def __init__(self, faces=None, mesh=None):
+        """ MeshFaces constructor.
+        
+            :param faces: Faces as lists of vertex indices.
+            :type faces: [[int]] or MeshFaces
+            :param mesh: Mesh to which these faces belong, which is told of any change to them.
+            :type mesh: Mesh
+            :result: MeshFaces object.
+            :rtype: MeshFaces
+        """
+        self._mesh = mesh
+        self.idxs = array('i')
+        self.offsets = array('l',[0])
+        if isinstance(faces, MeshFaces):
+            self.idxs.extend(faces.idxs)
+            self.offsets = array('l',faces.offsets)
+        elif faces is not None:
+            for face in faces: self._append(face)
+
+    def __len__(self): 
+        return len(self.offsets)-1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[n] for n in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("face index out of range")
+        return self.idxs[self.offsets[index]:self.offsets[index+1]].tolist()
+
+    def __iter__(self):
+        idxs, offsets = self.idxs, self.offsets
+        for n in range(len(offsets)-1): yield idxs[offsets[n]:offsets[n+1]].tolist()
+
+    def __repr__(self): 
+        return "faces[{0}]".format(len(self))
+
+    def __eq__(self, other):
+        if isinstance(other, MeshFaces): return self.idxs == other.idxs and self.offsets == other.offsets
+        try:
+            return list(self) == [list(face) for face in other]
+        except TypeError:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __setitem__(self, index, face):
+        if isinstance(index, slice): raise TypeError("faces may only be assigned one at a time")
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("face index out of range")
+        face = list(face)
+        start, end = self.offsets[index], self.offsets[index+1]
+        self.idxs[start:end] = array('i',face)
+        shift = len(face) - (end-start)
+        if shift:
+            offsets = self.offsets
+            for n in range(index+1,len(offsets)): offsets[n] += shift
+        self._changed()
+
+    def append(self, face):
+        """ Appends a face to these faces.
+        
+            :param face: Vertex indices of face.
+            :type face: [int]
+        """
+        self._append(face)
+        self._changed()
+
+    def extend(self, faces):
+        """ Appends many faces to these faces.
+        
+            :param faces: Faces as lists of vertex indices.
+            :type faces: [[int]]
+        """
+        for face in faces: self._append(face)
+        self._changed()
+
+    def _changed(self):
+        if self._mesh is not None: self._mesh._faces_changed()
+
+    @property
+    def sizes(self):
+        """ Returns the number of vertices in each face.
+        
+            :result: Face sizes.
+            :rtype: [int]
+        """
+        offsets = self.offsets
+        return [offsets[n+1]-offsets[n] for n in range(len(offsets)-1)]
+
+    def _append(self, face):
+        self.idxs.extend(face)
+        self.offsets.append(len(self.idxs))
+
+    def _extend(self, idxs, sizes):
+        start = len(self.idxs)
+        self.idxs.extend(idxs)
+        offsets = self.offsets
+        for size in sizes:
+            start += size
+            offsets.append(start)
+
+
+
+class MeshLOD(Geometry):
+    """
+    a chain of successively simpler versions of a mesh, from which an outie may select the level of detail that suits the size at which the mesh is drawn
+    
+    each level is stored along with an estimate of the distance by which it departs from the first.
+    """
+    def __init__(self, meshes, errors):
+        """ MeshLOD Constructor.
+
+            :param meshes: Versions of a mesh, from most to least detailed.
+            :type meshes: [Mesh]
+            :param errors: Estimated distance by which each version departs from the first.
+            :type errors: [float]
+            :result: MeshLOD object.
+            :rtype: MeshLOD
+        """
+        if len(meshes) != len(errors) : raise ValueError("A MeshLOD requires an error for each of its meshes.")
+        self.meshes = list(meshes)
+        self.errors = list(errors)
+
+    def __len__(self): 
+        return len(self.meshes)
+
+    def __getitem__(self, index):
+        return self.meshes[index]
+
+    def __repr__(self): 
+        return "meshlod[{0}]".format(len(self.meshes))
+
+    def select(self, size):
+        """ Returns the simplest mesh in this chain that departs from the most detailed by no more than the given distance, such as the size of a pixel when drawn.
+
+            :param size: Distance that would not be noticed where this chain is drawn.
+            :type size: float
+            :returns: Mesh.
+            :rtype: Mesh
+            
+            ::
+            
+                lod.select(0.1)
+        """
+        for msh, error in reversed(list(zip(self.meshes, self.errors))):
+            if error <= size : return msh
+        return self.meshes[0]
+
+
+class _QuadricDecimator(object):
+    """
+    simplifies a triangulated copy of a mesh by collapsing the edge whose collapse adds the least quadric error, one edge after another (after Garland and Heckbert, 1997).
+    
+    candidate collapses are kept in a priority queue, and are invalidated lazily by stamping the vertices of each collapsed edge.
+    a quadric is stored as the ten distinct entries of a symmetric 4x4 matrix, such that its error at a position is the sum of the squared distances to the planes that it accumulates.
+    """
+    boundary_weight = 10.0 # the weight of the planes that hold naked edges in place, relative to the planes of faces
+
+    def __init__(self, msh):
+        self.pos = [(v.x,v.y,v.z) for v in msh._verts]
+        vert_count = len(self.pos)
+        self.faces = []
+        for face in msh._faces:
+            for n in range(1,len(face)-1):
+                tri = [face[0],face[n],face[n+1]]
+                if len(set(tri)) == 3 : self.faces.append(tri)
+        self.face_count = len(self.faces)
+        self.vert_faces = [set() for n in range(vert_count)]
+        self.quadrics = [[0.0]*10 for n in range(vert_count)]
+        self.boundary = [False]*vert_count
+        self.stamps = [0]*vert_count
+        self.error = 0.0
+        self.heap = []
+
+        edge_faces = {}
+        for f, tri in enumerate(self.faces):
+            nx, ny, nz = self._normal(tri)
+            length = (nx*nx+ny*ny+nz*nz)**0.5
+            if length > 0 : nx, ny, nz = nx/length, ny/length, nz/length
+            x, y, z = self.pos[tri[0]]
+            q = _plane_quadric(nx,ny,nz,-(nx*x+ny*y+nz*z))
+            for i in tri:
+                self.vert_faces[i].add(f)
+                _add_quadric(self.quadrics[i],q)
+            for a, b in _face_edges(tri):
+                edge_faces.setdefault((min(a,b),max(a,b)),[]).append((f,a,b,(nx,ny,nz)))
+
+        for edge, found in edge_faces.items():
+            if len(found) == 2 : continue
+            for a in edge: self.boundary[a] = True
+            if len(found) > 1 : continue
+            # a naked edge is held in place by a plane through the edge, perpendicular to its face
+            f, a, b, (nx,ny,nz) = found[0]
+            (ax,ay,az), (bx,by,bz) = self.pos[a], self.pos[b]
+            ex, ey, ez = bx-ax, by-ay, bz-az
+            px, py, pz = ey*nz-ez*ny, ez*nx-ex*nz, ex*ny-ey*nx
+            length = (px*px+py*py+pz*pz)**0.5
+            if length == 0 : continue
+            px, py, pz = px/length, py/length, pz/length
+            q = _plane_quadric(px,py,pz,-(px*ax+py*ay+pz*az),self.boundary_weight)
+            for i in edge: _add_quadric(self.quadrics[i],q)
+
+        for a, b in edge_faces: self._push(a,b)
+
+    def _normal(self, tri, moved=None, pos=None):
+        # the cross product of two edges of a triangle, optionally with one of its vertices moved to a given position
+        (ax,ay,az), (bx,by,bz), (cx,cy,cz) = [pos if i == moved else self.pos[i] for i in tri]
+        ux, uy, uz, vx, vy, vz = bx-ax, by-ay, bz-az, cx-ax, cy-ay, cz-az
+        return uy*vz-uz*vy, uz*vx-ux*vz, ux*vy-uy*vx
+
+    def _ring(self, v):
+        return set(i for f in self.vert_faces[v] for i in self.faces[f]) - set([v])
+
+    def _push(self, a, b):
+        q = [qa+qb for qa, qb in zip(self.quadrics[a],self.quadrics[b])]
+        pos = _quadric_optimum(q)
+        if pos is None :
+            (ax,ay,az), (bx,by,bz) = self.pos[a], self.pos[b]
+            pos = min([(ax,ay,az),(bx,by,bz),((ax+bx)/2.0,(ay+by)/2.0,(az+bz)/2.0)], key=lambda p: _quadric_error(q,p))
+        heapq.heappush(self.heap,(max(0.0,_quadric_error(q,pos)),a,b,self.stamps[a],self.stamps[b],pos))
+
+    def run(self, target_faces=0, max_cost=None):
+        """ Collapses edges until no more than the given number of faces remain, or until the least costly collapse would exceed the given quadric error.
+        """
+        heap, stamps = self.heap, self.stamps
+        while self.face_count > target_faces and heap:
+            cost, a, b, stamp_a, stamp_b, pos = heap[0]
+            if stamps[a] != stamp_a or stamps[b] != stamp_b : 
+                heapq.heappop(heap) # one of these vertices has moved or been removed since this collapse was found
+                continue
+            if max_cost is not None and cost > max_cost : break
+            heapq.heappop(heap)
+            if self._collapse(a,b,pos) : self.error = max(self.error,cost)
+
+    def _collapse(self, a, b, pos):
+        # moves vertex a to the given position and merges vertex b into it, unless doing so would fold or pinch the mesh
+        faces, vert_faces = self.faces, self.vert_faces
+        shared = vert_faces[a] & vert_faces[b]
+        if not shared : return False
+        if self.boundary[a] and self.boundary[b] and len(shared) != 1 : return False # would pinch the mesh where its boundary crosses itself
+        if self._ring(a) & self._ring(b) != set(i for f in shared for i in faces[f]) - set([a,b]) : return False # would join faces that do not share this edge
+        for v in (a,b):
+            for f in vert_faces[v] - shared:
+                ox, oy, oz = self._normal(faces[f])
+                nx, ny, nz = self._normal(faces[f],v,pos)
+                if (ox or oy or oz) and ox*nx+oy*ny+oz*nz <= 0 : return False # would flip or flatten a face
+
+        for f in shared:
+            for i in faces[f]: 
+                if i != a and i != b : vert_faces[i].discard(f)
+            faces[f] = None
+        self.face_count -= len(shared)
+        vert_faces[a] -= shared
+        for f in vert_faces[b] - shared:
+            tri = faces[f]
+            tri[tri.index(b)] = a
+            vert_faces[a].add(f)
+        vert_faces[b] = set()
+        self.pos[a] = pos
+        _add_quadric(self.quadrics[a],self.quadrics[b])
+        self.boundary[a] = self.boundary[a] or self.boundary[b]
+        self.stamps[a] += 1
+        self.stamps[b] += 1
+        for v in self._ring(a): self._push(a,v)
+        return True
+
+    def to_mesh(self, msh):
+        """ Returns a copy of the given mesh with the vertices and faces that currently remain.
+        """
+        ret = copy.copy(msh)
+        ret._unset_attr() # call this to invalidate all cached values
+        ret._verts = [Vec(x,y,z) for x,y,z in self.pos]
+        ret._set_faces([tri for tri in self.faces if tri is not None])
+        ret.compact()
+        return ret
+
+
+class MeshTopology(object):
+    """
+    The connectivity of the vertices, edges and faces of a mesh, built in a single pass over its faces.
+    Edges are stored as pairs of vertex indices (a,b), with a < b, and related to the faces that border them.
+    """
+    def __init__(self, faces, vert_count):
+        """ MeshTopology constructor.
+        
+            :param faces: Faces as lists of vertex indices.
+            :type faces: [[int]]
+            :param vert_count: Number of vertices.
+            :type vert_count: int
+            :result: MeshTopology object.
+            :rtype: MeshTopology
+        """
+        self.edges = [] # each edge, in the order it is first found
+        self.edge_faces = {} # relates each edge to the faces that border it
+        self._forward = {} # relates each edge to the number of its faces that run from a to b
+        self.vertex_faces = [[] for n in range(vert_count)]
+        
+        for f, face in enumerate(faces):
+            for a, b in _face_edges(face):
+                if a == b: continue # a degenerate edge
+                key = (a,b) if a < b else (b,a)
+                fs = self.edge_faces.get(key)
+                if fs is None:
+                    self.edge_faces[key] = [f]
+                    self.edges.append(key)
+                    self._forward[key] = 0
+                else: fs.append(f)
+                if a < b: self._forward[key] += 1
+            for a in set(face): self.vertex_faces[a].append(f)
+            
+        self.vertex_neighbors = [[] for n in range(vert_count)]
+        for a, b in self.edges:
+            self.vertex_neighbors[a].append(b)
+            self.vertex_neighbors[b].append(a)
+
+    @property
+    def is_manifold(self):
+        return all(len(fs) <= 2 for fs in self.edge_faces.values())
+
+    @property
+    def is_oriented(self):
+        return all(fwd <= 1 and len(self.edge_faces[key])-fwd <= 1 for key, fwd in self._forward.items())
+
+    @property
+    def has_naked_edges(self):
+        return any(len(fs) == 1 for fs in self.edge_faces.values())
+
+    def naked_edges(self):
+        """ Returns the edges that border a single face, as pairs of vertex indices ordered as they are found in that face.
+        """
+        ret = []
+        for key in self.edges:
+            if len(self.edge_faces[key]) != 1: continue
+            # an edge found in descending order runs from b to a
+            ret.append(key if self._forward[key] else (key[1],key[0]))
+        return ret
+
+    def face_neighbors(self, face, index):
+        """ Returns the indices of the faces that share an edge with the given face, in the order of the edges of the given face.
+        """
+        ret = []
+        for a, b in _face_edges(face):
+            key = (a,b) if a < b else (b,a)
+            for f in self.edge_faces.get(key,()):
+                if f != index and f not in ret: ret.append(f)
+        return ret
+
+
+
+def _face_edges(face):
+    """ Returns the edges of the given face as pairs of vertex indices, in the order in which the face runs.
+    """
+    return zip(face, list(face[1:]) + [face[0]])
+
+def _plane_quadric(a, b, c, d, weight=1.0):
+    """ Returns the quadric of the plane ax+by+cz+d=0, as the distinct entries of a symmetric 4x4 matrix.
+    """
+    return [weight*a*a, weight*a*b, weight*a*c, weight*a*d, weight*b*b, weight*b*c, weight*b*d, weight*c*c, weight*c*d, weight*d*d]
+
+def _add_quadric(q, other):
+    for n in range(10): q[n] += other[n]
+
+def _quadric_error(q, pos):
+    """ Returns the error of the given quadric at the given (x,y,z) position.
+    """
+    x, y, z = pos
+    return q[0]*x*x + 2*q[1]*x*y + 2*q[2]*x*z + 2*q[3]*x + q[4]*y*y + 2*q[5]*y*z + 2*q[6]*y + q[7]*z*z + 2*q[8]*z + q[9]
+
+def _quadric_optimum(q):
+    """ Returns the (x,y,z) position at which the given quadric is least, or None if there is no single such position.
+    """
+    a, b, c, d, e, f = q[0], q[1], q[2], q[4], q[5], q[7]
+    det = a*(d*f-e*e) - b*(b*f-e*c) + c*(b*e-d*c)
+    if abs(det) <= 1e-10 * (a+d+f)**3 : return None
+    r0, r1, r2 = -q[3], -q[6], -q[8]
+    x = (r0*(d*f-e*e) - b*(r1*f-e*r2) + c*(r1*e-d*r2)) / det
+    y = (a*(r1*f-e*r2) - r0*(b*f-e*c) + c*(b*r2-r1*c)) / det
+    z = (a*(d*r2-r1*e) - b*(b*r2-r1*c) + r0*(b*e-d*c)) / det
+    return x, y, z
+
+def _corner_normal(xs, ys, zs, a, b, c):
+    """ Returns the normalized cross product of the edges that run from corner a of a face to corners b and c, as an (x,y,z) tuple of zeros if these edges are parallel.
+    """
+    ux, uy, uz = xs[b]-xs[a], ys[b]-ys[a], zs[b]-zs[a]
+    vx, vy, vz = xs[c]-xs[a], ys[c]-ys[a], zs[c]-zs[a]
+    nx, ny, nz = uy*vz-uz*vy, uz*vx-ux*vz, ux*vy-uy*vx
+    length = (nx*nx+ny*ny+nz*nz)**0.5
+    if length == 0 : return 0.0, 0.0, 0.0
+    return nx/length, ny/length, nz/length
+
+def _collapsed(face):
+    """ Returns the given face without any vertex index that repeats the one before it, such that a face with coincident vertices is collapsed.
+    """
+    return [a for n, a in enumerate(face) if a != face[n-1]]
+
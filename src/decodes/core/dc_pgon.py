@@ -10,7 +10,7 @@ class PGon(HasPts):
        
        Polygons limit their vertices to x and y dimensions, and enforce that they employ a basis.    Transformations of a polygon should generally be applied to the basis.    Any tranfromations of the underlying vertices should ensure that the returned vectors are limited to x and y dimensions
     """
-    subclass_attr = ['_edges'] # this list of props is unset anytime this HasPts object changes
+    subclass_attr = [] # this list of props is unset anytime this HasPts object changes
 
     def __init__(self, vertices=None, basis=None):
         """ PGon Constructor.
@@ -128,7 +128,12 @@ class PGon(HasPts):
                 my_pgon.edges
             
         """
-        return [self.seg(n) for n in range(len(self))]
+        # not cached, and found from the vertices rather than from the cached pts, as the vertices of a polygon may be altered in place
+        verts = self._verts
+        xs, ys, zs = [v.x for v in verts],[v.y for v in verts],[v.z for v in verts]
+        if not self.is_baseless : xs, ys, zs = self._basis._eval_xyz(xs,ys,zs)
+        pts = [Point(x,y,z) for x,y,z in zip(xs,ys,zs)]
+        return [Segment(pts[n],pts[(n+1)%len(pts)]) for n in range(len(pts))]
         
     @property
     def area(self):
@@ -224,14 +229,14 @@ class PGon(HasPts):
         # make a copy and rotate into initial position
         t = copy.deepcopy(self)
         xf = Xform.rotation(angle = (min_a - delta_a))
-        t._verts = [v * xf for v in t._verts]
+        xf.apply_many(t, in_place=True)
 
 
         # make transform for incremental rotations
         xf = Xform.rotation(angle = delta_a)
 
         for i in range(divs+1):
-            t._verts = [v * xf for v in t._verts]
+            xf.apply_many(t, in_place=True)
             b_area = t.bounds.dim_x * t.bounds.dim_y
             t_list.append([min_a + i*delta_a,b_area])
 
@@ -243,7 +248,7 @@ class PGon(HasPts):
         if levels == 0 :
             t = copy.deepcopy(self)
             xf = Xform.rotation(angle = min_vals[0])
-            t._verts = [v * xf for v in t._verts]
+            xf.apply_many(t, in_place=True)
             return t
         else:
             min_a = min_vals[0] - delta_a
@@ -548,7 +553,7 @@ class RGon(PGon):
     """
     A Regular Polygon Class
     """
-    subclass_attr = ['_edges'] # this list of props is unset any time this HasPts object changes
+    subclass_attr = [] # this list of props is unset any time this HasPts object changes
 
     def __init__(self, num_of_sides, radius=None, basis=None, edge_length=None, apothem=None):
         """ RGon Constructor.
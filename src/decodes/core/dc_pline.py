@@ -8,8 +8,7 @@ class PLine(HasPts):
     """
     a simple polyline class
     """
-    # TOD: remove all subclass_attr for PLine
-    subclass_attr = ['_edges','_length'] # this list of props is unset anytime this HasPts object changes
+    subclass_attr = [] # this list of props is unset anytime this HasPts object changes
     
     def __init__(self, vertices=None, basis=None):
         """ Polyline constructor.
@@ -44,11 +43,7 @@ class PLine(HasPts):
             
                 my_pline.edges
         """
-        try:
-            return copy.copy(self._edges)
-        except:
-            self._edges = tuple([ self.seg(n) for n in range(len(self)-1) ])
-            return copy.copy(self._edges)
+        return copy.copy(self._cached('edges',lambda: tuple([ self.seg(n) for n in range(len(self)-1) ])))
 
     @property
     def length(self):
@@ -57,17 +52,14 @@ class PLine(HasPts):
             :result: Length of this PLine
             :rtype: float
             
-            TODO: better to not store this, but calculate as needed?
-            
             ::
             
                 my_pline.length
         """
-        try:
-            return self._length
-        except:
-            self._length = sum([self.pts[n].distance(self.pts[n+1]) for n in range(-1,len(self.pts)-1) ] )
-            return self._length
+        def calc():
+            pts = self.pts
+            return sum([pts[n].distance(pts[n+1]) for n in range(-1,len(pts)-1) ] )
+        return self._cached('length',calc)
         
     def reversed(self) :
         """ Returns a copy of this PLine with the vertices reversed
@@ -97,7 +89,7 @@ class PLine(HasPts):
             
         """
         if self._basis != other.basis: raise BasisError("The basis for this PLine and the PLine you're joining it to do not match.")
-        self._unset_attr() # call this when any of storable properties (subclass_attr or class_attr) changes
+        self._unset_attr() # call this to invalidate all cached values
         if self[-1].is_equal(other[0],tol) :
             pts = []
             for s in self : pts.append(s)
@@ -1,6 +1,6 @@
 from decodes.core import *
 from . import dc_base, dc_vec #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
-import math, random, warnings, copy
+import math, random, warnings, copy, heapq
 if VERBOSE_FS: print("point.py loaded")
 
 
@@ -283,7 +283,7 @@ class Point(Vec):
                 Point.near_index(pt_a, pts)
                 
         """
-        dists = [pt.distance2(p) for p in pts]
+        dists = _distance2s(pt,pts)
         return dists.index(min(dists))
 
     @staticmethod
@@ -318,9 +318,112 @@ class Point(Vec):
             
                 Point.far_index(pt_a, pts)
         """
-        dists = [pt.distance2(p) for p in pts]
+        dists = _distance2s(pt,pts)
         return dists.index(max(dists))
 
+    @staticmethod
+    def k_near(pt, pts, k):
+        """ Returns the k points from the given list of points which are nearest to the source point, ordered by distance.
+
+            :param pt: Source point
+            :type pt: Point
+            :param pts: A list of points through which to search
+            :type pts: [Point] or PointArray
+            :param k: The number of points to return
+            :type k: int
+            :result: The k nearest points
+            :rtype: [Point]
+            
+            ::
+            
+                Point.k_near(pt_a, pts, 3)
+        """
+        return [pts[i] for i in Point.k_near_indices(pt,pts,k)]
+
+    @staticmethod
+    def k_near_indices(pt, pts, k):
+        """| Returns the indices of the k points within the given list of points which are nearest to the source point, ordered by distance.
+           | Only the k nearest points are sorted, the remainder are discarded by way of a heap.
+
+            :param pt: Source point
+            :type pt: Point
+            :param pts: A list of points through which to search
+            :type pts: [Point] or PointArray
+            :param k: The number of indices to return
+            :type k: int
+            :result: The indices of the k nearest points
+            :rtype: [int]
+            
+            ::
+            
+                Point.k_near_indices(pt_a, pts, 3)
+        """
+        dists = _distance2s(pt,pts)
+        return heapq.nsmallest(k, range(len(dists)), key=dists.__getitem__)
+
+    @staticmethod
+    def within(pt, pts, radius):
+        """ Returns the points from the given list of points which lie within the given distance of the source point, in the order in which they are given.
+
+            :param pt: Source point
+            :type pt: Point
+            :param pts: A list of points through which to search
+            :type pts: [Point] or PointArray
+            :param radius: Distance within which points are returned
+            :type radius: float
+            :result: The points within the given distance
+            :rtype: [Point]
+            
+            ::
+            
+                Point.within(pt_a, pts, 1.5)
+        """
+        return [pts[i] for i in Point.within_indices(pt,pts,radius)]
+
+    @staticmethod
+    def within_indices(pt, pts, radius):
+        """ Returns the indices of the points within the given list of points which lie within the given distance of the source point, in ascending order.
+
+            :param pt: Source point
+            :type pt: Point
+            :param pts: A list of points through which to search
+            :type pts: [Point] or PointArray
+            :param radius: Distance within which points are returned
+            :type radius: float
+            :result: The indices of the points within the given distance
+            :rtype: [int]
+        """
+        r2 = radius*radius
+        return [i for i, d2 in enumerate(_distance2s(pt,pts)) if d2 <= r2]
+
+    @staticmethod
+    def near_indices(queries, pts, k=1):
+        """| Returns, for each of the given query points, the index of the nearest point within the given list of points.
+           | If k is greater than 1, returns a list of the k nearest indices for each query point instead.
+           | The coordinates of the given list of points are gathered once, and shared by all queries.
+
+            :param queries: Source points
+            :type queries: [Point] or PointArray
+            :param pts: A list of points through which to search
+            :type pts: [Point] or PointArray
+            :param k: The number of indices to return for each query
+            :type k: int
+            :result: The index (or indices) of the nearest points to each query point
+            :rtype: [int] or [[int]]
+            
+            ::
+            
+                Point.near_indices(pts_a, pts_b)
+        """
+        if not isinstance(pts, VecArray) : pts = PointArray(pts)
+        idxs = range(len(pts))
+        ret = []
+        for q in queries:
+            dists = _distance2s(q,pts)
+            if k == 1 : ret.append(dists.index(min(dists)))
+            else : ret.append(heapq.nsmallest(k, idxs, key=dists.__getitem__))
+        return ret
+
     @staticmethod
     def interpolate(p0,p1,t=0.5): 
         """ Returns a new point which is the result of an interpolation between the two given points at the given t-value.
@@ -346,7 +449,7 @@ class Point(Vec):
         """ Returns the centroid of a point cloud.
         
             :param points: Point cloud
-            :type points: [Point]
+            :type points: [Point] or PointArray
             :result: Centroid of point cloud.
             :rtype: Point
             
@@ -380,37 +483,134 @@ class Point(Vec):
         return p
         
     @staticmethod
-    def cull_duplicates(pts, threshold = EPSILON):
-        """ Discards duplicate points from a list of points.
+    def cull_duplicates(pts, threshold = EPSILON, return_map = False):
+        """| Discards duplicate points from a list of points.
+           | Points are bucketed into a grid of cells the size of the given threshold, such that each point is only compared against kept points in neighboring cells.
+           | The first of any set of duplicate points is kept.
+           | If return_map is True, a list that relates the index of each given point to the index of the kept point it was merged with is also returned.
         
             :param pts: A list of points
-            :type pts: list
-            :param threshold: Tolerance of difference between points
+            :type pts: list or PointArray
+            :param threshold: Tolerance of distance between points. If None, points are compared by Point equality.
             :type threshold: float
-            :result: List of points without duplicates
-            :rtype: List
+            :param return_map: Boolean value.
+            :type return_map: bool
+            :result: List of points without duplicates, and optionally a list of indices relating the given points to the kept points
+            :rtype: List or (List, [int])
             
             ::
             
                 Point.cull_duplicates(pts)
+                
+                culled_pts, idx_map = Point.cull_duplicates(pts, 0.01, True)
         """
-        if len(pts)==0: return pts
-        if threshold == None:
-            culled_pts = []
-            for pt in pts: 
-                if not (pt in culled_pts) : culled_pts.append(pt)
-            return culled_pts
-        else:
-            culled_pts = [pts[0]]
-            for pt in pts:
-                is_good = True
-                for cpt in culled_pts:
-                    if pt.distance2(cpt) < threshold**2 : 
-                        is_good = False
-                        break
-                if is_good: culled_pts.append(pt)
-            return culled_pts
+        if len(pts)==0: 
+            if return_map : return pts, []
+            return pts
+        if threshold is None : keep_idxs, idx_map = _cull_indices(pts, EPSILON, True)
+        else : keep_idxs, idx_map = _cull_indices(pts, threshold)
+
+        culled_pts = [pts[i] for i in keep_idxs]
+        if return_map : return culled_pts, idx_map
+        return culled_pts
+
+
+
+
+def _distance2s(pt, pts):
+    """ Returns a list of the distances squared between the given point and each of the given points, without constructing any intermediate objects.
+    """
+    x, y, z = pt.x, pt.y, pt.z
+    if isinstance(pts, VecArray):
+        cs = pts.coords
+        return [(a-x)*(a-x) + (b-y)*(b-y) + (c-z)*(c-z) for a,b,c in zip(cs[0::3],cs[1::3],cs[2::3])]
+    return [(p.x-x)**2 + (p.y-y)**2 + (p.z-z)**2 for p in pts]
+
+
 
+def _cull_indices(pts, tol, per_coord=False):
+    """ Returns the indices of the points to keep when culling duplicates within the given tolerance, and a list that relates each given point to the index (within the list of kept points) of the point it was merged with.
+        If per_coord is True, points are considered duplicates when each of their coordinates differ by less than the tolerance, rather than their distance.
+    """
+    if isinstance(pts, VecArray):
+        cs = pts.coords
+        xyz = zip(cs[0::3],cs[1::3],cs[2::3])
+    else:
+        xyz = [(p.x,p.y,p.z) for p in pts]
+
+    keep_idxs, idx_map = [], []
+    kept = [] # coordinates of kept points
+    if tol <= 0:
+        # no tolerance given, only exact duplicates are culled
+        cells = {}
+        for n, tup in enumerate(xyz):
+            if tup not in cells:
+                cells[tup] = len(keep_idxs)
+                keep_idxs.append(n)
+            idx_map.append(cells[tup])
+        return keep_idxs, idx_map
+
+    floor, inv, tol2 = math.floor, 1.0/tol, tol*tol
+    offsets = [(i,j,k) for i in (-1,0,1) for j in (-1,0,1) for k in (-1,0,1)]
+    cells = {}
+    for n, (x,y,z) in enumerate(xyz):
+        cx, cy, cz = int(floor(x*inv)), int(floor(y*inv)), int(floor(z*inv))
+        match = -1
+        for i,j,k in offsets:
+            for m in cells.get((cx+i,cy+j,cz+k),()):
+                if match >= 0 and m > match : continue
+                kx, ky, kz = kept[m]
+                if per_coord: 
+                    if abs(x-kx) < tol and abs(y-ky) < tol and abs(z-kz) < tol : match = m
+                elif (x-kx)*(x-kx) + (y-ky)*(y-ky) + (z-kz)*(z-kz) < tol2 : match = m
+        if match < 0:
+            match = len(keep_idxs)
+            keep_idxs.append(n)
+            kept.append((x,y,z))
+            cells.setdefault((cx,cy,cz),[]).append(match)
+        idx_map.append(match)
+    return keep_idxs, idx_map
+
+
+
+class PointArray(VecArray):
+    """
+    a contiguous collection of points
+    
+    coordinates are stored interleaved in a single array of doubles, rather than as individual Point objects.
+    Points are only created when members are accessed individually.
+    """
+    _member_type = Point
 
+    def __repr__(self): 
+        return "pts[{0}]".format(len(self))
 
+    def distance2s(self, other):
+        """ Returns the distance squared between each member of this collection and the given Point (or the corresponding member of the given collection).
+        
+            :param other: Point or PointArray.
+            :type other: Point or PointArray
+            :result: Distances squared.
+            :rtype: array
+        """
+        return (self-other).length2s
+
+    def distances(self, other):
+        """ Returns the distance between each member of this collection and the given Point (or the corresponding member of the given collection).
+        
+            :param other: Point or PointArray.
+            :type other: Point or PointArray
+            :result: Distances.
+            :rtype: array
+        """
+        return (self-other).lengths
+
+    @property
+    def centroid(self):
+        """ Returns the centroid of the members of this collection.
+        
+            :result: Centroid.
+            :rtype: Point
+        """
+        return Point(self.average())
 
@@ -12,12 +12,15 @@ class Surface(IsParametrized):
     
     The function should expect two parameters u and v (float), and return a Point.
 
+    A surface may also be given an array function, which expects two lists of equal length containing u and v values, and returns a tuple of three lists containing the x, y and z coordinates of the surface at each pair.
+    Where it is given, a surface that evaluates many pairs of values at once (such as when building a mesh) calls it once for all of them.
+
     """
     
-    def __init__(self, function=None, dom_u=Interval(0,1), dom_v=Interval(0,1), tol_u=None, tol_v=None):
+    def __init__(self, function=None, dom_u=Interval(0,1), dom_v=Interval(0,1), tol_u=None, tol_v=None, array_function=None):
         """ Constructs a Curve object. If tolerance is None, Curve.tol = tol_max().
         
-            :param function: A function returning points.
+            :param function: A function returning points. May be omitted if an array function is given.
             :type function: function
             :param dom_u: Domain for u-value of curve points.
             :type dom_u: Interval
@@ -27,6 +30,8 @@ class Surface(IsParametrized):
             :type tol_u: float
             :param tol_v: The tolerance of v-direction of this Surface expressed in domain space.
             :type tol_v: float
+            :param array_function: A function returning the coordinates of points at many pairs of u and v values.
+            :type array_function: function
             :result: Surface object.
             :rtype: Surface
             
@@ -36,7 +41,12 @@ class Surface(IsParametrized):
                     return Point(u,v)
                 Int=Interval(1,20)
                 my_surf=Surface(func,Int,Int)
+
+                def array_func(us,vs):
+                    return us, vs, [0.0]*len(us)
+                my_surf=Surface(dom_u=Int, dom_v=Int, array_function=array_func)
         """
+        function = self._set_array_func(function, array_function)
         if function is not None : self._func = function
         self._dom = dom_u, dom_v
         self._tol = self.tol_max
@@ -73,6 +83,27 @@ class Surface(IsParametrized):
             self._surrogate = self.to_mesh()
             return self._surrogate
 
+    def _set_array_func(self, function, array_function):
+        """ Stores the given array function, if any, and returns the given function, or a function that calls the array function if none is given.
+        """
+        if array_function is None : return function
+        self._array_func = array_function
+        if function is not None : return function
+        def point_func(u,v):
+            xs, ys, zs = array_function([u],[v])
+            return Point(xs[0],ys[0],zs[0])
+        return point_func
+
+    def _sample_many(self, us, vs):
+        """ Returns the results of the function of this Surface at each of the given pairs of u and v values.
+            Where this Surface has an array function, it is called once for all of the given pairs.
+        """
+        if self._array_func is None : return [self._func(u,v) for u,v in zip(us,vs)]
+        xs, ys, zs = self._array_func(us,vs)
+        pts = [Point(x,y,z) for x,y,z in zip(xs,ys,zs)]
+        if len(pts) != len(us) : raise GeometricError("Surface not valid: The given array function returned %s points for %s pairs of values"%(len(pts),len(us)))
+        return pts
+
     def _rebuild_surrogate(self):
         """Deletes attributes of this surrogate Surface.
         
@@ -241,6 +272,16 @@ class Surface(IsParametrized):
         
         return Point(self.func(u,v))
 
+    def _deval_many(self,us,vs):
+        """ Evaluates this Surface at each of the given pairs of u and v values, as does deval, and returns a list of Points.
+            Where this Surface has an array function, it is called once for all of the given pairs.
+        """
+        for u in us:
+            if u not in self.domain_u : raise DomainError("Surface evaluated outside the bounds of its u-domain: deval(%s) %s"%(u,self.domain_u))
+        for v in vs:
+            if v not in self.domain_v : raise DomainError("Surface evaluated outside the bounds of its v-domain: deval(%s) %s"%(v,self.domain_v))
+        return [Point(pt) for pt in self._sample_many(us,vs)]
+
 
     def deval_pln(self,u,v):
         """| Evaluates this Surface and returns a Plane.
@@ -409,14 +450,12 @@ class Surface(IsParametrized):
         weights = [0]*len(ngbr) 
 
         #Compute the normal vector and tangent plane at the point pt_uv
-        N_vec = Vec(0,0,0)
-        for k in range(len(ngbr.faces)):
-            verts = ngbr.face_pts(k)
-            face_area = 0.5*Vec(verts[0],verts[1]).cross(Vec(verts[0],verts[2])).length #Triangular face area
-            N_vec = N_vec + ngbr.face_normal(k)*face_area
-            for i in ngbr.faces[k]:
-                weights[i] += face_area
-        N_vec = N_vec.normalized()
+        #every face touches p_uv, so the area-weighted vertex normal at p_uv averages all face normals
+        face_areas = ngbr.face_areas
+        for k, face in enumerate(ngbr.faces):
+            for i in face:
+                weights[i] += face_areas[k]
+        N_vec = ngbr.vertex_normals[0]
         tangent_plane = Plane(pt_uv, N_vec)
 
         #Compute the principal curvatures and directions at the point pt_uv (*)
@@ -612,31 +651,38 @@ class Surface(IsParametrized):
         #nearest neighbors along u and v axis of point(u,v); used for discrete approximations calculations 
         if u not in self.domain_u : raise DomainError("Surface evaluated outside the bounds of its u-domain: deval(%s) %s"%(u,self.domain_u))
         if v not in self.domain_v : raise DomainError("Surface evaluated outside the bounds of its v-domain: deval(%s) %s"%(v,self.domain_v))
-        pt = Point(self.func(u,v))
+        # the neighbors required are evaluated together, in a single call to any array function
+        uvs = [(u,v)]
+        if (u+self.tol_u_nudge <= self.domain_u.b) : uvs.append((u + self.tol_u_nudge,v))
+        if (u+self.tol_u_nudge > self.domain_u.b) or (include_negs and u-self.tol_u_nudge >= self.domain_u.a) : uvs.append((u - self.tol_u_nudge,v))
+        if (v+self.tol_v_nudge <= self.domain_v.b) : uvs.append((u,v + self.tol_v_nudge))
+        if (v+self.tol_v_nudge > self.domain_v.b) or (include_negs and v-self.tol_v_nudge >= self.domain_v.a) : uvs.append((u,v - self.tol_v_nudge))
+        pts = dict(zip(uvs,self._sample_many([uv[0] for uv in uvs],[uv[1] for uv in uvs])))
+        pt = Point(pts[(u,v)])
         
         vec_u = False
         vec_ui = False
         if (u+self.tol_u_nudge <= self.domain_u.b): 
-            vec_u = Vec(pt,self.func(u + self.tol_u_nudge,v))
+            vec_u = Vec(pt,pts[(u + self.tol_u_nudge,v)])
         else:
-            vec_ui = Vec(pt,self.func(u - self.tol_u_nudge,v))
+            vec_ui = Vec(pt,pts[(u - self.tol_u_nudge,v)])
             vec_u = vec_ui.inverted()
 
         vec_v = False
         vec_vi = False
         if (v+self.tol_v_nudge <= self.domain_v.b): 
-            vec_v = Vec(pt,self.func(u,v + self.tol_v_nudge))
+            vec_v = Vec(pt,pts[(u,v + self.tol_v_nudge)])
         else:
-            vec_vi = Vec(pt,self.func(u,v - self.tol_v_nudge))
+            vec_vi = Vec(pt,pts[(u,v - self.tol_v_nudge)])
             vec_v = vec_vi.inverted()
 
         if not include_negs : return pt,vec_u,vec_v
 
         if not vec_ui: 
-            if (u-self.tol_u_nudge >= self.domain_u.a): vec_ui = Vec(pt,self.func(u - self.tol_u_nudge,v))
+            if (u-self.tol_u_nudge >= self.domain_u.a): vec_ui = Vec(pt,pts[(u - self.tol_u_nudge,v)])
             else : vec_ui = vec_u.inverted()
         if not vec_vi: 
-            if (v-self.tol_v_nudge >= self.domain_v.a): vec_vi = Vec(pt,self.func(u,v - self.tol_v_nudge))
+            if (v-self.tol_v_nudge >= self.domain_v.a): vec_vi = Vec(pt,pts[(u,v - self.tol_v_nudge)])
             else : vec_vi = vec_v.inverted()
 
         return pt,vec_u,vec_ui,vec_v,vec_vi
@@ -665,7 +711,7 @@ class Surface(IsParametrized):
         u_vals = self.domain_u.divide((divs_u),True)
         v_vals = self.domain_v.divide((divs_v),True)
 
-        pts = [self._func(u,v) for v in v_vals for u in u_vals]
+        pts = self._sample_many([u for v in v_vals for u in u_vals],[v for v in v_vals for u in u_vals])
         '''
         equiv to
         for v in v_vals:
@@ -675,43 +721,20 @@ class Surface(IsParametrized):
         msh = Mesh(pts)
 
         res_u = len(u_vals)
+        quads = []
+        for v in range(len(v_vals)-1):
+            row = v*res_u
+            quads.extend([(row+u, row+u+1, row+u+res_u+1, row+u+res_u) for u in range(res_u-1)])
+            if do_close:
+                #last face in the row
+                quads.append((row+res_u-1, row+0, row+res_u, row+res_u-1+res_u))
+
         if tris is False:
             # simple quadrangulation style
-            for v in range(len(v_vals)):
-                row = v*res_u
-                for u in range(len(u_vals)-1):
-                    pi_0 = row+u
-                    pi_1 = row+u+1
-                    pi_2 = row+u+res_u+1
-                    pi_3 = row+u+res_u
-                    msh.add_face(pi_0,pi_1,pi_2,pi_3)
-                if do_close:
-                    #last two faces in the row
-                    pi_0 = row+res_u-1
-                    pi_1 = row+0
-                    pi_2 = row+res_u
-                    pi_3 = row+res_u-1+res_u
-                    msh.add_face(pi_0,pi_1,pi_2,pi_3)
-        
+            msh.add_faces([i for quad in quads for i in quad], 4)
         else:
             # simple triangulation style
-            for v in range(len(v_vals)):
-                row = v*res_u
-                for u in range(len(u_vals)-1):
-                    pi_0 = row+u
-                    pi_1 = row+u+1
-                    pi_2 = row+u+res_u+1
-                    pi_3 = row+u+res_u
-                    msh.add_face(pi_0,pi_1,pi_2)
-                    msh.add_face(pi_0,pi_2,pi_3)
-                if do_close:
-                    #last two faces in the row
-                    pi_0 = row+res_u-1
-                    pi_1 = row+0
-                    pi_2 = row+res_u
-                    pi_3 = row+res_u-1+res_u
-                    msh.add_face(pi_0,pi_1,pi_2)
-                    msh.add_face(pi_0,pi_2,pi_3)
+            msh.add_faces([i for a,b,c,d in quads for i in (a,b,c, a,c,d)], 3)
         
         return msh
 
@@ -774,12 +797,14 @@ class Surface(IsParametrized):
             if u_val<self.u0 or u_val>self.u1 : raise DomainError("Isocurve cannot be generated outside the bounds of this Surface's u-domain (%s) %s"%(u_val,self.domain_u))
             if dom is None : dom = self.domain_v
             if res is None : res = int(dom.delta / self.tol_v)
-            return PLine([self.deval(u_val,v) for v in dom.divide(res,True)])
+            vs = dom.divide(res,True)
+            return PLine(self._deval_many([u_val]*len(vs),vs))
         else :
             # we're plotting a v-iso
             if v_val<self.v0 or v_val>self.v1 : raise DomainError("Isocurve cannot be generated outside the bounds of this Surface's v-domain (%s) %s"%(v_val,self.domain_v))
             if dom is None : dom = self.domain_u
             if res is None : res = int(dom.delta / self.tol_u)
-            return PLine([self.deval(u,v_val) for u in dom.divide(res,True)])
+            us = dom.divide(res,True)
+            return PLine(self._deval_many(us,[v_val]*len(us)))
 
 
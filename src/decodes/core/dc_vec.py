@@ -2,6 +2,7 @@ from decodes.core import *
 from . import dc_base #here we may only import modules that have been loaded before this one.    see core/__init__.py for proper order
 
 import math, random
+from array import array
 if VERBOSE_FS: print("vec.py loaded")
 
 
@@ -233,6 +234,8 @@ class Vec(Geometry):
 
         """    
         return self.is_equal(other)
+    # vecs are mutable, and so are hashed by identity (as they are by default in python 2) rather than by position
+    __hash__ = object.__hash__
     def __ne__(self, other): 
         """ Overloads the not equal **(!=)** operator for vector length.
         
@@ -459,7 +462,7 @@ class Vec(Geometry):
         """ Returns the average of a list of vectors.
         
             :param vecs: List of vectors to average. 
-            :type vecs: list
+            :type vecs: list or VecArray
             :result: Averaged vector.
             :rtype: Vec
             
@@ -467,6 +470,7 @@ class Vec(Geometry):
             
                 Vec.average(my_vec, vec_1)
         """
+        if isinstance(vecs, VecArray) : return vecs.average()
         return Vec( 
             sum([float(v.x) for v in vecs])/len(vecs) , 
             sum([float(v.y) for v in vecs])/len(vecs) , 
@@ -727,4 +731,345 @@ class Vec(Geometry):
             :result: Unit vec in the z-axis.
             :rtype: Vec
         """
-        return Vec(0,0,length)
\ No newline at end of file
+        return Vec(0,0,length)
+
+
+class VecArray(Geometry):
+    """
+    a contiguous collection of vectors
+    
+    coordinates are stored interleaved (x0,y0,z0,x1,y1,z1...) in a single array of doubles, rather than as individual Vec objects.
+    arithmetic on a VecArray is applied to every member at once, and Vec objects are only created when members are accessed individually.
+    """
+    _member_type = Vec # the class of object produced when accessing individual members of this collection
+
+    def __init__(self, vecs=None):
+        """ VecArray Constructor.
+
+            :param vecs: Vecs (or anything with x,y,z attributes) to store, or another VecArray.
+            :type vecs: [Vec] or VecArray
+            :result: VecArray object.
+            :rtype: VecArray
+            
+            ::
+            
+                my_vecs=VecArray([Vec(1,0,0),Vec(0,1,0)])
+                
+        """
+        if vecs is None : self._coords = array('d')
+        elif isinstance(vecs, VecArray) : self._coords = array('d',vecs._coords)
+        else : 
+            self._coords = array('d')
+            self.extend(vecs)
+
+    @classmethod
+    def from_coords(cls, coords):
+        """ Constructs a new collection from a flat sequence of interleaved coordinates (x0,y0,z0,x1,y1,z1...)
+        
+            :param coords: Flat sequence of numbers, the length of which must be a multiple of three.
+            :type coords: [float]
+            :result: New collection.
+            :rtype: VecArray
+            
+            ::
+            
+                VecArray.from_coords([1,0,0, 0,1,0])
+        """
+        ret = cls()
+        ret._coords = array('d',coords)
+        if len(ret._coords)%3 != 0 : raise GeometricError("The number of coordinates given to construct a %s must be a multiple of three."%(cls.__name__))
+        return ret
+
+    @classmethod
+    def from_tuples(cls, tups):
+        """ Constructs a new collection from a sequence of (x,y,z) tuples.
+        
+            :param tups: Sequence of tuples of three numbers.
+            :type tups: [(float,float,float)]
+            :result: New collection.
+            :rtype: VecArray
+        """
+        return cls.from_coords([c for tup in tups for c in tup])
+
+    @classmethod
+    def _from_xyz(cls, xs, ys, zs):
+        """ Constructs a new collection from three separate sequences of x, y and z values of equal length.
+        """
+        ret = cls()
+        ret._coords = _interleaved(xs,ys,zs)
+        return ret
+
+    @property
+    def coords(self):
+        """ Returns the flat array of interleaved coordinates that backs this collection. Alterations to this array alter this collection.
+        
+            :result: Interleaved coordinates (x0,y0,z0,x1,y1,z1...)
+            :rtype: array
+        """
+        return self._coords
+
+    @property
+    def xs(self): 
+        """ Returns the x-values of the members of this collection.
+
+            :result: x values.
+            :rtype: array
+        """
+        return self._coords[0::3]
+
+    @property
+    def ys(self): 
+        """ Returns the y-values of the members of this collection.
+
+            :result: y values.
+            :rtype: array
+        """
+        return self._coords[1::3]
+
+    @property
+    def zs(self): 
+        """ Returns the z-values of the members of this collection.
+
+            :result: z values.
+            :rtype: array
+        """
+        return self._coords[2::3]
+
+    def __len__(self): 
+        return len(self._coords)//3
+
+    def __iter__(self):
+        c, cls = self._coords, self._member_type
+        for n in range(0,len(c),3): yield cls(c[n],c[n+1],c[n+2])
+
+    def __getitem__(self, index):
+        """ Returns the member at the given index as a new object, or a new collection if given a slice.
+        
+            :param index: Index or slice.
+            :type index: int or slice
+            :result: Vec or VecArray
+            :rtype: Vec or VecArray
+        """
+        if isinstance(index, slice):
+            ret = self.__class__()
+            ret._coords = _interleaved(*[self._coords[a::3][index] for a in range(3)])
+            return ret
+        n = len(self)
+        if index < 0 : index += n
+        if index < 0 or index >= n : raise IndexError("%s index out of range"%(self.__class__.__name__))
+        c = self._coords
+        return self._member_type(c[3*index],c[3*index+1],c[3*index+2])
+
+    def __setitem__(self, index, other):
+        """ Replaces the coordinates of the member at the given index with those of the given object.
+        
+            :param index: Index to replace.
+            :type index: int
+            :param other: A Vec (or anything with x,y,z attributes).
+            :type other: Vec
+        """
+        n = len(self)
+        if index < 0 : index += n
+        if index < 0 or index >= n : raise IndexError("%s index out of range"%(self.__class__.__name__))
+        self._coords[3*index:3*index+3] = array('d',(other.x,other.y,other.z))
+
+    def append(self, other):
+        """ Appends the coordinates of the given object to the end of this collection.
+        
+            :param other: A Vec (or anything with x,y,z attributes).
+            :type other: Vec
+        """
+        self._coords.extend((other.x,other.y,other.z))
+
+    def extend(self, others):
+        """ Appends the coordinates of each of the given objects to the end of this collection.
+        
+            :param others: Vecs (or anything with x,y,z attributes), or another VecArray.
+            :type others: [Vec] or VecArray
+        """
+        if isinstance(others, VecArray) : self._coords.extend(others._coords)
+        else : self._coords.extend([c for o in others for c in (o.x,o.y,o.z)])
+
+    def to_tuples(self):
+        """ Returns a list of (x,y,z) tuples, one for each member of this collection.
+        
+            :result: List of tuples.
+            :rtype: [(float,float,float)]
+        """
+        c = self._coords
+        return list(zip(c[0::3],c[1::3],c[2::3]))
+
+    def __repr__(self): 
+        return "vecs[{0}]".format(len(self))
+
+    def _operands(self, other):
+        """ Returns the x, y and z values of the given operand ready to be paired with the members of this collection: either another collection of equal length, or a single object that is broadcast.
+        """
+        if isinstance(other, VecArray) :
+            if len(other) != len(self) : raise GeometricError("Cannot combine collections of differing lengths: %s and %s"%(len(self),len(other)))
+            return other._coords[0::3], other._coords[1::3], other._coords[2::3]
+        n = len(self)
+        return [other.x]*n, [other.y]*n, [other.z]*n
+
+    def __add__(self, other):
+        """| Overloads the addition **(+)** operator. 
+           | Returns a new collection that results from adding the given Vec (or each member of the given collection) to each member of this collection.
+        
+           :param other: Vec or VecArray to be added.
+           :type other: Vec or VecArray
+           :result: New collection.
+           :rtype: VecArray
+        """
+        ox,oy,oz = self._operands(other)
+        c = self._coords
+        return self.__class__._from_xyz( 
+            [a+b for a,b in zip(c[0::3],ox)], 
+            [a+b for a,b in zip(c[1::3],oy)], 
+            [a+b for a,b in zip(c[2::3],oz)] 
+        )
+
+    def __sub__(self, other):
+        """| Overloads the subtraction **(-)** operator. 
+           | Returns a new collection that results from subtracting the given Vec (or each member of the given collection) from each member of this collection.
+        
+           :param other: Vec or VecArray to be subtracted.
+           :type other: Vec or VecArray
+           :result: New collection.
+           :rtype: VecArray
+        """
+        ox,oy,oz = self._operands(other)
+        c = self._coords
+        return self.__class__._from_xyz( 
+            [a-b for a,b in zip(c[0::3],ox)], 
+            [a-b for a,b in zip(c[1::3],oy)], 
+            [a-b for a,b in zip(c[2::3],oz)] 
+        )
+
+    def __mul__(self, other):
+        """| Overloads the multiplication **(*)** operator. 
+           | If given a scalar, returns a new collection that results from multiplying each member of this collection by the scalar.
+           | If given an Xform, applies the transformation to each member of this collection.
+        
+           :param other: Scalar or Xform.
+           :type other: float or Xform
+           :result: New collection.
+           :rtype: VecArray
+        """
+        from .dc_xform import Xform
+        if isinstance(other, Xform) : return other*self
+        ret = self.__class__()
+        ret._coords = array('d',[a*other for a in self._coords])
+        return ret
+
+    def __truediv__(self,other):
+        return self.__div__(other)
+
+    def __div__(self, scalar): 
+        """| Overloads the division **(/)** operator. 
+           | Returns a new collection that results from dividing each member of this collection by the given scalar.
+        
+           :param scalar: Number to divide by.
+           :type scalar: float
+           :result: New collection.
+           :rtype: VecArray
+        """
+        f = 1.0/float(scalar)
+        ret = self.__class__()
+        ret._coords = array('d',[a*f for a in self._coords])
+        return ret
+
+    def __neg__(self): 
+        """| Overloads the arithmetic negation **(-vecs)** operator. 
+           | Returns a new collection with each member inverted.
+        """
+        ret = self.__class__()
+        ret._coords = array('d',[-a for a in self._coords])
+        return ret
+
+    def dot(self, other):
+        """ Computes the dot product of each member of this collection and the given Vec (or the corresponding member of the given collection).
+        
+            :param other: Vec or VecArray.
+            :type other: Vec or VecArray
+            :result: Dot products.
+            :rtype: array
+        """
+        ox,oy,oz = self._operands(other)
+        c = self._coords
+        return array('d',[ax*bx+ay*by+az*bz for ax,ay,az,bx,by,bz in zip(c[0::3],c[1::3],c[2::3],ox,oy,oz)])
+
+    def cross(self, other):
+        """ Computes the cross product of each member of this collection and the given Vec (or the corresponding member of the given collection).
+        
+            :param other: Vec or VecArray.
+            :type other: Vec or VecArray
+            :result: New collection of Vecs.
+            :rtype: VecArray
+        """
+        ox,oy,oz = self._operands(other)
+        c = self._coords
+        xyz = list(zip(c[0::3],c[1::3],c[2::3],ox,oy,oz))
+        return VecArray._from_xyz( 
+            [ay*bz - az*by for ax,ay,az,bx,by,bz in xyz], 
+            [az*bx - ax*bz for ax,ay,az,bx,by,bz in xyz], 
+            [ax*by - ay*bx for ax,ay,az,bx,by,bz in xyz] 
+        )
+
+    @property
+    def length2s(self):
+        """ Returns the length squared of each member of this collection.
+        
+            :result: Lengths squared.
+            :rtype: array
+        """
+        c = self._coords
+        return array('d',[x*x+y*y+z*z for x,y,z in zip(c[0::3],c[1::3],c[2::3])])
+
+    @property
+    def lengths(self):
+        """ Returns the length of each member of this collection. Use VecArray.length2s when possible, as it is cheaper to calculate.
+        
+            :result: Lengths.
+            :rtype: array
+        """
+        sqrt = math.sqrt
+        return array('d',[sqrt(l2) for l2 in self.length2s])
+
+    def normalized(self, length=1.0):
+        """ Returns a new collection with each member scaled to the given length (default 1.0).
+        
+            :param length: New length for each member (default 1.0)
+            :type length: float
+            :result: Normalized collection.
+            :rtype: VecArray
+        """
+        lens = self.lengths
+        if len(lens)>0 and min(lens) == 0 : raise GeometricError("Cannot normalize a vector of length zero: index %s"%(list(lens).index(0)))
+        c = self._coords
+        fs = [length/l for l in lens]
+        return self.__class__._from_xyz( 
+            [a*f for a,f in zip(c[0::3],fs)], 
+            [a*f for a,f in zip(c[1::3],fs)], 
+            [a*f for a,f in zip(c[2::3],fs)] 
+        )
+
+    def average(self):
+        """ Returns the average of the members of this collection.
+        
+            :result: Averaged vector.
+            :rtype: Vec
+        """
+        n = float(len(self))
+        c = self._coords
+        return Vec( sum(c[0::3])/n, sum(c[1::3])/n, sum(c[2::3])/n )
+
+
+
+def _interleaved(xs, ys, zs):
+    """ Returns a flat array of doubles that interleaves the given sequences of x, y and z values.
+    """
+    coords = array('d',[0.0])*(3*len(xs))
+    coords[0::3] = array('d',xs)
+    coords[1::3] = array('d',ys)
+    coords[2::3] = array('d',zs)
+    return coords
@@ -1,5 +1,7 @@
 from decodes.core import *
 from . import dc_base, dc_vec, dc_point, dc_cs, dc_line, dc_mesh, dc_pgon
+from .dc_vec import _interleaved
+import copy
 
 
 if VERBOSE_FS: print("xform.py loaded")
@@ -32,12 +34,56 @@ class Xform(object):
         "\n\t\t[{},{},{},{}]".format(self.c41,self.c42,self.c43,self.c44) )
     
     def strip_translation(self):
+        """ Returns a copy of this Xform with the translation components removed.
+        
+            :result: Xform without translation.
+            :rtype: Xform
+        """
         m = list(self._m)
-        xf = Xform(matrix = m)
-        xf.c14 = 0
-        xf.c24 = 0
-        xf.c34 = 0
-        return xf
+        m[3], m[7], m[11] = 0, 0, 0
+        return Xform(matrix = m)
+
+    def inverse(self):
+        """ Returns the inverse of this Xform. The result is cached, and recalculated only if the values of this matrix have changed.
+        
+            :result: Inverted Xform.
+            :rtype: Xform
+        """
+        key = tuple(self._m)
+        try:
+            if self._inv_key == key : return Xform(matrix = list(self._inv))
+        except AttributeError:
+            pass
+        self._inv = Xform._inverted_matrix(self._m)
+        self._inv_key = key
+        return Xform(matrix = list(self._inv))
+
+    @staticmethod
+    def _inverted_matrix(m):
+        """ Returns the inverse of the given 4x4 matrix (expressed as a flat list of 16 values in row-major order) by cofactor expansion.
+        """
+        inv = [0.0]*16
+        inv[0] = m[5]*m[10]*m[15] - m[5]*m[11]*m[14] - m[9]*m[6]*m[15] + m[9]*m[7]*m[14] + m[13]*m[6]*m[11] - m[13]*m[7]*m[10]
+        inv[4] = -m[4]*m[10]*m[15] + m[4]*m[11]*m[14] + m[8]*m[6]*m[15] - m[8]*m[7]*m[14] - m[12]*m[6]*m[11] + m[12]*m[7]*m[10]
+        inv[8] = m[4]*m[9]*m[15] - m[4]*m[11]*m[13] - m[8]*m[5]*m[15] + m[8]*m[7]*m[13] + m[12]*m[5]*m[11] - m[12]*m[7]*m[9]
+        inv[12] = -m[4]*m[9]*m[14] + m[4]*m[10]*m[13] + m[8]*m[5]*m[14] - m[8]*m[6]*m[13] - m[12]*m[5]*m[10] + m[12]*m[6]*m[9]
+        inv[1] = -m[1]*m[10]*m[15] + m[1]*m[11]*m[14] + m[9]*m[2]*m[15] - m[9]*m[3]*m[14] - m[13]*m[2]*m[11] + m[13]*m[3]*m[10]
+        inv[5] = m[0]*m[10]*m[15] - m[0]*m[11]*m[14] - m[8]*m[2]*m[15] + m[8]*m[3]*m[14] + m[12]*m[2]*m[11] - m[12]*m[3]*m[10]
+        inv[9] = -m[0]*m[9]*m[15] + m[0]*m[11]*m[13] + m[8]*m[1]*m[15] - m[8]*m[3]*m[13] - m[12]*m[1]*m[11] + m[12]*m[3]*m[9]
+        inv[13] = m[0]*m[9]*m[14] - m[0]*m[10]*m[13] - m[8]*m[1]*m[14] + m[8]*m[2]*m[13] + m[12]*m[1]*m[10] - m[12]*m[2]*m[9]
+        inv[2] = m[1]*m[6]*m[15] - m[1]*m[7]*m[14] - m[5]*m[2]*m[15] + m[5]*m[3]*m[14] + m[13]*m[2]*m[7] - m[13]*m[3]*m[6]
+        inv[6] = -m[0]*m[6]*m[15] + m[0]*m[7]*m[14] + m[4]*m[2]*m[15] - m[4]*m[3]*m[14] - m[12]*m[2]*m[7] + m[12]*m[3]*m[6]
+        inv[10] = m[0]*m[5]*m[15] - m[0]*m[7]*m[13] - m[4]*m[1]*m[15] + m[4]*m[3]*m[13] + m[12]*m[1]*m[7] - m[12]*m[3]*m[5]
+        inv[14] = -m[0]*m[5]*m[14] + m[0]*m[6]*m[13] + m[4]*m[1]*m[14] - m[4]*m[2]*m[13] - m[12]*m[1]*m[6] + m[12]*m[2]*m[5]
+        inv[3] = -m[1]*m[6]*m[11] + m[1]*m[7]*m[10] + m[5]*m[2]*m[11] - m[5]*m[3]*m[10] - m[9]*m[2]*m[7] + m[9]*m[3]*m[6]
+        inv[7] = m[0]*m[6]*m[11] - m[0]*m[7]*m[10] - m[4]*m[2]*m[11] + m[4]*m[3]*m[10] + m[8]*m[2]*m[7] - m[8]*m[3]*m[6]
+        inv[11] = -m[0]*m[5]*m[11] + m[0]*m[7]*m[9] + m[4]*m[1]*m[11] - m[4]*m[3]*m[9] - m[8]*m[1]*m[7] + m[8]*m[3]*m[5]
+        inv[15] = m[0]*m[5]*m[10] - m[0]*m[6]*m[9] - m[4]*m[1]*m[10] + m[4]*m[2]*m[9] + m[8]*m[1]*m[6] - m[8]*m[2]*m[5]
+
+        det = m[0]*inv[0] + m[1]*inv[4] + m[2]*inv[8] + m[3]*inv[12]
+        if det == 0 : raise GeometricError("This Xform cannot be inverted: the determinant of its matrix is zero")
+        det = 1.0/det
+        return [v*det for v in inv]
     
     @staticmethod
     def translation(vec):
@@ -225,26 +271,26 @@ class Xform(object):
            :rtype: object
         """
         if isinstance(other, Xform) : 
-            xf = Xform()
-            xf._m = [
-                self.c11 * other.c11 + self.c12 * other.c21 + self.c13 * other.c31 + self.c14 * other.c41,
-                self.c11 * other.c12 + self.c12 * other.c22 + self.c13 * other.c32 + self.c14 * other.c42,
-                self.c11 * other.c13 + self.c12 * other.c23 + self.c13 * other.c33 + self.c14 * other.c43,
-                self.c11 * other.c14 + self.c12 * other.c24 + self.c13 * other.c34 + self.c14 * other.c44,
-                self.c21 * other.c11 + self.c22 * other.c21 + self.c23 * other.c31 + self.c24 * other.c41,
-                self.c21 * other.c12 + self.c22 * other.c22 + self.c23 * other.c32 + self.c24 * other.c42,
-                self.c21 * other.c13 + self.c22 * other.c23 + self.c23 * other.c33 + self.c24 * other.c43,
-                self.c21 * other.c14 + self.c22 * other.c24 + self.c23 * other.c34 + self.c24 * other.c44,
-                self.c31 * other.c11 + self.c32 * other.c21 + self.c33 * other.c31 + self.c34 * other.c41,
-                self.c31 * other.c12 + self.c32 * other.c22 + self.c33 * other.c32 + self.c34 * other.c42,
-                self.c31 * other.c13 + self.c32 * other.c23 + self.c33 * other.c33 + self.c34 * other.c43,
-                self.c31 * other.c14 + self.c32 * other.c24 + self.c33 * other.c34 + self.c34 * other.c44,
-                self.c41 * other.c11 + self.c42 * other.c21 + self.c43 * other.c31 + self.c44 * other.c41,
-                self.c41 * other.c12 + self.c42 * other.c22 + self.c43 * other.c32 + self.c44 * other.c42,
-                self.c41 * other.c13 + self.c42 * other.c23 + self.c43 * other.c33 + self.c44 * other.c43,
-                self.c41 * other.c14 + self.c42 * other.c24 + self.c43 * other.c34 + self.c44 * other.c44,
-            ]
-            return xf
+            a11,a12,a13,a14,a21,a22,a23,a24,a31,a32,a33,a34,a41,a42,a43,a44 = self._m
+            b11,b12,b13,b14,b21,b22,b23,b24,b31,b32,b33,b34,b41,b42,b43,b44 = other._m
+            return Xform(matrix=[
+                a11 * b11 + a12 * b21 + a13 * b31 + a14 * b41,
+                a11 * b12 + a12 * b22 + a13 * b32 + a14 * b42,
+                a11 * b13 + a12 * b23 + a13 * b33 + a14 * b43,
+                a11 * b14 + a12 * b24 + a13 * b34 + a14 * b44,
+                a21 * b11 + a22 * b21 + a23 * b31 + a24 * b41,
+                a21 * b12 + a22 * b22 + a23 * b32 + a24 * b42,
+                a21 * b13 + a22 * b23 + a23 * b33 + a24 * b43,
+                a21 * b14 + a22 * b24 + a23 * b34 + a24 * b44,
+                a31 * b11 + a32 * b21 + a33 * b31 + a34 * b41,
+                a31 * b12 + a32 * b22 + a33 * b32 + a34 * b42,
+                a31 * b13 + a32 * b23 + a33 * b33 + a34 * b43,
+                a31 * b14 + a32 * b24 + a33 * b34 + a34 * b44,
+                a41 * b11 + a42 * b21 + a43 * b31 + a44 * b41,
+                a41 * b12 + a42 * b22 + a43 * b32 + a44 * b42,
+                a41 * b13 + a42 * b23 + a43 * b33 + a44 * b43,
+                a41 * b14 + a42 * b24 + a43 * b34 + a44 * b44,
+            ])
         
         return self.transform(other)
         
@@ -261,10 +307,17 @@ class Xform(object):
         # HASPTS GEOMETRY
         # applies transformation to the verts, leaving the basis intact
         if isinstance(other, HasPts) : 
-            #raise NotImplementedError("can't xform a haspts")
-            other._verts = [v*self for v in other._verts]
-            return other
-            # TODO: deal with applying transformations to haspts geometry
+            return self.apply_many(other, in_place=True)
+
+        # DEFERRED TRANSFORMATIONS
+        # records this transformation without touching the underlying geometry
+        if isinstance(other, XformChain) : 
+            return other*self
+            
+        # COLLECTIONS
+        # transforms the entire coordinate block at once, returning a new collection
+        if isinstance(other, VecArray) : 
+            return self.apply_many(other)
             
 
         # BASED GEOMETRY
@@ -355,6 +408,59 @@ class Xform(object):
         
         
         
+    def apply_many(self, others, in_place=False):
+        """| Applies this Xform to many vectors or points at once, in a single pass over their coordinates.
+           | Accepts a VecArray (or PointArray), a HasPts object (in which case the vertices are transformed, leaving the basis intact), or a list of Vecs or Points.
+           | If in_place is True, the given objects are altered and returned. Otherwise, new objects are returned.
+            
+           :param others: Collection of geometry to transform.
+           :type others: VecArray, HasPts, or [Vec]
+           :param in_place: Boolean value.
+           :type in_place: bool
+           :result: Transformed geometry.
+           :rtype: VecArray, HasPts, or [Vec]
+           
+           ::
+           
+                pts = Xform.translation(Vec(0,0,1)).apply_many(pts)
+        """
+        if isinstance(others, VecArray) :
+            c = others._coords
+            ret = others if in_place else others.__class__()
+            ret._coords = _interleaved(*self._xform_xyz(c[0::3],c[1::3],c[2::3]))
+            return ret
+
+        if isinstance(others, HasPts) : 
+            ret = others if in_place else copy.copy(others) # a copy of a mesh has its own faces (see Mesh.__copy__)
+            verts = others._verts
+            xs,ys,zs = self._xform_xyz([v._x for v in verts],[v._y for v in verts],[v._z for v in verts])
+            ret._unset_attr() # call this to invalidate all cached values
+            ret._verts = [Vec(x,y,z) for x,y,z in zip(xs,ys,zs)]
+            return ret
+
+        others = list(others)
+        xs,ys,zs = self._xform_xyz([o.x for o in others],[o.y for o in others],[o.z for o in others])
+        if in_place:
+            for o,x,y,z in zip(others,xs,ys,zs): o.x, o.y, o.z = x, y, z
+            return others
+        ret = []
+        for o,x,y,z in zip(others,xs,ys,zs):
+            r = o.__class__(x,y,z)
+            if hasattr(o, 'props') : r.props = o.props
+            ret.append(r)
+        return ret
+
+    def _xform_xyz(self,xs,ys,zs):
+        """ Applies this Xform to three separate sequences of x, y and z values, and returns three lists of transformed values.
+        """
+        m0,m1,m2,m3,m4,m5,m6,m7,m8,m9,m10,m11 = self._m[:12]
+        xyz = list(zip(xs,ys,zs))
+        return (
+            [x*m0 + y*m1 + z*m2 + m3 for x,y,z in xyz],
+            [x*m4 + y*m5 + z*m6 + m7 for x,y,z in xyz],
+            [x*m8 + y*m9 + z*m10 + m11 for x,y,z in xyz]
+            )
+
     def _xform_tuple(self,tup):
 
         return (
@@ -506,3 +612,106 @@ class Xform(object):
 
 
 
+class XformChain(object):
+    """
+    A deferred sequence of transformations to be applied to a piece of geometry (or a collection of geometry).
+    Multiplying an XformChain by an Xform only records the product; the transformations are folded into a single matrix and applied once, when the result is requested.
+    """
+    def __init__(self, geom, *xforms):
+        """XformChain Constructor
+            
+            :param geom: Geometry (or a list or array of points) to be transformed.
+            :type geom: Geometry
+            :param xforms: Transformations to apply to the geometry, in the order given.
+            :type xforms: Xform
+            :result: XformChain object.
+            :rtype: XformChain
+            
+            ::
+            
+                chain = XformChain(pts) * xf_a * xf_b * xf_c
+                pts_xf = chain.resolved()
+        """
+        self._geom = geom
+        self._xf = Xform()
+        for xf in xforms: self._xf = xf * self._xf
+
+    def __mul__(self, other):
+        """| Records the given transformation, returning a new XformChain that applies it after the transformations of this one.
+           | The underlying geometry is not touched.
+            
+           :param other: Transformation to record.
+           :type other: Xform
+           :result: New XformChain.
+           :rtype: XformChain
+        """
+        if not isinstance(other, Xform) : raise NotImplementedError("An XformChain may only be multiplied by an Xform")
+        return XformChain(self._geom, other * self._xf)
+
+    def __repr__(self):
+        return "xfchain[{0}]".format(self._geom)
+
+    @property
+    def geometry(self):
+        """ Returns the untransformed geometry of this chain.
+        """
+        return self._geom
+
+    @property
+    def xform(self):
+        """ Returns the single Xform that is the product of all the transformations recorded by this chain.
+            
+            :result: Folded transformation.
+            :rtype: Xform
+        """
+        return self._xf
+
+    @property
+    def inverse(self):
+        """ Returns the inverse of the folded transformation of this chain. This value is cached.
+            
+            :result: Inverted transformation.
+            :rtype: Xform
+        """
+        try:
+            return self._inv
+        except AttributeError:
+            self._inv = self._xf.inverse()
+            return self._inv
+
+    @property
+    def stripped(self):
+        """ Returns the folded transformation of this chain with the translation components removed. This value is cached.
+            
+            :result: Transformation without translation.
+            :rtype: Xform
+        """
+        try:
+            return self._stripped
+        except AttributeError:
+            self._stripped = self._xf.strip_translation()
+            return self._stripped
+
+    def resolved(self):
+        """ Applies the folded transformation of this chain to a copy of its geometry, and returns the result. The result is cached, such that the transformation is only applied once.
+            
+            :result: Transformed geometry.
+            :rtype: Geometry
+        """
+        try:
+            return self._resolved
+        except AttributeError:
+            geom = self._geom
+            if isinstance(geom, (HasPts,VecArray,list,tuple)) : self._resolved = self._xf.apply_many(geom)
+            else : self._resolved = self._xf * geom
+            return self._resolved
+
+    def __getattr__(self, name):
+        # reading any attribute not defined by this chain (such as coordinates) resolves the chain
+        if name.startswith('_') : raise AttributeError(name)
+        return getattr(self.resolved(), name)
+
+    def __len__(self): return len(self.resolved())
+    def __iter__(self): return iter(self.resolved())
+    def __getitem__(self, index): return self.resolved()[index]
+
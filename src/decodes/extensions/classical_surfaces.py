@@ -4,8 +4,9 @@ import math
 
 
 class ClassicalSurface(Surface):
-    def __init__(self, function, dom_u=Interval(0,1), dom_v=Interval(0,1), tol_u=None, tol_v=None):
+    def __init__(self, function, dom_u=Interval(0,1), dom_v=Interval(0,1), tol_u=None, tol_v=None, array_function=None):
         
+        function = self._set_array_func(function, array_function)
         if function is not None : self._func = function
         self._dom = dom_u, dom_v
         self._tol = self.tol_max
@@ -39,16 +40,30 @@ class RotationalSurface(ClassicalSurface):
     def __init__(self, generator, axis=Ray(Point(), Vec(0,0,1)), dom_u=Interval.twopi(), tol_u=None):
         '''
         the given generator curve will be rotated about an axis through the center and defined by given vector
+        a CS may be given in place of the axis, in which case the generator is rotated about the z-axis of the CS
         '''
+        if isinstance(axis, CS): axis = Ray(axis.origin, axis.z_axis)
         self.genx = generator
         self.center = axis._pt
         self.axis = axis._vec
 
         def func(u,v):
             pt = self.genx.eval(v)
-            xf = Xform.rotation(angle = dom_u.eval(u), center = self.center, axis = self.axis)        
+            xf = _rotation(dom_u.eval(u), self.center, self.axis)
             return pt*xf
 
+        def array_func(us,vs):
+            # the generator is evaluated once for each distinct v, and a rotation is constructed once for each distinct u
+            uniq_vs = sorted(set(vs))
+            try:
+                gen_pts = self.genx._deval_many([self.genx.domain.eval(v) for v in uniq_vs])
+            except AttributeError:
+                gen_pts = [self.genx.eval(v) for v in uniq_vs]
+            gen_pts = dict(zip(uniq_vs,gen_pts))
+            xfs = dict([(u,_rotation(dom_u.eval(u), self.center, self.axis)) for u in set(us)])
+            pts = [gen_pts[v]*xfs[u] for u,v in zip(us,vs)]
+            return [p.x for p in pts], [p.y for p in pts], [p.z for p in pts]
+
         try:
             dom_v = self.genx.domain
             tol_v = self.genx.tol
@@ -56,7 +71,7 @@ class RotationalSurface(ClassicalSurface):
             dom_v = Interval()
             tol_v = 1.0/10.0
 
-        super(RotationalSurface,self).__init__(func,Interval(),Interval(),tol_u,tol_v)
+        super(RotationalSurface,self).__init__(func,Interval(),Interval(),tol_u,tol_v,array_function=array_func)
 
     def deval_pln(self,u,v,flip_ang_tol=0.0001):
         xf = Xform.rotation(angle=u,axis=self.axis)
@@ -102,6 +117,11 @@ class RotationalSurface(ClassicalSurface):
              return iso
 
 
+def _rotation(angle, center, axis):
+    # a rotation about an axis through the given center, composed of rotation about the world origin between two translations, such that no Rhino library is required
+    return Xform.translation(Vec(center)) * Xform.rotation(angle = angle, axis = axis) * Xform.translation(Vec(center).inverted())
+
+
 class TranslationalSurface(ClassicalSurface):
     
     def __init__(self, generator, directrix, origin, tol_v=None):
@@ -177,7 +197,22 @@ class Torus(ClassicalSurface):
                 rho = self.major_radius + self.minor_radius*math.cos(v)
                 pt_out = self.cs.eval(Point(rho*math.cos(u), rho*math.sin(u), self.minor_radius*math.sin(v)))
                 return pt_out
-        super(Torus,self).__init__(func,dom_u,dom_v,tol_u,tol_v)
+        def array_func(us,vs):
+            if self.param_type == 1 or self.param_type == 2:
+                pts = [func(u,v) for u,v in zip(us,vs)]
+                return [p.x for p in pts], [p.y for p in pts], [p.z for p in pts]
+            # the coordinates of the torus are evaluated in its CS, as by CS.eval
+            o, xa, ya, za = self.cs.origin, self.cs.x_axis, self.cs.y_axis, self.cs.z_axis
+            rhos = [self.major_radius + self.minor_radius*math.cos(v) for v in vs]
+            xs = [rho*math.cos(u) for rho,u in zip(rhos,us)]
+            ys = [rho*math.sin(u) for rho,u in zip(rhos,us)]
+            zs = [self.minor_radius*math.sin(v) for v in vs]
+            return (
+                [o.x + xa.x*x + ya.x*y + za.x*z for x,y,z in zip(xs,ys,zs)],
+                [o.y + xa.y*x + ya.y*y + za.y*z for x,y,z in zip(xs,ys,zs)],
+                [o.z + xa.z*x + ya.z*y + za.z*z for x,y,z in zip(xs,ys,zs)]
+            )
+        super(Torus,self).__init__(func,dom_u,dom_v,tol_u,tol_v,array_function=array_func)
         
     @property
     def alpha(self): return math.asin(self.minor_radius/self.major_radius)
@@ -43,7 +43,7 @@ class PinwheelTile(object):
         world base points for this tile
         returns the ideal Pinwheel Tile's base points transformed by this tile's xform
         '''
-        return [p*self.xf for p in self._base_pts]
+        return self.xf.apply_many(self._base_pts)
 
             
     def _cs_from_base_pts(self,pt_o=0,pt_x=1,pt_y=2):
@@ -136,7 +136,7 @@ class AmmannA3Tile(object):
         world base points for this tile
         returns the ideal Ammann Tile's base points transformed by this tile's xform
         """
-        return [p*self.xf for p in self._base_pts]
+        return self.xf.apply_many(self._base_pts)
         
 class AmmannA3TileA(AmmannA3Tile):
     # Set the ideal base points for Ammann tile A
@@ -307,7 +307,7 @@ class AmmannA3Tile(object):
         world base points for this tile
         returns the ideal Ammann Tile's base points transformed by this tile's xform
         '''
-        return [p*self.xf for p in self._base_pts]
+        return self.xf.apply_many(self._base_pts)
         
 class AmmannA3TileA(AmmannA3Tile):
     @property
@@ -125,7 +125,7 @@ class AutocadOut(outie.Outie):
         if new_geom: return True
 
     def _drawCurve(self, crv, obj_attr):
-        crv = crv.surrogate
+        crv = crv.adaptive_surrogate
         if crv.length == 0 : return False
         new_geom = self.acad.model.Add3Dpoly(to_acadverts(crv))
         new_lay = self.acad.Layers.Add("ABC")
@@ -110,7 +110,7 @@ class DynamoOut(outie.Outie):
         return to_dyn_polyline(pgon)
 
     def _drawCurve(self, curve):
-        return dyn_interpolated_curve(curve.surrogate.pts)
+        return dyn_interpolated_curve(curve.adaptive_surrogate.pts)
 
     def _drawCS(self, cs):
         return ds.CoordinateSystem.ByOriginVectors(to_dyn_pt(cs.origin),to_dyn_vec(cs.x_axis),to_dyn_vec(cs.y_axis))
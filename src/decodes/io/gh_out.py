@@ -195,7 +195,7 @@ class GrasshopperOut(outie.Outie):
         return to_rgpolyline(pgon)
 
     def _drawCurve(self, curve):
-        return interpolated_curve(curve.surrogate.pts)
+        return interpolated_curve(curve.adaptive_surrogate.pts)
 
     def _drawCS(self, cs):
         o = rg.Point3d(cs.origin.x,cs.origin.y,cs.origin.z)
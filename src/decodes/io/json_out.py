@@ -144,7 +144,7 @@ class JsonOut(outie.Outie):
         class CurveHandler(jsonpickle.handlers.BaseHandler):    
             def flatten(self, obj, data):
                 #data['pts'] = [PointHandler(None).flatten(pt,{}) for pt in obj.pts]
-                data['pts'] = [(pt.x,pt.y,pt.z)for pt in obj.surrogate.pts]
+                data['pts'] = [(pt.x,pt.y,pt.z)for pt in obj.adaptive_surrogate.pts]
                 data = props_to_data(obj,data)
                 return data
         jsonpickle.handlers.registry.register(Curve, CurveHandler)
@@ -0,0 +1,303 @@
+from .. import *
+from ..core import *
+from ..core import dc_base, dc_vec, dc_point, dc_mesh, dc_pgon, dc_pline
+from . import outie
+if VERBOSE_FS: print("mesh_out loaded")
+
+import os, sys, struct, shutil, tempfile, itertools
+from array import array
+
+class MeshOut(outie.Outie):
+    """| outie for writing meshes, polygons and polylines to a binary PLY, a binary STL, or an OBJ file.
+       | Unlike other outies, geometry is written to file as it is put, rather than stored until drawn, such that very large scenes may be written using a constant amount of memory.
+       | Calling draw completes the file, after which no more geometry may be put. A MeshOut may also be used in a with statement, which completes the file on leaving it.
+    """
+
+    formats = ("ply","stl","obj")
+    chunk_size = 65536 # the number of vertices or faces that are packed together before each write to file
+
+    def __init__(self, filename, path=False, format=False):
+        """ MeshOut Constructor.
+
+            :param filename: Name of file to write, the extension of which may determine its format.
+            :type filename: str
+            :param path: Directory to write to, or full path of file to write. Defaults to the home directory of the current user.
+            :type path: str
+            :param format: Format of file to write ("ply", "stl" or "obj"). Defaults to the extension of the given filename or path, or to "ply" if there is none.
+            :type format: str
+            :result: MeshOut object.
+            :rtype: MeshOut
+
+            ::
+
+                out = MeshOut("terrain", "/tmp", format="stl")
+                out.put(msh)
+                out.draw()
+
+                with MeshOut("terrain", "/tmp") as out:
+                    out.put(msh)
+        """
+        super(MeshOut,self).__init__()
+        if not format :
+            format = "ply"
+            for name in (path,filename):
+                if name and name[-4:].lower() in (".ply",".stl",".obj") : format = name[-3:].lower()
+        format = format.lower()
+        if format not in MeshOut.formats : raise ValueError("MeshOut cannot write files of format '{0}'. Choose from {1}".format(format,", ".join(MeshOut.formats)))
+        self.format = format
+
+        ext = "." + format
+        if filename[-4:].lower() == ext : filename = filename[:-4]
+        if path==False :
+            self.filepath = os.path.expanduser("~") + os.sep + filename + ext
+        else :
+            if path[-4:].lower() == ext : self.filepath = path
+            else : self.filepath = path + os.sep + filename + ext
+        self._writer = None
+        self._closed = False
+        self._results = [] # whether each piece of geometry put was written, as returned by draw
+        self._failures = [] # a description of each piece of geometry that could not be written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._endDraw()
+
+    def __del__(self):
+        # an outie that is never drawn still completes any file it has begun, and closes its temporary files
+        try:
+            if self._writer is not None : self._endDraw()
+        except Exception: pass
+
+    def put(self, ngeom):
+        """ Writes the given geometry, or collection of geometry, to file.
+            Meshes, PGons and Tris are written as faces, and PLines and Curves as polylines; STL files may contain only faces.
+
+            :param ngeom: Geometry to write.
+            :type ngeom: Geometry or [Geometry]
+            :result: None
+            :rtype: None
+        """
+        if ngeom is None : return
+        if self._closed : raise IOError("MeshOut has already completed {0}, and may not write any more geometry to it. Create a new MeshOut to write another file.".format(self.filepath))
+        if isinstance(ngeom, Geometry) :
+            if self._writer is None : self._startDraw()
+            result = self._drawGeom(ngeom)
+            if not result : self._failures.append((len(self._results),str(ngeom)))
+            self._results.append(result)
+        elif hasattr(ngeom, "__iter__") :
+            for g in ngeom : self.put(g)
+        else :
+            raise NotImplementedError("This doesn't look like Decodes Geometry!\nThis outie doesn't allow foreigners!\n{0}".format(ngeom))
+
+    def draw(self, clear_buffer=False):
+        """ Completes the file, and returns a list of whether each piece of geometry put was written.
+
+            :param clear_buffer: If True, the record of geometry written is cleared.
+            :type clear_buffer: bool
+            :result: List of successful writes.
+            :rtype: [bool]
+        """
+        self._startDraw() # such that a file is written even if no geometry was put
+        results = list(self._results)
+        if self._failures:
+            print("dump not completely successful, the following geometry was not written:")
+            for i, desc in self._failures : print(str(i), desc)
+        self._endDraw()
+        if clear_buffer: self.clear()
+        return results
+
+    def clear(self):
+        # geometry has already been written, and may not be taken back, so only the record of it is cleared
+        self.geom = []
+        self._results = []
+        self._failures = []
+
+    def _startDraw(self):
+        if self._writer is not None or self._closed : return
+        if self.format == "ply" : self._writer = _PLYWriter(self.filepath, self.chunk_size)
+        elif self.format == "stl" : self._writer = _STLWriter(self.filepath, self.chunk_size)
+        else : self._writer = _OBJWriter(self.filepath, self.chunk_size)
+
+    def _endDraw(self):
+        if self._closed : return
+        self._startDraw()
+        self._closed = True
+        self._writer.close()
+        self._writer = None
+
+    def _drawGeom(self, g):
+        # here we sort out what type of geometry we're dealing with, and call the proper draw functions
+        # the coordinates of HasPts objects are taken in world space, so there is no need to apply their bases beforehand
+        if isinstance(g, Curve): g = g.adaptive_surrogate
+        if isinstance(g, Tri):  g = PGon([g.pa,g.pb,g.pc])
+
+        if isinstance(g, Mesh) :
+            if len(g.faces) == 0 : return False
+            return self._writer.faces(g.coords, g.faces)
+        if isinstance(g, PGon) :
+            return self._writer.faces(g.coords, [list(range(len(g)))])
+        if isinstance(g, PLine) :
+            return self._writer.polyline(g.coords)
+        return False
+
+
+class _PLYWriter(object):
+    """
+    streams vertices and faces to a binary PLY file.
+    faces and edges are spooled to temporary files until the file is closed, as PLY requires that all vertices appear first.
+    """
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        "comment written by decodes\n"
+        "element vertex {0:12d}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        "element face {1:12d}\n"
+        "property list uchar int vertex_indices\n"
+        "element edge {2:12d}\n"
+        "property int vertex1\n"
+        "property int vertex2\n"
+        "end_header\n"
+    )
+
+    def __init__(self, filepath, chunk_size):
+        self.chunk_size = chunk_size
+        self.vert_count, self.face_count, self.edge_count = 0, 0, 0
+        self.file = open(filepath, "wb")
+        self.file.write(self._header())  # counts are fixed-width, and are filled in when the file is closed
+        self.face_file = tempfile.TemporaryFile()
+        self.edge_file = tempfile.TemporaryFile()
+
+    def _header(self):
+        return self.header.format(self.vert_count,self.face_count,self.edge_count).encode("ascii")
+
+    def _vertices(self, coords):
+        offset = self.vert_count
+        _write_floats(self.file, coords, 3*self.chunk_size)
+        self.vert_count += len(coords)//3
+        return offset
+
+    def faces(self, coords, faces):
+        if any(len(face) > 255 for face in faces) : return False
+        offset = self._vertices(coords)
+        for chunk in _chunks(faces, self.chunk_size):
+            fmt, vals = ["<"], []
+            for face in chunk:
+                fmt.append("B{0}i".format(len(face)))
+                vals.append(len(face))
+                vals.extend([i+offset for i in face])
+            self.face_file.write(struct.pack("".join(fmt),*vals))
+            self.face_count += len(chunk)
+        return True
+
+    def polyline(self, coords):
+        offset = self._vertices(coords)
+        count = len(coords)//3
+        for chunk in _chunks(range(offset,offset+count-1), self.chunk_size):
+            vals = [i for a in chunk for i in (a,a+1)]
+            self.edge_file.write(struct.pack("<{0}i".format(len(vals)),*vals))
+            self.edge_count += len(chunk)
+        return True
+
+    def close(self):
+        for spool in (self.face_file, self.edge_file):
+            spool.seek(0)
+            shutil.copyfileobj(spool, self.file)
+            spool.close()
+        self.file.seek(0)
+        self.file.write(self._header())
+        self.file.close()
+
+
+class _STLWriter(object):
+    """
+    streams triangles to a binary STL file, dividing faces of more than three vertices into fans of triangles.
+    the triangle count in the file header is filled in when the file is closed.
+    """
+    def __init__(self, filepath, chunk_size):
+        self.chunk_size = chunk_size
+        self.tri_count = 0
+        self.file = open(filepath, "wb")
+        self.file.write(b"binary STL written by decodes".ljust(80,b" "))
+        self.file.write(struct.pack("<I",0))
+
+    def faces(self, coords, faces):
+        tris = ((face[0],face[n],face[n+1]) for face in faces for n in range(1,len(face)-1))
+        for chunk in _chunks(tris, self.chunk_size):
+            vals = []
+            for a,b,c in chunk:
+                ax,ay,az = coords[3*a],coords[3*a+1],coords[3*a+2]
+                bx,by,bz = coords[3*b],coords[3*b+1],coords[3*b+2]
+                cx,cy,cz = coords[3*c],coords[3*c+1],coords[3*c+2]
+                ux,uy,uz,vx,vy,vz = bx-ax,by-ay,bz-az,cx-ax,cy-ay,cz-az
+                nx,ny,nz = uy*vz-uz*vy, uz*vx-ux*vz, ux*vy-uy*vx
+                length = (nx*nx+ny*ny+nz*nz)**0.5
+                if length > 0 : nx,ny,nz = nx/length,ny/length,nz/length
+                vals.extend((nx,ny,nz,ax,ay,az,bx,by,bz,cx,cy,cz,0))
+            self.file.write(struct.pack("<"+"12fH"*len(chunk),*vals))
+            self.tri_count += len(chunk)
+        return True
+
+    def polyline(self, coords):
+        return False # STL may contain only triangles
+
+    def close(self):
+        self.file.seek(80)
+        self.file.write(struct.pack("<I",self.tri_count))
+        self.file.close()
+
+
+class _OBJWriter(object):
+    """
+    streams vertices, faces and polylines to an OBJ file, as a named object for each piece of geometry written.
+    """
+    def __init__(self, filepath, chunk_size):
+        self.chunk_size = chunk_size
+        self.vert_count, self.obj_count = 0, 0
+        self.file = open(filepath, "w")
+        self.file.write("# written by decodes\n")
+
+    def _vertices(self, coords, name):
+        self.obj_count += 1
+        self.file.write("o {0}_{1}\n".format(name,self.obj_count))
+        offset = self.vert_count + 1 # OBJ indices begin at one
+        for chunk in _chunks(range(0,len(coords),3), self.chunk_size):
+            self.file.write("".join(["v {0!r} {1!r} {2!r}\n".format(coords[i],coords[i+1],coords[i+2]) for i in chunk]))
+        self.vert_count += len(coords)//3
+        return offset
+
+    def faces(self, coords, faces):
+        offset = self._vertices(coords, "mesh")
+        for chunk in _chunks(faces, self.chunk_size):
+            self.file.write("".join(["f "+" ".join([str(i+offset) for i in face])+"\n" for face in chunk]))
+        return True
+
+    def polyline(self, coords):
+        offset = self._vertices(coords, "pline")
+        self.file.write("l "+" ".join([str(i+offset) for i in range(len(coords)//3)])+"\n")
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+def _chunks(items, size):
+    """ Yields successive lists of at most the given number of items taken from the given iterable.
+    """
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk : return
+        yield chunk
+
+def _write_floats(fo, coords, size):
+    """ Writes the given sequence of numbers to the given binary file as little-endian single-precision floats, a given number at a time.
+    """
+    for n in range(0, len(coords), size):
+        chunk = array('f', coords[n:n+size])
+        if sys.byteorder == "big" : chunk.byteswap()
+        chunk.tofile(fo)
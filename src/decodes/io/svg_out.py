@@ -14,6 +14,7 @@ class SVGOut(outie.Outie):
     point_size = 2
     min_point_size = 0.001
     default_curve_resolution = 50
+    lod_tolerance = 0.5 # the distance, in drawing units, by which a level of detail drawn in place of a mesh may depart from it
 
     def __init__(self, filename, path=False, canvas_dimensions=False, flip_y=False, center_on_origin=False, scale=False, save_file=True,verbose=True):
         super(SVGOut,self).__init__()
@@ -89,10 +90,14 @@ class SVGOut(outie.Outie):
     def _drawGeom(self, g):
         # here we sort out what type of geometry we're dealing with, and call the proper draw functions
         # MUST LOOK FOR CHILD CLASSES BEFORE PARENT CLASSES (points before vecs)
-        if isinstance(g,Curve): g = g.surrogate
+        if isinstance(g,Curve): g = g.adaptive_surrogate
 
         # treat Tris as PGons
         if isinstance(g, Tri):  g = PGon([g.pa,g.pb,g.pc])
+
+        # meshes are drawn in world coordinates, choosing from a chain of levels of detail the simplest that would appear unchanged
+        if isinstance(g, MeshLOD) : return self._drawMesh(g.select(self._lod_size()), g)
+        if isinstance(g, Mesh) : return self._drawMesh(g, g)
         
         
         g = self._xf_geom(g)
@@ -143,6 +148,21 @@ class SVGOut(outie.Outie):
         self._buffer_append(type,atts,style)
         return True
 
+    def _drawMesh(self, msh, styled):
+        type = 'polygon'
+        style = self._extract_props(styled) 
+        pts = msh.pts
+        if self._xf: pts = [pt*self._xf for pt in pts]
+        for face in msh.faces:
+            point_string = " ".join([str(pts[i].x)+","+str(pts[i].y) for i in face])
+            self._buffer_append(type,'points="'+point_string+'"',style)
+        return True
+
+    def _lod_size(self):
+        # the distance in model space that spans the lod_tolerance of this drawing
+        if self._scale: return self.lod_tolerance / float(self._scale)
+        return self.lod_tolerance
+
     def _drawPolyline(self, pline):
         type = 'polyline'
         style = self._extract_props(pline)
@@ -3,7 +3,7 @@ import unittest, importlib, sys, inspect, os
 
 
 #__all__ = ["test_has_basis","test_cs","test_interval","test_line","test_mesh","test_pgon","test_point","test_vec","test_xform"]
-__all__=["test_voxel","test_xsect","test_classical_surface","test_pgon", "test_pline","test_mesh","test_point","test_has_pts","test_curve","test_surface","test_plane","test_interval","test_line","test_vec","test_xform"]
+__all__=["test_voxel","test_xsect","test_kdtree","test_bvh","test_bounds","test_graph","test_classical_surface","test_pgon", "test_pline","test_mesh","test_mesh_out","test_point","test_has_pts","test_curve","test_surface","test_plane","test_interval","test_line","test_vec","test_xform"]
 
 
 filename = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))+os.sep+'log.txt'
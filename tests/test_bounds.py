@@ -0,0 +1,89 @@
+import unittest
+import decodes.core as dc
+from decodes.core import *
+import random
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.pts2d = [Point(random.uniform(0,10),random.uniform(0,10)) for n in range(400)]
+        self.pts3d = [Point.random(Interval(0,10)) for n in range(400)]
+
+    def test_quadtree(self):
+        qt = QuadTree.encompass(4,self.pts2d)
+        self.assertEqual(len(qt.pts),len(self.pts2d),"every point is stored in the tree")
+        for leaf in qt.flatten(): self.assertTrue(len(Point.cull_duplicates(leaf._pts)) <= 4)
+
+        bnds = Bounds(ival_x=Interval(2,5),ival_y=Interval(3,4))
+        found = qt.pts_in_bounds(bnds)
+        self.assertEqual(len(found),len([p for p in self.pts2d if p in bnds]))
+
+        qt2 = QuadTree(4,Bounds.encompass(self.pts2d))
+        for p in self.pts2d: self.assertTrue(qt2.append(p))
+        self.assertFalse(qt2.append(Point(20,20)),"points outside the bounds are rejected")
+        self.assertEqual(len(qt2.pts),len(self.pts2d))
+
+        dups = [Point(1,1)]*10 + [Point(2,2)]
+        qt3 = QuadTree.encompass(2,dups)
+        self.assertEqual(len(qt3.pts),11,"duplicate points do not count toward capacity")
+
+    def test_quadtree_queries(self):
+        qt = QuadTree.encompass(4,self.pts2d)
+        q = Point(4.2,6.1)
+        near = qt.pts_nearest(q,5)
+        expected = sorted(self.pts2d,key=lambda p:p.distance2(q))[:5]
+        self.assertEqual([p.distance(q) for p in near],[p.distance(q) for p in expected],"k nearest points match a brute-force search")
+        self.assertEqual(qt.pts_nearest(q)[0].distance(q),expected[0].distance(q))
+        self.assertEqual(qt.pts_nearest(q,0),[])
+
+        within = qt.pts_within(q,1.5)
+        self.assertEqual(len(within),len([p for p in self.pts2d if p.distance(q) <= 1.5]))
+        self.assertEqual(within,sorted(within,key=lambda p:p.distance2(q)))
+
+        self.assertTrue(q in qt.container_of(q).bnd)
+        nearby = qt.pts_nearby(q)
+        search = qt.container_of(q).bnd.scaled(1.10)
+        expected = [p for leaf in qt.flatten() if leaf.bnd.overlaps(search) for p in leaf._pts]
+        self.assertEqual(sorted(nearby,key=id),sorted(expected,key=id),"points nearby are those of the regions neighboring the given point")
+        self.assertEqual(nearby,sorted(nearby,key=lambda p:p.distance2(q)))
+        self.assertTrue(nearby[0] is qt.pts_nearest(q)[0])
+
+    def test_quadtree_boundary(self):
+        # a point on an edge shared by two children is kept by the first of them
+        qt = QuadTree(1,Bounds(ival_x=Interval(0,10),ival_y=Interval(0,10)))
+        on_edge = Point(5,5)
+        pts = [Point(1,1),Point(9,9),on_edge,Point(5,2)]
+        self.assertEqual(qt.extend(pts),[])
+        self.assertEqual(len(qt.pts),4)
+        self.assertTrue(any(p is on_edge for p in qt.pts))
+        self.assertTrue(qt.pts_nearest(Point(5.1,5.1))[0] is on_edge)
+        self.assertTrue(any(p is on_edge for p in qt.pts_nearby(on_edge)))
+        self.assertTrue(any(p is on_edge for p in qt.pts_in_bounds(Bounds(ival_x=Interval(4,6),ival_y=Interval(4,6)))))
+
+        # dividing Interval(0.1,1.7) in two leaves x=1.7 just outside of both halves
+        for bulk in (True,False):
+            qt = QuadTree(1,Bounds(ival_x=Interval(0.1,1.7),ival_y=Interval(0,1)))
+            orphan = Point(1.7,0.5)
+            pts = [Point(0.2,0.2),Point(0.3,0.8),orphan,Point(1.6,0.4)]
+            if bulk : self.assertEqual(qt.extend(pts),[])
+            else : self.assertTrue(all(qt.append(p) for p in pts))
+            self.assertEqual(len(qt.pts),4,"a point within no child region is not dropped")
+            self.assertTrue(orphan in qt.container_of(orphan).bnd)
+            self.assertTrue(qt.pts_nearest(Point(1.7,0.5))[0] is orphan)
+            self.assertEqual(qt.pts_within(Point(1.7,0.5),0.01),[orphan])
+
+    def test_octree(self):
+        ot = Octree.encompass(8,self.pts3d)
+        self.assertEqual(len(ot.pts),len(self.pts3d))
+        self.assertEqual(len(ot.children),8,"each region of an Octree is divided into eight")
+        q = Point(5,5,5)
+        near = ot.pts_nearest(q,4)
+        expected = sorted(self.pts3d,key=lambda p:p.distance2(q))[:4]
+        self.assertEqual([p.distance(q) for p in near],[p.distance(q) for p in expected])
+        self.assertEqual(len(ot.pts_within(q,2.0)),len(Point.within(q,self.pts3d,2.0)))
+
+        flat = Octree.encompass(8,self.pts2d)
+        self.assertEqual(len(flat.pts),len(self.pts2d),"points lying in a plane are encompassed")
+        self.assertRaises(GeometricError,Octree,8,Bounds(ival_x=Interval(),ival_y=Interval()))
@@ -0,0 +1,72 @@
+import unittest
+import decodes.core as dc
+from decodes.core import *
+import random, math
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        n = 16
+        pts = [Point(x,y,math.sin(x*0.5)*math.cos(y*0.3)) for y in range(n) for x in range(n)]
+        idxs = [i for y in range(n-1) for x in range(n-1) for i in (y*n+x,y*n+x+1,(y+1)*n+x+1,(y+1)*n+x)]
+        self.msh = Mesh.from_buffers(pts,idxs,4)
+        self.bvh = MeshBVH(self.msh,leaf_size=2)
+
+    def brute_hits(self, org, drc):
+        hits = {}
+        for tri in range(len(self.bvh)):
+            t = self.bvh._tri_hit(tri,org.x,org.y,org.z,drc.x,drc.y,drc.z,False)
+            face = self.bvh._tri_face[tri]
+            if t is not None and t >= 0 and t < hits.get(face,float('inf')) : hits[face] = t
+        return sorted([(t,f) for f,t in hits.items()])
+
+    def test_ray_hits(self):
+        orgs = [Point(random.uniform(0,15),random.uniform(0,15),5) for n in range(100)]
+        drcs = [Vec(random.uniform(-1,1),random.uniform(-1,1),-2) for n in range(100)]
+        faces, ts = self.bvh.first_hits(orgs,drcs)
+        anys = self.bvh.any_hits(orgs,drcs)
+        for org, drc, face, t, hit in zip(orgs,drcs,faces,ts,anys):
+            found = self.brute_hits(org,drc)
+            self.assertEqual(hit,bool(found))
+            if found:
+                self.assertAlmostEqual(t,found[0][0],"first hit matches a brute-force search")
+            else:
+                self.assertEqual((face,t),(-1,None))
+
+        face, t = self.bvh.first_hit(Point(0.5,0.5,5),Vec(0,0,-1))
+        self.assertEqual(face,0)
+        self.assertEqual(self.bvh.first_hit(Point(0.5,0.5,5),Vec(0,0,-1),t_max=1),(-1,None))
+        self.assertEqual(self.bvh.first_hit(Point(0.5,0.5,-5),Vec(0,0,1),ignore_backface=True),(-1,None),"faces that face away from a ray are not struck")
+
+        faces, ts = self.bvh.all_hits([Point(0.5,0.5,5)],[Vec(0,0,-1)])
+        self.assertEqual(faces,[[0]])
+        faces, ts = self.bvh.all_hits([Point(-1,7.5,0)],[Vec(1,0,0)])
+        self.assertEqual(ts[0],sorted(ts[0]))
+
+    def test_closest_points(self):
+        qs = [Point.random(Interval(-2,17)) for n in range(50)]
+        faces, pts, dists = self.bvh.closest_points(qs)
+        for q, face, pt, dist in zip(qs,faces,pts,dists):
+            brute = min([math.sqrt(sum([(a-b)**2 for a,b in zip(self.bvh._tri_nearest(tri,q.x,q.y,q.z),(q.x,q.y,q.z))])) for tri in range(len(self.bvh))])
+            self.assertAlmostEqual(dist,brute,msg="closest point matches a brute-force search")
+            self.assertAlmostEqual(q.distance(pt),dist)
+
+        face, pt, dist = self.bvh.closest_point(Point(0.5,0.5,0.2))
+        self.assertEqual(face,0)
+
+    def test_intersector(self):
+        self.assertTrue(self.msh.bvh is self.msh.bvh,"the hierarchy of a mesh is stored until the mesh changes")
+        xsec = Intersector()
+        self.assertTrue(xsec.of(Ray(Point(0.5,0.5,5),Vec(0,0,-1)),self.msh))
+        self.assertEqual(len(xsec),1)
+        self.assertEqual(xsec.faces,[0])
+        self.assertAlmostEqual(xsec.dist,5-xsec[0].z)
+
+        self.assertFalse(xsec.of(self.msh,Segment(Point(0.5,0.5,5),Point(0.5,0.5,4))))
+        self.assertEqual(xsec.faces,[],"a failed intersection does not keep the faces of an earlier one")
+        self.assertTrue(xsec.of(self.msh,Line(Point(0.5,0.5,5),Vec(0,0,1))),"a line is struck behind its start point")
+
+        self.msh.basis = CS(Point(0,0,10))
+        self.assertTrue(xsec.of(Ray(Point(0.5,0.5,5),Vec(0,0,1)),self.msh),"the hierarchy is rebuilt when the basis of a mesh changes")
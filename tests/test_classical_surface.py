@@ -5,12 +5,35 @@ from decodes.extensions.classical_surfaces import *
 
 class Tests(unittest.TestCase):
 
+    def test_torus_array_function(self):
+        torus = Torus(CS(Point(1,2,3),Vec(1,1,0),Vec(0,0,1)),5,1,Interval.twopi(),Interval.twopi())
+        us, vs = [0.3*n for n in range(8)], [0.7*n for n in range(8)]
+        self.AssertArrayMatchesFunc(torus,us,vs)
+
+        for param_type in (1,2):
+            torus = Torus(CS(Point(1,2,3)),5,1,Interval.twopi(),Interval(0,math.pi),param_type=param_type)
+            self.AssertArrayMatchesFunc(torus,us,[0.1+0.3*n for n in range(8)])
+
+    def test_rotational_array_function(self):
+        crv = Curve(lambda t: Point(t,0,math.sin(t)),Interval(1,3))
+        rot_surf = RotationalSurface(crv,Ray(Point(-1,0,0),Vec(0,0,1)))
+        self.AssertPointsAlmostEqual(rot_surf.func(0.25,0),Point(-1,2,math.sin(1))) # a generator is rotated about an axis through the given center
+        us, vs = [0.1*n for n in range(10)], [0.1*(n%3) for n in range(10)]
+        self.AssertArrayMatchesFunc(rot_surf,us,vs)
+        self.assertEqual(len(rot_surf.to_mesh(divs_u=4,divs_v=4).pts),25)
+
+    def AssertArrayMatchesFunc(self,srf,us,vs):
+        xs, ys, zs = srf.array_func(us,vs)
+        self.assertEqual(len(xs),len(us))
+        for x, y, z, u, v in zip(xs,ys,zs,us,vs):
+            self.AssertPointsAlmostEqual(Point(x,y,z),srf.func(u,v))
+
     def test_rotational(self):
         def func(t):
             return Point(t,math.sin(t)+1.2)
         crv = Curve(func,Interval(0,math.pi*2))
         cs = CS(Point(2,2))
-        rot_surf = RotationalSurface(cs,crv)
+        rot_surf = RotationalSurface(crv,cs)
 
         # v isocurves result in based curves, which require basis-to-basis transformations
         # we currently do basis-to-basis xforms using rhino library
@@ -39,6 +39,34 @@ class Tests(unittest.TestCase):
         for n in range(20):
             self.AssertPointsAlmostEqual(crv.surrogate.pts[n],Point(n/20.0,0)) # a tol of 0.05 results in 20 divisions of a 1-unit domain
 
+    def test_adaptive_pline(self):
+        evals = []
+        def func(t):
+            evals.append(t)
+            return Point(t,0.05*math.exp(-((t-0.7)**2)/0.0005))
+        crv = Curve(func,Interval(0,1))
+        del evals[:]
+        pl = crv.adaptive_pline(0.001)
+        self.assertTrue(len(evals) < 100 and len(pl) < 50,"adaptive sampling requires far fewer points than uniform sampling")
+        for t in Interval(0.6,0.8)/100:
+            pt = crv.deval(t)
+            self.assertTrue(min([Segment(a,b).near_pt(pt).dist(pt) for a,b in zip(pl.pts[:-1],pl.pts[1:])]) < 0.001,"the polyline lies within the given tolerance of the curve")
+        self.AssertPointsAlmostEqual(pl.pts[0],crv.deval(0))
+        self.AssertPointsAlmostEqual(pl.pts[-1],crv.deval(1))
+
+        xs = [pt.x for pt in pl.pts]
+        self.assertEqual(xs,sorted(xs))
+        self.assertTrue(len([x for x in xs if 0.6 < x < 0.8]) > len([x for x in xs if x < 0.5]),"points are concentrated where the curve bends")
+
+        del evals[:]
+        crv.adaptive_pline(1e-9,max_evals=40)
+        self.assertTrue(len(evals) <= 40,"the number of evaluations is capped")
+
+        crv = Curve.circle()
+        self.assertTrue(crv.adaptive_surrogate is crv.adaptive_surrogate)
+        for a, b in zip(crv.adaptive_surrogate.pts[:-1],crv.adaptive_surrogate.pts[1:]):
+            self.assertTrue(a.dist(b) < math.radians(10)*1.01,"the polyline turns by no more than the given angle at each point")
+
     def test_division(self):
         def func(t):
             return Point(t,t**2)
@@ -65,6 +93,34 @@ class Tests(unittest.TestCase):
         for n,ival in enumerate(crv.domain//10) : 
             self.assertEqual(subcrvs[n].domain,ival,"")
 
+    def test_subcurve(self):
+        evals = []
+        def func(t):
+            evals.append(t)
+            return Point(t,t**2)
+        crv = Curve(func,Interval(0,10),basis=CS(Point(0,0,1)))
+        self.assertEqual(len(evals),2,"a curve is validated at either end of its domain, and its surrogate is not built until requested")
+        self.assertEqual(len(Curve(func,Interval(0,10),validate=False).domain//1),1)
+        self.assertEqual(len(evals),2,"validation is optional")
+
+        sub = crv.subcurve(Interval(2,4))
+        subsub = sub.subcurve(Interval(2,3),0.01)
+        self.assertEqual(len(evals),2,"a subcurve is not evaluated until requested")
+        self.assertTrue(isinstance(sub,SubCurve) and sub.parent is crv and subsub.parent is crv)
+        self.assertEqual(sub.tol,0.2)
+        self.assertEqual(subsub.tol,0.01)
+        self.AssertPointsAlmostEqual(subsub.deval(3),Point(3,9,1),"a subcurve shares the basis of its curve")
+
+        crv.deval(2.5)
+        count = len(evals)
+        pt = sub.deval(2.5)
+        self.assertEqual(len(evals),count,"a subcurve shares the evaluations of its curve")
+        pt.x = 100
+        self.AssertPointsAlmostEqual(crv.deval(2.5),Point(2.5,6.25,1),"stored evaluations may not be altered")
+
+        self.assertEqual(len(sub.surrogate),11)
+        self.assertAlmostEqual(crv.near(Point(3,9,1))[1],3,1)
+
     def test_near(self):
         #NOTE: this test takes 1 sec.  disabled for now.
         def func(t):
@@ -87,6 +143,95 @@ class Tests(unittest.TestCase):
             near_pt, near_t, dist = crv.near(pt,0.01)
             self.AssertPointsAlmostEqual(pt,near_pt)
 
+    def test_near_many(self):
+        crv = Curve(lambda t: Point(math.cos(t)*t,math.sin(t)*t,t*0.1),Interval(0,20))
+        pts = [Point(x,y,z) for x in (-15,0,15) for y in (-15,0,15) for z in (0,1)]
+        near_pts, ts, dists = crv.near_many(pts)
+        self.assertTrue(crv._near_tree() is crv._near_tree(),"the index of a curve is built once for many queries")
+        for pt, npt, t, dist in zip(pts,near_pts,ts,dists):
+            brute = min([crv.eval(n/2000.0).distance(pt) for n in range(2001)])
+            self.assertTrue(dist <= brute+1e-9,"the nearest point is at least as near as any of a dense sampling")
+            self.assertAlmostEqual(crv.deval(t).distance(pt),dist)
+            self.assertTrue(crv.domain.a <= t <= crv.domain.b)
+
+        npt, t, dist = crv.near(crv.eval(1)*2)
+        self.assertAlmostEqual(t,20.0,msg="the nearest point may lie at the end of a curve")
+
+        # the arguments of IsParametrized.near are still accepted
+        pt = pts[0]
+        self.assertEqual(crv.near(pt,None,20,8)[1],crv.near(pt)[1])
+        self.AssertPointsAlmostEqual(crv.near_pt(pt,max_recursion=5,resolution=4),crv.near_pt(pt))
+        self.assertEqual(crv.near_many(pts[:2],None,max_recursion=5)[1],ts[:2])
+
+    def test_array_function(self):
+        calls = []
+        def array_func(ts):
+            calls.append(len(ts))
+            return [math.cos(t) for t in ts], [math.sin(t) for t in ts], [t for t in ts]
+        crv = Curve(domain=Interval(0,4),array_function=array_func,basis=CS(Point(0,0,1)))
+        self.assertTrue(crv.array_func is array_func)
+        self.AssertPointsAlmostEqual(crv.deval(1),Point(math.cos(1),math.sin(1),2)) # a curve may be given only an array function
+
+        del calls[:]
+        pts = crv.divide(9)
+        self.assertEqual(calls,[8],"a curve is divided by a single call to its array function, which skips evaluations already stored")
+        t = crv.domain.eval(3/9.0)
+        self.AssertPointsAlmostEqual(pts[3],Point(math.cos(t),math.sin(t),t+1))
+        crv.tol = 0.2
+        len(crv.surrogate)
+        self.assertEqual(len(calls),2)
+        self.assertEqual(len(crv.subcurve(Interval(1,2)).divide(10)),11)
+        self.assertEqual(len(calls),3,"subcurves share the array function of their curve")
+        crv.deval_cs(1.5)
+        self.assertEqual(len(calls),4,"the neighbors of a point are found by a single call")
+
+        for crv in (Curve.circle(Point(1,2,3),2), Curve.helix(Point(1,0,0),2,1.5), Curve.bezier([Point(0,0),Point(1,2),Point(3,1,2),Point(4,0)]), Curve.hermite([Point(0,0),Point(1,2),Point(3,1,2),Point(4,0)],0.2,0.1)):
+            ts = crv.domain.divide(13,True)
+            for pt, t in zip(crv._deval_many(ts),ts): self.AssertPointsAlmostEqual(pt,crv.func(t)) # built-in curves evaluate arrays as they do points
+
+    def test_arc_length(self):
+        crv = Curve(lambda t: Point(t,t*t),Interval(0,2))
+        length = lambda t: t*math.sqrt(1+4*t*t)/2 + math.asinh(2*t)/4
+        self.assertAlmostEqual(crv.appx_length,length(2),5)
+        self.assertTrue(crv._length_table() is crv._length_table(),"the arc-length table of a curve is stored")
+        for s in (0,0.5,1.7,3.2,crv.appx_length):
+            self.assertAlmostEqual(length(crv.t_at_length(s)),s,3)
+        self.AssertPointsAlmostEqual(crv.eval_at_length(0),Point())
+        self.assertRaises(DomainError,crv.t_at_length,crv.appx_length+1)
+
+        pts = crv.divide_by_length(8)
+        self.assertEqual(len(pts),9)
+        self.AssertPointsAlmostEqual(pts[-1],Point(2,4))
+        self.assertEqual(len(crv.divide_by_length(8,False)),8)
+        pts = crv.divide_by_distance(1.0)
+        self.assertEqual(len(pts),6,"a remainder is left at the end of a curve divided by distance")
+        self.AssertPointsAlmostEqual(pts[1],crv.eval_at_length(1.0))
+        self.assertRaises(ValueError,crv.divide_by_distance,0)
+
+        circ = Curve.circle(Point(),3)
+        self.assertAlmostEqual(circ.appx_length,6*math.pi,6)
+        view = circ.arc_length_view()
+        self.assertTrue(isinstance(view,ArcLengthCurve) and view.parent is circ)
+        self.assertAlmostEqual(view.domain.b,6*math.pi,6)
+        self.AssertPointsAlmostEqual(view.deval(3*math.pi/2),Point(0,3))
+        self.AssertPointsAlmostEqual(view.eval(0.5),Point(-3,0))
+
+    def test_basis_after_query(self):
+        crv = Curve.circle(Point(1,0),1)
+        self.assertAlmostEqual(crv.near(Point(3,0))[2],1.0)
+        length, surrogate, adaptive = crv.appx_length, crv.surrogate, crv.adaptive_surrogate
+        crv.basis = CS(Point(),Vec(0,1),Vec(-1,0))
+        self.assertAlmostEqual(crv.near(Point(3,0))[2],math.sqrt(10)-1,msg="the index of a curve is rebuilt when its basis changes")
+        self.AssertPointsAlmostEqual(crv.adaptive_surrogate.pts[0],Point(0,2))
+        self.AssertPointsAlmostEqual(crv.surrogate.pts[0],Point(0,2))
+        self.assertFalse(crv.surrogate is surrogate or crv.adaptive_surrogate is adaptive)
+        self.assertAlmostEqual(crv.appx_length,length)
+
+        crv.basis = CS(Point(0,5))
+        self.assertAlmostEqual(crv.near(Point(2,5))[2],0.0,msg="the index of a curve is rebuilt when its basis is replaced")
+        crv.basis.origin = Point(0,-5)
+        self.assertAlmostEqual(crv.near(Point(2,-5))[2],0.0,msg="the index of a curve is rebuilt when its basis is altered")
+
     def test_far(self):
         #NOTE: this test takes a long time.  disabled for now.
         crv = Curve.circle(Point(),10)
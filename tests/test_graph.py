@@ -0,0 +1,92 @@
+import unittest
+import decodes.core as dc
+from decodes.core import *
+
+
+class Tests(unittest.TestCase):
+
+    def test_spatial_graph_index(self):
+        g = SpatialGraph()
+        self.assertTrue(g.add_edge(Point(0,0),Point(1,0)))
+        self.assertFalse(g.add_edge(Point(1,0),Point(0,0)),"an edge between existing positions is not added twice")
+        self.assertEqual(len(g.nodes),2)
+        self.assertTrue(Point(1,0,EPSILON*0.5) in g,"positions within tolerance are found")
+        self.assertFalse(Point(1,0,EPSILON*2) in g)
+        self.assertEqual(g.node_id(Point(1,0)),1)
+        self.assertEqual(g.node_id(Point(2,0)),None)
+
+    def test_add_edges_bulk(self):
+        segs = [Segment(Point(x,y),Point(x+1,y)) for x in range(10) for y in range(10)]
+        segs += [(Point(x,y),Point(x,y+1)) for x in range(11) for y in range(9)]
+        g = SpatialGraph()
+        ids = g.add_edges_bulk(segs)
+        self.assertEqual(len(ids),len(segs))
+        self.assertEqual(len(g.nodes),110,"shared endpoints are snapped to a single node")
+        for (ia,ib), seg in zip(ids,segs):
+            pa = seg.spt if hasattr(seg,'spt') else seg[0]
+            self.assertEqual(g.node_list[ia],pa)
+        self.assertEqual(len(g.node_pairs),2*len(segs))
+
+        g2 = SpatialGraph()
+        for seg in segs[:40]: 
+            if hasattr(seg,'spt'): g2.add_edge(seg.spt,seg.ept)
+        g3 = SpatialGraph()
+        g3.add_edges_bulk(segs[:40])
+        self.assertEqual(len(g2.node_pairs),len(g3.node_pairs),"bulk construction matches incremental construction")
+        self.assertEqual(g3.add_edges_bulk(segs[:40]),g3.add_edges_bulk(segs[:40]))
+        self.assertEqual(len(g3.node_pairs),80,"edges are not duplicated")
+
+    def test_shortest_paths(self):
+        g = Graph()
+        for a, b, w in [("a","b",1.0),("b","c",1.0),("a","c",3.0),("c","d",1.0),("d","e",5.0),("c","e",1.0)]: g.add_edge(a,b,w)
+        g.add_node("z")
+        self.assertEqual(g.shortest_path("a","e"),["a","b","c","e"])
+        self.assertEqual(g.shortest_path("a","a"),["a"])
+        self.assertEqual(g.shortest_distance("a","e"),3.0)
+        self.assertEqual(g.shortest_path("a","z"),None,"unreachable nodes have no path")
+        self.assertEqual(g.shortest_path_between(["a","e"],["d"]),["e","c","d"])
+        self.assertEqual(g.distances_from(["a"]),g._calc_dijkstra("a")[0])
+
+        g.add_edge("a","e",0.5)
+        self.assertEqual(g.shortest_path("a","e"),["a","e"],"adding an edge discards retained paths")
+
+    def test_astar(self):
+        segs = [Segment(Point(x,y),Point(x+1,y)) for x in range(8) for y in range(8)]
+        segs += [Segment(Point(x,y),Point(x,y+1)) for x in range(8) for y in range(7)]
+        segs += [Segment(Point(x,y),Point(x+1,y+1)) for x in range(0,7,2) for y in range(7)]
+        g = SpatialGraph()
+        g.add_edges_bulk(segs)
+        def length(route): return sum(route[n].distance(route[n+1]) for n in range(len(route)-1))
+        for goal in [Point(7,7),Point(3,6),Point(6,1)]:
+            route = g.astar_path(Point(0,0),goal)
+            self.assertEqual(route[0],Point(0,0))
+            self.assertEqual(route[-1],goal)
+            self.assertAlmostEqual(length(route),g.shortest_distance(g.node_at(Point(0,0)),g.node_at(goal)),msg="A* finds the shortest path")
+        self.assertEqual(g.astar_path(Point(0,0),Point(20,20)),None)
+
+    def test_csr_graph(self):
+        c = CSRGraph(5, [0,1,2,0,0], [1,2,3,3,1], [1.0,1.0,1.0,5.0,9.0], bidirectional=True)
+        self.assertEqual(len(c.targets),8,"repeated edges are discarded")
+        self.assertEqual(c.weight(0,1),1.0,"the first weight given for an edge is kept")
+        self.assertEqual(list(c.neighbors(0)),[1,3])
+        self.assertEqual(c.degree(4),0)
+        self.assertEqual(c.shortest_path(0,3),[0,1,2,3])
+        self.assertEqual(c.shortest_distance(3,0),3.0)
+        self.assertEqual(c.shortest_path(0,4),None)
+        self.assertEqual(c.shortest_path_between([4,2],[0]),[2,1,0])
+        self.assertRaises(TypeError,c.add_edge,0,4)
+        self.assertRaises(IndexError,CSRGraph,2,[0],[2])
+
+        g = Graph()
+        for a, b, w in [("a","b",1.0),("b","c",1.0),("a","c",3.0)]: g.add_edge(a,b,w)
+        c = CSRGraph.from_graph(g)
+        route = c.shortest_path(c.node_id("a"),c.node_id("c"))
+        self.assertEqual([c.values[n] for n in route],g.shortest_path("a","c"))
+
+    def test_mesh_graph(self):
+        msh = Mesh([Point(0,0),Point(1,0),Point(1,1),Point(0,1),Point(2,0)],[[0,1,2,3],[1,4,2]])
+        graph = msh.to_pt_graph()
+        frozen = msh.to_pt_graph(frozen=True)
+        self.assertEqual(sorted(graph.node_pairs),sorted(frozen.node_pairs),"a frozen graph has the same edges, with ids that are the indices of points")
+        self.assertEqual(sorted(CSRGraph.from_graph(graph).node_pairs),sorted(frozen.node_pairs))
+        self.assertEqual(frozen.shortest_path(0,4),graph.shortest_path(0,4))
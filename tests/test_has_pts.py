@@ -105,4 +105,69 @@ class Tests(unittest.TestCase):
         edges = pgon.edges
         for n in range(3): self.assertEqual(Segment(Point(verts[n].x,verts[n].y,-1),Point(verts[n+1].x,verts[n+1].y,-1)),edges[n])
 
-        class_attr = ['_pts','_edges','_centroid']
\ No newline at end of file
+        class_attr = ['_pts','_edges','_centroid']
+
+    def test_coords(self):
+        verts = [Vec(-1,-1),Vec(1,-1),Vec(1,1),Vec(-1,1)]
+        pgon = PGon(verts,basis=CS(Point(0,0,-1)))
+        coords = pgon.coords
+        self.assertEqual(len(coords),12)
+        self.assertEqual(list(coords[0:3]),[-1.0,-1.0,-1.0],"coordinates are given in world space")
+        def func(): coords[0] = 5.0
+        self.assertRaises(TypeError,func) # confirms that the coordinate view cannot be altered
+
+        pa = pgon.pt_array
+        self.assertEqual(len(pa),4)
+        for n in range(4): self.assertEqual(pa[n],pgon.pts[n])
+
+        pline = PLine([Point(x,0,0) for x in range(5)])
+        self.assertEqual(pline.coords[3],1.0)
+        pline[1] = Point(1,2,3)
+        self.assertEqual(list(pline.coords[3:6]),[1.0,2.0,3.0],"coordinates are recalculated when vertices change")
+
+    def test_version(self):
+        pgon = PGon([Vec(0,0),Vec(2,0),Vec(2,1),Vec(0,1)],basis=CS(Point(0,0,-1)))
+        ver = pgon.version
+        self.assertEqual(pgon.area,2.0)
+        self.assertEqual(pgon.version,ver,"reading cached values does not change the version")
+
+        pgon.basis = CS(Point(5,0,0))
+        self.assertNotEqual(pgon.version,ver,"changing the basis changes the version")
+        self.assertEqual(pgon.area,2.0)
+        self.assertEqual(pgon.centroid,Point(6,0.5,0))
+
+        ver = pgon.version
+        pgon[1] = Vec(4,0)
+        self.assertNotEqual(pgon.version,ver,"changing a vertex changes the version")
+        self.assertEqual(pgon.area,3.0)
+        self.assertEqual(pgon.edges[0].length,4.0)
+
+        clone = pgon.basis_applied()
+        self.assertNotEqual(clone.version,pgon.version)
+        self.assertEqual(clone.centroid,pgon.centroid)
+
+        pline = PLine([Point(0,0),Point(1,0)])
+        self.assertEqual(len(pline.edges),1)
+        pline.append(Point(1,1))
+        self.assertEqual(len(pline.edges),2,"cached edges are recalculated when vertices change")
+
+    def test_bulk_basis_evaluation(self):
+        cs = CS(Point(1,2,3),Vec(1,1,0),Vec(0,1,1))
+        vecs = [Vec(x,x*0.5,-x) for x in range(6)]
+        pts = cs.eval_many(vecs)
+        for vec, pt in zip(vecs,pts): self.assertEqual(cs.eval(vec),pt,"evaluating many vecs at once matches evaluating each")
+        for vec, dvec in zip(vecs,cs.deval_many(pts)): self.assertEqual(vec,dvec)
+
+        cs.origin = Point(0,0,-1)
+        self.assertEqual(cs.eval_many([Vec(0,0,0)])[0],Point(0,0,-1),"altering a CS invalidates its cached matrices")
+
+        cyl = CylCS(Point(0,0,1))
+        self.assertEqual(cyl.eval_many([Vec(2,math.pi/2,0)])[0],cyl.eval(Vec(2,math.pi/2,0)),"bases without matrices evaluate each point in turn")
+
+        pline = PLine(vecs,basis=cs)
+        for vec, pt in zip(vecs,pline.pts): self.assertEqual(cs.eval(vec),pt)
+        pline.append([Point(1,1,1),Vec(1,1,1)])
+        self.assertEqual(pline[-2],cs.deval(Point(1,1,1)),"appended points are devaluated by the basis of a based object")
+        self.assertEqual(pline[-1],Vec(1,1,1),"appended vecs are interpreted in local coordinates")
+        applied = pline.basis_applied()
+        for pt, vec in zip(pline.pts,applied._verts): self.assertEqual(pt,vec)
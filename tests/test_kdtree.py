@@ -0,0 +1,40 @@
+import unittest
+import decodes.core as dc
+from decodes.core import *
+import random, pickle
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.pts = [Point.random(Interval(0,10)) for n in range(500)]
+        self.tree = KDTree(self.pts,leaf_size=4)
+
+    def test_nearest(self):
+        for q in [Point(1,2,3),Point(-5,0,0),Point(5,5,5)]:
+            idx, dist = self.tree.nearest(q)
+            self.assertEqual(idx,Point.near_index(q,self.pts),"nearest point matches a brute-force search")
+            self.assertAlmostEqual(dist,q.distance(self.pts[idx]))
+
+        idxs, dists = self.tree.nearest_many([Point(1,2,3),Point(5,5,5)])
+        self.assertEqual(idxs,Point.near_indices([Point(1,2,3),Point(5,5,5)],self.pts))
+
+    def test_k_nearest_and_within(self):
+        q = Point(3,3,3)
+        idxs, dists = self.tree.k_nearest(q,6)
+        self.assertEqual(idxs,Point.k_near_indices(q,self.pts,6),"k nearest points match a brute-force search")
+        self.assertEqual(dists,sorted(dists))
+
+        idxs, dists = self.tree.within(q,2.0)
+        self.assertEqual(idxs,Point.within_indices(q,self.pts,2.0),"points within a radius match a brute-force search")
+
+    def test_in_bounds(self):
+        bnds = Bounds(ival_x=Interval(1,4),ival_y=Interval(2,3),ival_z=Interval(0,5))
+        self.assertEqual(self.tree.in_bounds(bnds),[n for n,p in enumerate(self.pts) if p in bnds])
+
+    def test_serialized(self):
+        tree = pickle.loads(pickle.dumps(self.tree))
+        self.assertEqual(tree.k_nearest(Point(1,1,1),3),self.tree.k_nearest(Point(1,1,1),3))
+        tree = KDTree.from_serialized(self.tree.serialized())
+        self.assertEqual(tree.nearest(Point(1,1,1)),self.tree.nearest(Point(1,1,1)))
@@ -47,6 +47,151 @@ class Tests(unittest.TestCase):
             for m in range(3):
                 self.assertEqual( self.tet_pts[self.tet_faces[n][m]] , meshes[n].pts[m] , "explode")
 
+    def test_add_faces(self):
+        pts = [Point(0,0),Point(1,0),Point(1,1),Point(0,1),Point(2,0)]
+        msh = Mesh(pts)
+        msh.add_faces([[0,1,2,3],[1,4,2]])
+        self.assertEqual(list(msh.faces),[[0,1,2,3],[1,4,2]])
+        msh.add_faces([0,1,2, 1,4,2],3)
+        self.assertEqual(msh.faces[-2:],[[0,1,2],[1,4,2]])
+        self.assertEqual(msh.faces.sizes,[4,3,3,3])
+        self.assertRaises(IndexError,msh.add_faces,[0,1,5],3)
+        self.assertRaises(ValueError,msh.add_faces,[0,1,2,3],[3,3])
+        self.assertEqual(len(msh.faces),4,"invalid faces are not added")
+
+        msh = Mesh.from_buffers(pts,[0,1,2,3, 1,4,2],[4,3])
+        self.assertEqual(msh.faces[0],[0,1,2,3])
+        self.assertEqual(msh.faces[1],[1,4,2])
+        self.assertEqual(str(msh),"msh[5v,2f]")
+
+        surf = Surface(lambda u,v: Point(u,v,u*v), Interval(0,1), Interval(0,1))
+        self.assertEqual(len(surf.to_mesh(divs_u=5,divs_v=4).faces),20)
+        self.assertEqual(len(surf.to_mesh(tris=True,divs_u=5,divs_v=4).faces),40)
+
+    def test_faces_as_list(self):
+        msh = Mesh(self.tet_pts,self.tet_faces)
+        self.assertEqual(msh.faces,self.tet_faces,"faces compare equal to a list of lists")
+        self.assertNotEqual(msh.faces,self.tet_faces[:2])
+        self.assertTrue(msh.faces == Mesh(self.tet_pts,self.tet_faces).faces)
+
+        version = msh.version
+        msh.faces.append([1,2,3])
+        self.assertEqual(msh.faces[-1],[1,2,3])
+        self.assertTrue(msh.version > version,"appending a face is recorded by its mesh")
+
+        version = msh.version
+        msh.faces.extend([[0,1,3],[1,2,3,0]])
+        self.assertEqual(msh.faces[-2:],[[0,1,3],[1,2,3,0]])
+        self.assertTrue(msh.version > version)
+
+        normal = msh.face_normal(0)
+        msh.faces[0] = [0,2,1]
+        self.assertEqual(msh.faces[0],[0,2,1])
+        self.assertEqual(msh.face_normal(0),normal.inverted(),"assigning a face invalidates cached values")
+        msh.faces[1] = [0,2,3,1]
+        self.assertEqual(msh.faces[1:3],[[0,2,3,1],[2,3,0]],"a face may be replaced by one of another size")
+
+        face = msh.faces[2]
+        face[2] = 1
+        self.assertEqual(msh.faces[2],[2,3,0],"a face given by a mesh is a copy")
+        msh.faces[2] = face
+        self.assertEqual(msh.faces[2],[2,3,1],"an altered face is assigned back")
+
+    def test_welded(self):
+        pts = [Point(0,0),Point(1,0),Point(1,1),Point(0,1), Point(1,0),Point(2,0),Point(2,1),Point(1,1.0001), Point(5,5)]
+        msh = Mesh(pts,[[0,1,2,3],[4,5,6,7],[0,1,4]])
+        welded, idx_map = msh.welded(0.001,True)
+        self.assertEqual(len(welded.pts),6,"coincident vertices are merged and unused vertices are discarded")
+        self.assertEqual(len(welded.faces),2,"collapsed faces are discarded")
+        self.assertEqual(idx_map,[0,1,2,3,1,4,5,2,-1])
+        for n, m in enumerate(idx_map):
+            if m >= 0: self.assertTrue(welded.pts[m].distance(msh.pts[n]) < 0.001)
+        self.assertEqual(welded.faces[1],[1,4,5,2])
+        self.assertEqual(len(msh.pts),9,"the original mesh is unchanged")
+        self.assertEqual(len(msh.welded().pts),7,"with no tolerance given, only equal vertices are merged")
+
+        msh = Mesh(pts,[[0,1,2,3],[2,2,3]])
+        idx_map = msh.compact()
+        self.assertEqual(len(msh.pts),4)
+        self.assertEqual(list(msh.faces),[[0,1,2,3]])
+        self.assertEqual(idx_map[4:],[-1]*5)
+
+    def test_face_geometry(self):
+        pts = [Point(0,0),Point(2,0),Point(2,1),Point(0,1),Point(3,0,1)]
+        msh = Mesh(pts,[[0,1,2,3],[1,4,2]])
+        self.assertEqual(msh.face_normal(0),Vec(0,0,1),"the normal of a planar quad is found")
+        self.assertAlmostEqual(msh.face_area(0),2.0)
+        self.assertAlmostEqual(msh.face_areas[1],0.5*Vec(1,0,1).length)
+        self.assertEqual(msh.face_centroid(0),Point(1,0.5))
+        self.assertEqual(len(msh.face_normals),2)
+        self.assertEqual(msh.face_centroids[1],Point.centroid(msh.face_pts(1)))
+        self.assertEqual(msh.vertex_normals[0],Vec(0,0,1))
+        self.assertEqual(msh.vertex_normals[2],Vec.average([msh.face_normal(0)*2.0,msh.face_normal(1)*msh.face_area(1)]).normalized())
+
+        msh.append(Point(0,2,2))
+        msh.add_face(3,2,5)
+        self.assertEqual(len(msh.face_areas),3,"face geometry is recalculated after faces are added")
+        msh.basis = CS(Point(0,0,5))
+        self.assertEqual(msh.face_centroid(0),Point(1,0.5,5),"face geometry is recalculated after the basis changes")
+
+    def test_decimated(self):
+        n = 12
+        pts = [Point(x,y,0.1*x*x) for y in range(n) for x in range(n)]
+        idxs = [i for y in range(n-1) for x in range(n-1) for i in (y*n+x,y*n+x+1,(y+1)*n+x+1,(y+1)*n+x)]
+        msh = Mesh.from_buffers(pts,idxs,4)
+
+        dec = msh.decimated(40)
+        self.assertTrue(len(dec.faces) <= 40)
+        self.assertTrue(all(len(face) == 3 for face in dec.faces))
+        self.assertTrue(dec.is_manifold and dec.is_oriented)
+        self.assertEqual(len(msh.faces),121,"the original mesh is unchanged")
+
+        flat = Mesh.from_buffers([Point(pt.x,pt.y) for pt in pts],idxs,4).decimated(max_error=1e-6)
+        self.assertEqual(len(flat.faces),2,"a flat mesh is reduced to two triangles")
+        self.assertAlmostEqual(sum(flat.face_areas),121)
+        self.assertRaises(ValueError,msh.decimated)
+
+        lod = msh.lods(3)
+        self.assertEqual(len(lod),3)
+        self.assertTrue(lod[0] is msh)
+        self.assertTrue(len(lod[1].faces) > len(lod[2].faces))
+        self.assertEqual(lod.errors,sorted(lod.errors))
+        self.assertTrue(lod.select(0) is msh)
+        self.assertTrue(lod.select(1e6) is lod[2])
+
+    def test_topology(self):
+        pts = [Point(x,y) for y in range(3) for x in range(3)]
+        faces = [[0,1,4,3],[1,2,5,4],[3,4,7,6],[4,5,8,7]]
+        msh = Mesh(pts,faces)
+        self.assertEqual(len(msh.edges),12)
+        self.assertEqual(len(msh.naked_edges),8)
+        self.assertTrue((0,1) in msh.naked_edges and (3,0) in msh.naked_edges,"naked edges run in the direction of their face")
+        self.assertTrue(msh.is_manifold)
+        self.assertTrue(msh.is_oriented)
+        self.assertFalse(msh.is_closed)
+        self.assertEqual(sorted(msh.vertex_neighbors(4)),[1,3,5,7])
+        self.assertEqual(msh.valence(0),2)
+        self.assertEqual(sorted(msh.vertex_faces(4)),[0,1,2,3])
+        self.assertEqual(sorted(msh.face_neighbors(0)),[1,2])
+
+        msh.add_face(4,1,0)
+        self.assertFalse(msh.is_oriented,"the topology is rebuilt when faces are added")
+        self.assertFalse(msh.is_manifold)
+
+        tet = Mesh(self.tet_pts,[[0,2,1],[0,1,3],[1,2,3],[2,0,3]])
+        self.assertTrue(tet.is_closed)
+        self.assertTrue(tet.is_oriented)
+
+    def test_graphs(self):
+        pts = [Point(x,y) for y in range(3) for x in range(3)]
+        msh = Mesh(pts,[[0,1,4,3],[1,2,5,4],[3,4,7,6],[4,5,8,7]])
+        graph = msh.to_face_graph(2)
+        self.assertEqual(sorted(graph.edges[0]),[1,2],"faces that share two points are neighbors")
+        self.assertEqual(sorted(msh.to_face_graph(1).edges[0]),[1,2,3],"faces that share a point are neighbors")
+        self.assertEqual(graph.naked_nodes,[0,1,2,3])
+        frozen = msh.to_face_graph(2,frozen=True)
+        self.assertEqual(sorted(frozen.node_pairs),sorted(graph.node_pairs))
+
 '''
 m1 = dc.Mesh()
 m1.add_vert(Vec(0.0,0.0,1.0)) #0
@@ -0,0 +1,82 @@
+import unittest
+import decodes, decodes.io.mesh_out
+import decodes.core as dc
+from decodes.core import *
+import os, struct, shutil, tempfile
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        pts = [Point(0,0),Point(1,0),Point(1,1),Point(0,1),Point(2,0),Point(2,1)]
+        self.msh = Mesh(pts,[[0,1,2,3],[1,4,5]])
+        self.pline = PLine([Point(0,0,1),Point(1,0,1),Point(1,1,1)])
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_ply(self):
+        out = decodes.make_out(decodes.Outies.PLY, "scene", self.dir)
+        out.put([self.msh,self.pline])
+        out.put(PGon([Point(0,0),Point(1,0),Point(1,1)],basis=CS(0,0,3)))
+        out.draw()
+
+        data = open(os.path.join(self.dir,"scene.ply"),"rb").read()
+        header, body = data.split(b"end_header\n")
+        counts = [int(line.split()[-1]) for line in header.splitlines() if line.startswith(b"element")]
+        self.assertEqual(counts,[12,3,2])
+        self.assertEqual(len(body),12*12 + (1+16)+(1+12)+(1+12) + 2*8)
+        self.assertEqual(struct.unpack("<3f",body[12*9:12*10]),(0,0,3),"vertices are written in world coordinates")
+        self.assertEqual(struct.unpack("<B4i",body[144:161]),(4,0,1,2,3))
+        self.assertEqual(struct.unpack("<B3i",body[174:187]),(3,9,10,11),"faces are offset by the vertices already written")
+        self.assertEqual(struct.unpack("<4i",body[-16:]),(6,7,7,8))
+
+    def test_stl(self):
+        out = decodes.make_out(decodes.Outies.STL, "scene", self.dir)
+        out.put(self.msh)
+        out.put(self.msh)
+        out.draw()
+
+        data = open(os.path.join(self.dir,"scene.stl"),"rb").read()
+        self.assertEqual(struct.unpack("<I",data[80:84])[0],6,"quads are divided into two triangles")
+        self.assertEqual(len(data),84+6*50)
+        tri = struct.unpack("<12fH",data[84:134])
+        self.assertEqual(tri[:3],(0,0,1))
+        self.assertEqual(tri[3:12],(0,0,0, 1,0,0, 1,1,0))
+
+    def test_obj(self):
+        path = os.path.join(self.dir,"scene.obj")
+        out = decodes.make_out(decodes.Outies.OBJ, "scene", path)
+        out.put(self.msh)
+        out.put(self.pline)
+        out.draw()
+
+        lines = open(path).read().splitlines()
+        self.assertEqual(len([l for l in lines if l.startswith("v ")]),9)
+        self.assertEqual([l for l in lines if l[0] in "fl"],["f 1 2 3 4","f 2 5 6","l 7 8 9"])
+
+    def test_draw(self):
+        path = os.path.join(self.dir,"scene.obj")
+        out = decodes.make_out(decodes.Outies.OBJ, "scene", path)
+        out.put([self.msh,Point(1,2,3),self.pline])
+        self.assertEqual(out.draw(),[True,False,True],"draw returns whether each piece of geometry was written")
+        self.assertEqual(out.draw(),[True,False,True],"drawing again does not rewrite the file")
+        self.assertEqual(len([l for l in open(path).read().splitlines() if l.startswith("v ")]),9)
+        self.assertRaises(IOError,out.put,self.msh)
+
+        path = os.path.join(self.dir,"scene.ply")
+        with decodes.io.mesh_out.MeshOut("scene",path) as out:
+            out.put(self.msh)
+        self.assertTrue(out._closed)
+        self.assertTrue(open(path,"rb").read().split(b"end_header\n")[0].find(b"element face            2") >= 0,"leaving a with statement completes the file")
+
+        out = decodes.io.mesh_out.MeshOut("unfinished",self.dir,"stl")
+        out.put(self.msh)
+        del out
+        data = open(os.path.join(self.dir,"unfinished.stl"),"rb").read()
+        self.assertEqual(struct.unpack("<I",data[80:84])[0],3,"an outie that is never drawn completes its file when discarded")
+
+    def test_format(self):
+        self.assertEqual(decodes.io.mesh_out.MeshOut("scene.stl",self.dir).format,"stl")
+        self.assertRaises(ValueError,decodes.io.mesh_out.MeshOut,"scene",self.dir,"dxf")
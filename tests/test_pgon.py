@@ -61,6 +61,18 @@ class Tests(unittest.TestCase):
         self.assertEqual(pgon.bounds.cpt,Point(1.5,1.5))
 
 
+    def test_mutate_then_query(self):
+        pgon = PGon([Point(0,0),Point(2,0),Point(2,1),Point(0,1)])
+        self.assertEqual(pgon.area,2.0)
+        self.assertEqual(pgon.edges[0].ept,Point(2,0))
+        self.assertEqual(pgon.bounds.ival_x.b,2)
+
+        pgon[1].x = 4
+        pgon[2].x = 4
+        self.assertEqual(pgon.area,4.0,"the area of a polygon follows vertices altered in place")
+        self.assertEqual(pgon.edges[0].ept,Point(4,0))
+        self.assertEqual(pgon.bounds.ival_x.b,4)
+
     def test_containment(self):
         p0 = Point(1,1)
         p1 = Point(2,1)
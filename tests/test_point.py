@@ -21,6 +21,15 @@ class Tests(unittest.TestCase):
         npt = Point.near(pt, pts)
         self.assertEqual(npt,Point(4,0,0),"nearest point in list")
 
+    def test_k_near_and_within(self):
+        pt = Point(4.2,1)
+        pts = [Point(x,0,0) for x in range(10)]
+        self.assertEqual(Point.k_near(pt,pts,3),[Point(4,0,0),Point(5,0,0),Point(3,0,0)],"k nearest points in order of distance")
+        self.assertEqual(Point.k_near_indices(pt,PointArray(pts),2),[4,5])
+        self.assertEqual(Point.within(pt,pts,1.5),[Point(4,0,0),Point(5,0,0)],"points within a radius")
+        self.assertEqual(Point.near_indices([Point(1.1,0),Point(8.8,0)],pts),[1,9])
+        self.assertEqual(Point.near_indices([Point(1.1,0)],pts,k=2),[[1,2]])
+
     def test_cull_dups(self):
         pts = [Point(x,0,0) for x in range(10)]
         pts.append(Point(0,0,0))
@@ -33,6 +42,24 @@ class Tests(unittest.TestCase):
         culled_pts = Point.cull_duplicates(pts,.51)
         self.assertEqual(len(pts),len(culled_pts)+1)
 
+    def test_cull_dups_map(self):
+        pts = [Point(0,0,0),Point(1,0,0),Point(0,0,0.01),Point(1.01,0,0),Point(2,0,0)]
+        culled_pts, idx_map = Point.cull_duplicates(pts,0.1,True)
+        self.assertEqual(culled_pts,[pts[0],pts[1],pts[4]])
+        self.assertEqual(idx_map,[0,1,0,1,2],"each point is related to the kept point it was merged with")
+
+    def test_point_array(self):
+        pts = [Point(x,x*2,0) for x in range(5)]
+        arr = PointArray(pts)
+
+        self.assertTrue(isinstance(arr[0],Point),"members of a PointArray are returned as Points")
+        self.assertEqual(arr.centroid,Point.centroid(pts))
+        self.assertEqual(Point.centroid(arr),Point.centroid(pts))
+        for d, p in zip(arr.distances(Point(1,1)),pts): self.assertAlmostEqual(d,p.distance(Point(1,1)))
+
+        pl = PLine(arr)
+        self.assertEqual(list(pl.pts),pts,"HasPts accepts a PointArray")
+
 '''
 print "operators"
 # operations between points and vectors are performed in basis space
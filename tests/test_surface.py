@@ -86,6 +86,23 @@ class Tests(unittest.TestCase):
         with self.assertRaises(DomainError):  iso_fail = srf.isocurve(u_val=2.5)
         with self.assertRaises(AttributeError):  iso_fail = srf.isocurve(u_val=0.5,v_val=0.5)
 
+    def test_array_function(self):
+        calls = []
+        def array_func(us,vs):
+            calls.append(len(us))
+            return us, vs, [u*v for u,v in zip(us,vs)]
+        srf = Surface(dom_u=Interval(0,2),dom_v=Interval(0,1),array_function=array_func)
+        del calls[:]
+        msh = srf.to_mesh(divs_u=4,divs_v=2)
+        self.assertEqual(calls,[15],"a mesh is built by a single call to the array function of a surface")
+        self.assertEqual(msh.pts[8],Point(1.5,0.5,0.75))
+        pl = srf.isopolyline(u_val=1.0,res=4)
+        self.assertEqual(len(calls),2)
+        self.assertEqual(pl.pts[2],Point(1,0.5,0.5))
+        pt, vec_u, vec_ui, vec_v, vec_vi = srf._nudged(1.0,0.5,True)
+        self.assertEqual(len(calls),3,"the neighbors of a point are found by a single call")
+        self.assertAlmostEqual(vec_u.z,-vec_ui.z)
+
     def test_iso_curvature(self):
         def func(u,v):
             return Point(u,v)
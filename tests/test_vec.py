@@ -100,3 +100,27 @@ class Tests(unittest.TestCase):
 
 
 
+
+    def test_vec_array(self):
+        vecs = [Vec(2,0,0),Vec(0,3,0),Vec(1,1,1)]
+        arr = VecArray(vecs)
+
+        self.assertEqual(len(arr),3)
+        for n in range(3): self.assertEqual(arr[n],vecs[n],"members of a VecArray are returned as Vecs")
+        self.assertEqual(list(arr),vecs)
+        self.assertEqual(list(arr[1:]),vecs[1:],"slicing a VecArray returns a VecArray")
+        self.assertEqual(Vec.average(arr),Vec.average(vecs))
+
+        other = Vec(1,2,3)
+        self.assertEqual(list(arr+other),[v+other for v in vecs])
+        self.assertEqual(list(arr-arr),[Vec()]*3)
+        self.assertEqual(list(arr*2),[v*2 for v in vecs])
+        self.assertEqual(list(arr/2),[v/2 for v in vecs])
+        self.assertEqual(list(arr.cross(other)),[v.cross(other) for v in vecs])
+        self.assertEqual(list(arr.dot(arr)),[v.dot(v) for v in vecs])
+        self.assertEqual(list(arr.normalized()),[v.normalized() for v in vecs])
+        for l, v in zip(arr.lengths,vecs): self.assertAlmostEqual(l,v.length)
+
+        arr[0] = Vec(9,9,9)
+        self.assertEqual(arr[0],Vec(9,9,9))
+        self.assertEqual(VecArray.from_tuples(arr.to_tuples()).to_tuples(),arr.to_tuples())
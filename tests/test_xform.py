@@ -1,6 +1,7 @@
 import unittest
 import decodes.core as dc
 from decodes.core import *
+import math
 
 
 class Tests(unittest.TestCase):
@@ -57,6 +58,59 @@ class Tests(unittest.TestCase):
         self.AssertPointsAlmostEqual(Point(0,0,-1),pl.pts[0])
 
 
+    def test_apply_many(self):
+        pts = [Point(x,x,0) for x in range(5)]
+        xf = Xform.translation(Vec(0,0,1)) * Xform.scale(2)
+
+        for pa, pb in zip(xf.apply_many(pts),pts): self.AssertPointsAlmostEqual(pa,pb*xf)
+        arr = PointArray(pts) * xf
+        self.assertTrue(isinstance(arr,PointArray),"transforming a PointArray returns a PointArray")
+        for pa, pb in zip(arr,pts): self.AssertPointsAlmostEqual(pa,pb*xf)
+
+        msh = Mesh(pts,[[0,1,2]])
+        msh.face_normal(0)
+        clone = xf.apply_many(msh)
+        version = msh.version
+        clone.add_faces([[0,2,3]])
+        self.assertEqual(msh.faces,[[0,1,2]],"a transformed copy of a mesh has its own faces")
+        self.assertEqual(msh.version,version)
+        self.assertEqual(len(clone.faces),2)
+        self.assertEqual(len(clone.face_areas),2,"a transformed copy of a mesh does not share cached values")
+        self.assertEqual(len(msh.face_areas),1)
+        for pa, pb in zip(clone.pts,pts): self.AssertPointsAlmostEqual(pa,pb*xf)
+
+        xf.apply_many(msh,in_place=True)
+        for pa, pb in zip(msh.pts,pts): self.AssertPointsAlmostEqual(pa,pb*xf)
+
+        xf.apply_many(pts,in_place=True)
+        self.AssertPointsAlmostEqual(pts[1],Point(2,2,1))
+
+    def test_inverse(self):
+        xf = Xform.translation(Vec(1,2,3)) * Xform.rotation(angle=0.5) * Xform.scale(2)
+        pt = Point(3,-1,2)
+        self.AssertPointsAlmostEqual(pt,(pt*xf)*xf.inverse())
+        self.assertRaises(GeometricError,Xform.scale(0).inverse)
+
+
+    def test_chain(self):
+        pts = [Point(x,1,0) for x in range(5)]
+        xfs = [Xform.translation(Vec(1,0,0)), Xform.rotation(angle=math.pi/2), Xform.scale(3)]
+        chain = XformChain(pts)
+        for xf in xfs: chain = chain * xf
+        
+        expected = list(pts)
+        for xf in xfs: expected = [p*xf for p in expected]
+        for pa, pb in zip(chain,expected): self.AssertPointsAlmostEqual(pa,pb)
+        self.assertEqual(pts[0],Point(0,1,0),"resolving a chain does not alter the source geometry")
+
+        pt = Point(1,1,1)
+        chain = XformChain(pt, *xfs)
+        self.AssertPointsAlmostEqual(Point(chain.x,chain.y,chain.z),pt*xfs[0]*xfs[1]*xfs[2])
+        self.AssertPointsAlmostEqual(chain.resolved()*chain.inverse,pt)
+
+        stripped = chain.stripped
+        self.assertEqual((stripped.c14,stripped.c24,stripped.c34),(0,0,0))
+        self.assertTrue(chain.stripped is stripped,"the folded transformation is stripped of translation once")
 
     def AssertPointsAlmostEqual(self,pa,pb,places=4):
         self.assertAlmostEqual(pa.x,pb.x,places)